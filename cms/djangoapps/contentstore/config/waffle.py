@@ -11,6 +11,7 @@ WAFFLE_NAMESPACE = u'studio'
 
 # Switches
 ENABLE_ACCESSIBILITY_POLICY_PAGE = u'enable_policy_page'
+STREAM_RERUN_ASSETS = u'stream_rerun_assets'
 
 
 def waffle():
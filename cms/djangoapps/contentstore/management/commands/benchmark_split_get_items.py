@@ -0,0 +1,123 @@
+"""
+Command to compare the time split get_items takes to find the blocks
+matching typical qualifiers by matching every block of a course and by
+looking them up in the structure's indexes.
+"""
+from __future__ import absolute_import
+
+from collections import OrderedDict
+from timeit import default_timer
+
+from bson.objectid import ObjectId
+from django.core.management.base import BaseCommand
+from six.moves import range
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
+
+# The (qualifiers, settings) get_items is benchmarked with, as get_items
+# passes them to the indexes.
+QUERIES = (
+    ({'block_type': 'problem'}, {}),
+    ({'block_type': 'sequential'}, {'graded': True}),
+    ({'block_type': {'$in': ['html', 'video']}}, {}),
+    ({}, {'format': 'Homework'}),
+)
+
+LEAF_TYPES = ('problem', 'html', 'video', 'problem')
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py cms benchmark_split_get_items --blocks 10000 --settings=devstack
+    """
+    help = u'Compares matching every block of a generated course structure with looking them up in its indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--blocks',
+            help=u'Number of blocks of the generated course structure.',
+            default=10000,
+            type=int,
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times to run each query.',
+            default=20,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        structure = generate_structure(options['blocks'])
+        store = modulestore()
+        iterations = options['iterations']
+
+        self.stdout.write(u'{} blocks'.format(len(structure['blocks'])))
+        start = default_timer()
+        structure_index = StructureIndex(structure)
+        for qualifiers, settings in QUERIES:
+            structure_index.find_candidates(qualifiers, settings)
+        self.stdout.write(u'  indexes built in {:.2f} ms'.format((default_timer() - start) * 1000))
+
+        for qualifiers, settings in QUERIES:
+            start = default_timer()
+            for _ in range(iterations):
+                matches = find_matches(store, structure, list(structure['blocks']), qualifiers, settings)
+            scan_ms = (default_timer() - start) * 1000 / iterations
+
+            start = default_timer()
+            for _ in range(iterations):
+                candidates = structure_index.find_candidates(qualifiers, settings)
+                find_matches(store, structure, candidates, qualifiers, settings)
+            lookup_ms = (default_timer() - start) * 1000 / iterations
+
+            self.stdout.write(u'  {} {}: {} matches, {:.2f} ms to scan, {:.2f} ms to look up'.format(
+                qualifiers, settings, len(matches), scan_ms, lookup_ms
+            ))
+
+
+def find_matches(store, structure, block_keys, qualifiers, settings):
+    """
+    Returns the BlockKeys of those of the given blocks of the structure which match
+    the given qualifiers and settings, as get_items does.
+    """
+    matches = []
+    for block_key in block_keys:
+        block_data = structure['blocks'][block_key]
+        # pylint: disable=protected-access
+        if store._block_matches(block_data, qualifiers) and store._block_matches(block_data.fields, settings):
+            matches.append(block_key)
+    return matches
+
+
+def generate_structure(num_blocks):
+    """
+    Returns a structure of a course with about the given number of blocks, in
+    chapters of sequentials of verticals of problems, html and videos.
+    """
+    blocks = OrderedDict()
+
+    def _add_block(block_type, parent_key=None, **fields):
+        """
+        Adds a block of the given type to the structure and returns its BlockKey.
+        """
+        block_key = BlockKey(block_type, u'{}{}'.format(block_type, len(blocks)))
+        blocks[block_key] = BlockData(block_type=block_type, definition=ObjectId(), fields=dict(fields, children=[]))
+        if parent_key is not None:
+            blocks[parent_key].fields['children'].append(block_key)
+        return block_key
+
+    root_key = _add_block('course')
+    while len(blocks) < num_blocks:
+        chapter_key = _add_block('chapter', root_key)
+        for sequential in range(10):
+            graded = sequential % 2 == 0
+            sequential_key = _add_block('sequential', chapter_key, graded=graded, format='Homework' if graded else None)
+            for _ in range(5):
+                vertical_key = _add_block('vertical', sequential_key)
+                for leaf in range(4):
+                    _add_block(LEAF_TYPES[leaf], vertical_key)
+    return {'_id': ObjectId(), 'root': root_key, 'blocks': blocks}
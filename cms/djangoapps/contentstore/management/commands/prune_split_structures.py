@@ -0,0 +1,160 @@
+"""
+Command to delete the split modulestore structures which are no longer
+reachable from the active versions of any course or library, or from the
+library versions courses use.
+"""
+from __future__ import absolute_import
+
+import logging
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from pytz import UTC
+from six.moves import range
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+# Number of structures deleted per query.
+DELETE_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py cms prune_split_structures --settings=devstack
+        $ ./manage.py cms prune_split_structures --commit --settings=devstack
+        $ ./manage.py cms prune_split_structures --trim-history --keep 10 --commit --settings=devstack
+    """
+    help = u'''
+    Deletes the split modulestore structures that are not needed by any course or library. Keeps the
+    active version of each branch, the library versions that the blocks of any structure are sourced
+    from, and any structure edited within the given number of hours, along with all the structures
+    they reach through their previous and original versions and the snapshots of those stored as
+    deltas. With --trim-history, only the given number of previous versions of each branch are kept.
+    Dry run unless --commit is given.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trim-history',
+            action='store_true',
+            help=u'Also delete the versions of each branch older than the --keep previous ones.',
+        )
+        parser.add_argument(
+            '--keep',
+            help=u'Number of previous versions of each branch to keep with --trim-history.',
+            default=10,
+            type=int,
+        )
+        parser.add_argument(
+            '--grace-hours',
+            help=u'Keep structures edited within this number of hours, which may not be active yet.',
+            default=24,
+            type=int,
+        )
+        parser.add_argument('--commit', action='store_true', help=u'Delete the structures.')
+
+    def handle(self, *args, **options):
+        db_connection = modulestore()._get_modulestore_by_type(  # pylint: disable=protected-access
+            ModuleStoreEnum.Type.split
+        ).db_connection
+
+        links = {link['_id']: link for link in db_connection.find_structure_links()}
+        unreachable_ids = find_unreachable_structures(
+            links,
+            [course_index.get('versions', {}) for course_index in db_connection.find_course_versions()],
+            datetime.now(UTC) - timedelta(hours=options['grace_hours']),
+            library_versions=db_connection.find_source_library_versions(),
+            keep=options['keep'] if options['trim_history'] else None,
+        )
+
+        self.stdout.write(u'{} of {} structures are unreachable'.format(len(unreachable_ids), len(links)))
+        if not options['commit']:
+            self.stdout.write(u'Dry run: no structures deleted. Use --commit to delete them.')
+            return
+
+        for start in range(0, len(unreachable_ids), DELETE_BATCH_SIZE):
+            db_connection.delete_structures(unreachable_ids[start:start + DELETE_BATCH_SIZE])
+            log.info(
+                u'Deleted %d of %d unreachable structures',
+                min(start + DELETE_BATCH_SIZE, len(unreachable_ids)),
+                len(unreachable_ids),
+            )
+        self.stdout.write(u'Deleted {} structures'.format(len(unreachable_ids)))
+
+
+def find_unreachable_structures(links, course_versions, edited_before, library_versions=(), keep=None):
+    """
+    Returns the ids of the structures which no course or library needs.
+
+    The structures needed are the active versions of the branches, the given
+    library versions and the structures edited since edited_before, along
+    with every structure they reach through their previous and original
+    versions and delta snapshots.  Given keep, only the keep previous
+    versions of the active versions are needed instead, and none of those
+    of the other structures.
+
+    Arguments:
+        links (dict): The previous_version, original_version, edited_on and
+            delta snapshot of each structure, by id.
+        course_versions (list): The versions of each course index, a dict
+            of structure ids by branch.
+        edited_before (datetime): Structures edited since are kept.
+        library_versions (iterable): The ids of the library structures
+            which blocks are sourced from.
+        keep (int): The number of previous versions of each branch to keep,
+            or None to keep all of them.
+    """
+    active_ids = [version_id for versions in course_versions for version_id in versions.values()]
+    other_ids = list(library_versions)
+    other_ids.extend(
+        structure_id
+        for structure_id, link in links.items()
+        if link.get('edited_on') is not None and link['edited_on'] >= edited_before
+    )
+
+    if keep is None:
+        reachable_ids = _find_reachable_structures(links, active_ids + other_ids)
+    else:
+        reachable_ids = set(structure_id for structure_id in other_ids if structure_id in links)
+        for version_id in active_ids:
+            if version_id in links:
+                reachable_ids.add(links[version_id].get('original_version'))
+            for _ in range(keep + 1):
+                if version_id not in links:
+                    break
+                reachable_ids.add(version_id)
+                version_id = links[version_id].get('previous_version')
+
+        # structures stored as deltas need their snapshot
+        reachable_ids.update([
+            links[structure_id]['delta']['base']
+            for structure_id in reachable_ids
+            if 'delta' in links.get(structure_id, {})
+        ])
+
+    return [structure_id for structure_id in links if structure_id not in reachable_ids]
+
+
+def _find_reachable_structures(links, structure_ids):
+    """
+    Returns the set of the ids of the given structures and of all those they
+    reach through their previous and original versions and delta snapshots.
+    """
+    reachable_ids = set()
+    to_visit = list(structure_ids)
+    while to_visit:
+        structure_id = to_visit.pop()
+        if structure_id in reachable_ids or structure_id not in links:
+            continue
+        reachable_ids.add(structure_id)
+        link = links[structure_id]
+        to_visit.extend([
+            link.get('previous_version'),
+            link.get('original_version'),
+            link.get('delta', {}).get('base'),
+        ])
+    return reachable_ids
@@ -0,0 +1,35 @@
+"""
+Tests for benchmark_split_get_items management command.
+"""
+from __future__ import absolute_import
+
+from django.core.management import call_command
+from six import StringIO
+
+from contentstore.management.commands.benchmark_split_get_items import QUERIES, find_matches, generate_structure
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+
+class TestBenchmarkSplitGetItems(ModuleStoreTestCase):
+    """
+    Tests benchmark_split_get_items management command.
+    """
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_split_get_items', '--blocks', '100', '--iterations', '1', stdout=out)
+        output = out.getvalue()
+        # a course, a chapter, 10 sequentials, 50 verticals and 200 leaves
+        self.assertIn(u'262 blocks', output)
+        self.assertIn(u'indexes built', output)
+        self.assertEqual(output.count(u'to look up'), len(QUERIES))
+
+    def test_lookup_matches_scan(self):
+        structure = generate_structure(100)
+        structure_index = StructureIndex(structure)
+        store = modulestore()
+        for qualifiers, settings in QUERIES:
+            matches = find_matches(store, structure, list(structure['blocks']), qualifiers, settings)
+            self.assertTrue(matches)
+            self.assertEqual(structure_index.find_candidates(qualifiers, settings), matches)
@@ -0,0 +1,102 @@
+"""
+Tests for prune_split_structures management command.
+"""
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from django.core.management import call_command
+from pytz import UTC
+from six import StringIO
+
+from contentstore.management.commands.prune_split_structures import find_unreachable_structures
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestFindUnreachableStructures(TestCase):
+    """
+    Tests find_unreachable_structures.
+    """
+    def setUp(self):
+        super(TestFindUnreachableStructures, self).setUp()
+        self.edited_before = datetime(2019, 1, 1, tzinfo=UTC)
+        edited_on = self.edited_before - timedelta(days=1)
+        # the history of a course: 1 <- 2 <- 3 <- 4, with 3 and 4 deltas against 2, and an abandoned 5
+        self.links = {
+            1: {'previous_version': None, 'original_version': 1, 'edited_on': edited_on},
+            2: {'previous_version': 1, 'original_version': 1, 'edited_on': edited_on},
+            3: {'previous_version': 2, 'original_version': 1, 'edited_on': edited_on, 'delta': {'base': 2}},
+            4: {'previous_version': 3, 'original_version': 1, 'edited_on': edited_on, 'delta': {'base': 2}},
+            5: {'previous_version': 1, 'original_version': 1, 'edited_on': edited_on},
+        }
+
+    def test_keep_history(self):
+        self.assertEqual(find_unreachable_structures(self.links, [{'draft': 4}], self.edited_before), [5])
+
+    def test_trim_history(self):
+        self.assertEqual(find_unreachable_structures(self.links, [{'draft': 4}], self.edited_before, keep=0), [3, 5])
+        self.assertEqual(find_unreachable_structures(self.links, [{'draft': 4}], self.edited_before, keep=1), [5])
+
+    def test_keep_snapshots_and_original_version(self):
+        self.links[3]['delta'] = {'base': 5}
+        self.assertEqual(find_unreachable_structures(self.links, [{'draft': 3}], self.edited_before), [4])
+        self.assertEqual(find_unreachable_structures(self.links, [{'draft': 3}], self.edited_before, keep=0), [2, 4])
+
+    def test_keep_recently_edited(self):
+        self.links[5]['edited_on'] = self.edited_before
+        self.assertEqual(find_unreachable_structures(self.links, [], self.edited_before), [2, 3, 4])
+        self.assertEqual(find_unreachable_structures(self.links, [], self.edited_before, keep=0), [1, 2, 3, 4])
+
+    def test_keep_library_versions(self):
+        self.assertEqual(
+            find_unreachable_structures(self.links, [{'library': 1}], self.edited_before, library_versions=[3]),
+            [4, 5],
+        )
+        self.assertEqual(
+            find_unreachable_structures(self.links, [{'library': 1}], self.edited_before, library_versions=[3], keep=0),
+            [4, 5],
+        )
+
+
+class TestPruneSplitStructures(ModuleStoreTestCase):
+    """
+    Tests prune_split_structures management command.
+    """
+    def setUp(self):
+        super(TestPruneSplitStructures, self).setUp()
+        with self.store.default_store(ModuleStoreEnum.Type.split):
+            self.course = CourseFactory.create()
+            self.chapter = ItemFactory.create(parent=self.course, category='chapter', display_name='chapter')
+            for display_name in ('first', 'second'):
+                self.chapter.display_name = display_name
+                self.store.update_item(self.chapter, self.user.id)
+        self.db_connection = self.store._get_modulestore_by_type(  # pylint: disable=protected-access
+            ModuleStoreEnum.Type.split
+        ).db_connection
+
+    def test_dry_run(self):
+        num_structures = self.db_connection.structures.count()
+        out = StringIO()
+        call_command('prune_split_structures', '--trim-history', '--keep', '0', '--grace-hours', '0', stdout=out)
+        self.assertIn(u'of {} structures are unreachable'.format(num_structures), out.getvalue())
+        self.assertEqual(self.db_connection.structures.count(), num_structures)
+
+    def test_keep_history(self):
+        num_structures = self.db_connection.structures.count()
+        call_command('prune_split_structures', '--grace-hours', '0', '--commit', stdout=StringIO())
+        self.assertEqual(self.db_connection.structures.count(), num_structures)
+
+    def test_prune(self):
+        num_structures = self.db_connection.structures.count()
+        call_command(
+            'prune_split_structures', '--trim-history', '--keep', '0', '--grace-hours', '0', '--commit',
+            stdout=StringIO(),
+        )
+        self.assertLess(self.db_connection.structures.count(), num_structures)
+
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            self.assertIsNotNone(self.store.get_course(self.course.id))
+            self.assertEqual(self.store.get_item(self.chapter.location).display_name, 'second')
@@ -19,6 +19,7 @@ from openedx.core.lib.gating import api as gating_api
 from track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
 from util.module_utils import yield_dynamic_descriptor_descendants
 from xmodule.modulestore.django import SignalHandler, modulestore
+from xmodule.modulestore.split_mongo.mongo_connection import CourseIndexCache
 
 from .signals import GRADING_POLICY_CHANGED
 
@@ -39,6 +40,15 @@ def locked(expiry_seconds, key):
     return task_decorator
 
 
+@receiver(SignalHandler.course_published)
+def clear_course_index_cache_on_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the index of the published course from the split modulestore's
+    course index cache, for index changes not made through split itself.
+    """
+    CourseIndexCache().delete(course_key)
+
+
 @receiver(SignalHandler.course_published)
 def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
     """
@@ -36,6 +36,7 @@ from six import iteritems, text_type
 from user_tasks.models import UserTaskArtifact, UserTaskStatus
 from user_tasks.tasks import UserTask
 
+from contentstore.config.waffle import STREAM_RERUN_ASSETS, waffle
 from contentstore.courseware_index import CoursewareSearchIndexer, LibrarySearchIndexer, SearchIndexingError
 from contentstore.storage import course_import_export_storage
 from contentstore.utils import initialize_permissions, reverse_usage_url
@@ -458,7 +459,10 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
         # as the Mongo modulestore doesn't support multiple runs of the same course.
         store = modulestore()
         with store.default_store('split'):
-            store.clone_course(source_course_key, destination_course_key, user_id, fields=fields)
+            store.clone_course(
+                source_course_key, destination_course_key, user_id, fields=fields,
+                asset_copy_options=_rerun_asset_copy_options(destination_course_key),
+            )
 
         # set initial permissions for the user to access the course.
         initialize_permissions(destination_course_key, User.objects.get(id=user_id))
@@ -508,6 +512,37 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
         return u"exception: " + text_type(exc)
 
 
+def _rerun_asset_copy_options(destination_course_key):
+    """
+    Returns the options with which to copy the assets of the rerun to destination_course_key.
+
+    When the STREAM_RERUN_ASSETS switch is enabled, assets are copied chunk by chunk and
+    concurrently, and the progress of the copy is reported in the rerun's state.
+    """
+    if not waffle().is_enabled(STREAM_RERUN_ASSETS):
+        return None
+
+    reported = {'percent': None}
+
+    def report_progress(copied, total):
+        """
+        Updates the rerun's state at every tenth of the assets copied.
+        """
+        percent = copied * 100 // total // 10 * 10
+        if percent != reported['percent']:
+            reported['percent'] = percent
+            CourseRerunState.objects.progressed(
+                course_key=destination_course_key,
+                message=u'Copied {copied} of {total} assets.'.format(copied=copied, total=total),
+            )
+
+    return {
+        'streaming': True,
+        'max_workers': settings.COURSE_RERUN_ASSET_COPY_WORKERS,
+        'progress_callback': report_progress,
+    }
+
+
 def deserialize_fields(json_fields):
     fields = json.loads(json_fields)
     for field_name, value in iteritems(fields):
@@ -9,6 +9,7 @@ import six
 from django.conf import settings
 from mock import Mock, patch
 from opaque_keys.edx.locator import CourseLocator
+from waffle.testutils import override_switch
 
 from contentstore.tasks import rerun_course
 from contentstore.tests.utils import CourseTestCase
@@ -96,6 +97,32 @@ class CloneCourseTest(CourseTestCase):
         rerun_state = CourseRerunState.objects.find_first(course_key=split_rerun_id)
         self.assertEqual(rerun_state.state, CourseRerunUIStateManager.State.SUCCEEDED)
 
+    @override_switch('studio.stream_rerun_assets', active=True)
+    def test_rerun_course_streaming_assets(self):
+        """
+        Tests that a rerun streams the assets of the course and reports its progress.
+        """
+        course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        asset_names = [u'first.txt', u'second.txt']
+        for asset_name in asset_names:
+            content = StaticContent(
+                course.id.make_asset_key('asset', asset_name), asset_name, 'text/plain', b'dummy data',
+            )
+            contentstore().save(content)
+
+        split_rerun_id = CourseLocator(org=course.id.org, course=course.id.course, run="streamed")
+        CourseRerunState.objects.initiated(course.id, split_rerun_id, self.user, 'rerun')
+        with patch.object(CourseRerunUIStateManager, 'progressed') as mock_progressed:
+            result = rerun_course.delay(six.text_type(course.id), six.text_type(split_rerun_id), self.user.id)
+            self.assertEqual(result.get(), "succeeded")
+        mock_progressed.assert_called_with(course_key=split_rerun_id, message=u'Copied 2 of 2 assets.')
+
+        assets, count = contentstore().get_all_content_for_course(split_rerun_id)
+        self.assertEqual(count, len(asset_names))
+        self.assertEqual(sorted(asset['asset_key'].block_id for asset in assets), asset_names)
+        rerun_state = CourseRerunState.objects.find_first(course_key=split_rerun_id)
+        self.assertEqual(rerun_state.state, CourseRerunUIStateManager.State.SUCCEEDED)
+
     def test_rerun_course(self):
         """
         Unit tests for :meth: `contentstore.tasks.rerun_course`
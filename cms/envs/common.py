@@ -142,6 +142,18 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total size, in bytes, of the collected block structures
+    # cached in each process when the block_structure.process_cache and
+    # block_structure.storage_backing_for_cache switches are enabled, as
+    # measured by the size of their serialized data.
+    PROCESS_CACHE_MAX_SIZE=100 * 1024 * 1024,
+
+    # Time, in seconds, for which collected block structures are cached
+    # in each process.  Cached structures are checked against the version
+    # recorded in the cache on each use, so this only bounds their memory
+    # use.
+    PROCESS_CACHE_TIMEOUT=5 * 60,
 )
 
 ############################ FEATURE CONFIGURATION #############################
@@ -699,6 +711,37 @@ MODULESTORE = {
     }
 }
 
+# Maximum number of split modulestore definitions cached in each process.
+# Definitions are immutable once written, so they never need to be
+# invalidated.  0 disables the cache.  Unlike the LMS, Studio does not
+# cache structures (MAX_STRUCTURE_BLOCKS), as it edits them.
+SPLIT_MONGO_PROCESS_CACHE_SETTINGS = dict(
+    MAX_DEFINITIONS=0,
+)
+
+# Time, in seconds, for which the split modulestore caches course indexes
+# (the head versions of courses) in each process and in the default
+# cache.  Indexes are removed from the cache when they change, but other
+# processes may serve the previous version of a course for up to
+# PROCESS_CACHE_TIMEOUT seconds.  0 disables that tier.
+SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS = dict(
+    PROCESS_CACHE_TIMEOUT=0,
+    SHARED_CACHE_TIMEOUT=0,
+)
+
+# Whether the split modulestore stores new structures as deltas against a
+# snapshot of a previous version rather than in full, and when it stores a
+# new snapshot instead: after MAX_DELTAS deltas against the same snapshot, or
+# when more than MAX_CHANGED_RATIO of its blocks changed.  Structures stored
+# as deltas are read whether or not this is enabled.  Snapshots are cached in
+# each process up to SNAPSHOT_CACHE_MAX_BYTES of BSON; 0 disables the cache.
+SPLIT_MONGO_DELTA_STRUCTURES_SETTINGS = dict(
+    ENABLED=False,
+    MAX_DELTAS=20,
+    MAX_CHANGED_RATIO=0.5,
+    SNAPSHOT_CACHE_MAX_BYTES=0,
+)
+
 # Modulestore-level field override providers. These field override providers don't
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
@@ -1520,6 +1563,9 @@ UPLOAD_CHUNK_SIZE_IN_MB = 10
 ### Max size of asset uploads to GridFS
 MAX_ASSET_UPLOAD_FILE_SIZE_IN_MB = 10
 
+### Number of assets copied concurrently when streaming the assets of a course rerun
+COURSE_RERUN_ASSET_COPY_WORKERS = 4
+
 # FAQ url to direct users to if they upload
 # a file that exceeds the above size
 MAX_ASSET_UPLOAD_FILE_SIZE_URL = ""
@@ -1747,6 +1793,13 @@ CACHES = {
     },
 }
 
+# Local disk cache of the course assets too large to be cached in memory by the contentserver,
+# disabled unless a DIRECTORY is set.  The least recently used assets are evicted beyond MAX_SIZE bytes.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+}
+
 ############################ OAUTH2 Provider ###################################
 
 # OpenID Connect issuer ID. Normally the URL of the authentication endpoint.
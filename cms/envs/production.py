@@ -143,6 +143,7 @@ MEDIA_URL = ENV_TOKENS.get('MEDIA_URL', MEDIA_URL)
 # GITHUB_REPO_ROOT is the base directory
 # for course data
 GITHUB_REPO_ROOT = ENV_TOKENS.get('GITHUB_REPO_ROOT', GITHUB_REPO_ROOT)
+COURSE_RERUN_ASSET_COPY_WORKERS = ENV_TOKENS.get('COURSE_RERUN_ASSET_COPY_WORKERS', COURSE_RERUN_ASSET_COPY_WORKERS)
 
 # STATIC_ROOT specifies the directory where static files are
 # collected
@@ -192,6 +193,7 @@ if 'loc_cache' not in CACHES:
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     }
+COURSE_ASSETS_DISK_CACHE.update(ENV_TOKENS.get('COURSE_ASSETS_DISK_CACHE', {}))
 
 SESSION_COOKIE_DOMAIN = ENV_TOKENS.get('SESSION_COOKIE_DOMAIN')
 SESSION_COOKIE_HTTPONLY = ENV_TOKENS.get('SESSION_COOKIE_HTTPONLY', True)
@@ -129,6 +129,16 @@ class CourseRerunUIStateManager(CourseActionUIStateManager):
             display_name=display_name,
         )
 
+    def progressed(self, course_key, message):
+        """
+        To be called when an existing rerun for the given course has made progress, described by the given message.
+        """
+        self.update_state(
+            course_key=course_key,
+            new_state=self.State.IN_PROGRESS,
+            message=message[:self.model.MAX_MESSAGE_LENGTH],
+        )
+
     def succeeded(self, course_key):
         """
         To be called when an existing rerun for the given course has successfully completed.
@@ -16,6 +16,11 @@ from opaque_keys.edx.locator import AssetLocator
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# Compiled regexes of replace_urls, by static url, data directory and whether
+# jump_to_id urls are replaced.  There is one per data directory in use.
+_FUSED_URL_REPLACE_REGEXES = {}
+_MAX_FUSED_URL_REPLACE_REGEXES = 1000
+
 
 def _url_replace_regex(prefix):
     """
@@ -112,28 +117,42 @@ def process_static_urls(text, replacement_function, data_dir=None):
         quote = match.group('quote')
         rest = match.group('rest')
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(six.text_type(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        if _is_xblock_resource_url(prefix, rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
 
     return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
+        _url_replace_regex(_static_url_prefix_regex(data_dir)),
         wrap_part_extraction,
         text
     )
 
 
+def _static_url_prefix_regex(data_dir):
+    """
+    Match the prefix of static urls that aren't in `data_dir`.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
+def _is_xblock_resource_url(prefix, rest):
+    """
+    Return whether a matched static url links to an XBlock resource.
+    """
+    # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
+    # works for actual static assets and for magical course asset URLs....
+    full_url = prefix + rest
+
+    starts_with_static_url = full_url.startswith(six.text_type(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
+
+
 def make_static_urls_absolute(request, html):
     """
     Converts relative URLs referencing static assets to absolute URLs
@@ -174,59 +193,129 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         """
         Replace a single matched url.
         """
-        original_uri = "".join([prefix, rest])
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+        return _replace_static_url(
+            original, prefix, quote, rest, data_directory, course_id, static_asset_path, static_paths_out
+        )
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
 
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
 
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Apply the substitutions of `replace_static_urls`, `replace_course_urls` and,
+    if `jump_to_id_base_url` is given, `replace_jump_to_id_urls` to `text`, in
+    a single pass over it.
 
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
-
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    text: The source text to do the substitution in
+    data_directory: The directory in which course data is stored
+    course_id: The course identifier used to distinguish static content for this course in studio
+    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+    jump_to_id_base_url: The absolute path to the base of the handler that redirects jump_to_id links
+    """
+    data_dir = static_asset_path or data_directory
+    course_url = u'/courses/{}/'.format(text_type(course_id))
+    static_paths_out = []
+
+    def replace_url(match):
+        """
+        Replace a single matched url, according to its prefix.
+        """
+        original = match.group(0)
+        prefix = match.group('prefix')
+        quote = match.group('quote')
+        rest = match.group('rest')
+
+        if match.group('static_prefix') is not None:
+            if _is_xblock_resource_url(prefix, rest):
+                return original
+            return _replace_static_url(
+                original, prefix, quote, rest, data_directory, course_id, static_asset_path, static_paths_out
+            )
+        elif match.group('course_prefix') is not None:
+            return "".join([quote, course_url, rest, quote])
         else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
-
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
-
-        static_paths_out.append((original_uri, url))
-        return "".join([quote, url, quote])
+            return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return _fused_url_replace_regex(data_dir, jump_to_id_base_url is not None).sub(replace_url, text)
+
+
+def _fused_url_replace_regex(data_dir, include_jump_to_id):
+    """
+    Return the compiled regex matching the static, course and (if
+    `include_jump_to_id`) jump_to_id urls replaced by `replace_urls`.
+    """
+    key = (settings.STATIC_URL, data_dir, include_jump_to_id)
+    regex = _FUSED_URL_REPLACE_REGEXES.get(key)
+    if regex is None:
+        prefixes = [
+            u'(?P<static_prefix>{})'.format(_static_url_prefix_regex(data_dir)),
+            u'(?P<course_prefix>/course/)',
+        ]
+        if include_jump_to_id:
+            prefixes.append(u'(?P<jump_to_id_prefix>/jump_to_id/)')
+        if len(_FUSED_URL_REPLACE_REGEXES) >= _MAX_FUSED_URL_REPLACE_REGEXES:
+            _FUSED_URL_REPLACE_REGEXES.clear()
+        regex = _FUSED_URL_REPLACE_REGEXES[key] = re.compile(_url_replace_regex(u'|'.join(prefixes)))
+    return regex
+
+
+def _replace_static_url(original, prefix, quote, rest, data_directory, course_id, static_asset_path,
+                        static_paths_out):
+    """
+    Replace a single static url matched by `process_static_urls`, as
+    described in `replace_static_urls`.
+    """
+    original_uri = "".join([prefix, rest])
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        static_paths_out.append((original_uri, original_uri))
+        return original
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        static_paths_out.append((original_uri, original_uri))
+        return original
+
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            # Import is placed here to avoid model import at project startup.
+            from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+            base_url = AssetBaseUrlConfig.get_base_url()
+            excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+            url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_storage.exists(rest):
+                url = staticfiles_storage.url(rest)
+            else:
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+
+    static_paths_out.append((original_uri, url))
+    return "".join([quote, url, quote])
@@ -19,7 +19,9 @@ from static_replace import (
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
 )
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
@@ -199,6 +201,36 @@ def test_static_paths_out(mock_modulestore, mock_storage):
     assert static_paths == [(static_url, static_course_url), (raw_url, raw_url)]
 
 
+@pytest.mark.django_db
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('xmodule.modulestore.django.modulestore', autospec=True)
+def test_replace_urls(mock_modulestore, mock_storage):
+    """
+    Make sure that replace_urls makes the substitutions of replace_static_urls,
+    replace_course_urls and replace_jump_to_id_urls applied one after the other.
+    """
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+
+    xblock_url = '/static/xblock/resources/babys_first.lil_xblock/public/images/pacifier.png'
+    pre_text = (
+        '<img src="/static/file.png"/><a href=\'/course/id\'>a</a><a href="/jump_to_id/id">b</a>'
+        '<img src="/static/foo.png?raw"/><img src="{}"/><img src="/static/{}/file.png"/>'
+    ).format(xblock_url, DATA_DIRECTORY)
+    sequential_text = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY,
+        '/jump_to_id_base/',
+    )
+    assert replace_urls(pre_text, DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url='/jump_to_id_base/') == \
+        sequential_text
+    assert '/c4x/org/course/asset/file.png' in sequential_text
+
+    # Without a jump_to_id base url, jump_to_id urls are left alone
+    assert replace_urls(pre_text, DATA_DIRECTORY, COURSE_KEY) == \
+        replace_course_urls(replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY)
+
+
 def test_regex():
     yes = ('"/static/foo.png"',
            '"/static/foo.png"',
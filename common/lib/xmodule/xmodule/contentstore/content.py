@@ -381,9 +381,11 @@ class ContentStore(object):
         """
         raise NotImplementedError
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(self, source_course_key, dest_course_key, **kwargs):
         """
         Copy all the course assets from source_course_key to dest_course_key
+
+        Implementations may accept additional keyword arguments, such as a progress_callback(copied, total)
         """
         raise NotImplementedError
 
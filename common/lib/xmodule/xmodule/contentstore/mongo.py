@@ -4,7 +4,10 @@ MongoDB/GridFS-level code for the contentstore.
 from __future__ import absolute_import
 
 import json
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 
 import gridfs
 import pymongo
@@ -23,6 +26,17 @@ from xmodule.util.misc import escape_invalid_characters
 
 from .content import ContentStore, StaticContent, StaticContentStream
 
+log = logging.getLogger(__name__)
+
+# The default number of assets copied concurrently by a streaming copy_all_course_assets
+DEFAULT_COPY_WORKERS = 4
+
+# The number of GridFS chunks inserted at a time by a streaming copy_all_course_assets
+COPY_CHUNKS_BATCH_SIZE = 16
+
+# Suffix of the GridFS bucket of the content-addressed blobs, added to the bucket of the assets
+BLOBS_BUCKET_SUFFIX = '_blobs'
+
 
 class MongoContentStore(ContentStore):
     """
@@ -31,12 +45,16 @@ class MongoContentStore(ContentStore):
     # pylint: disable=unused-argument, bad-continuation
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None,
+        content_addressed=False, **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param content_addressed: if True, save the data of assets as blobs shared by all assets with
+            the same content, and only store the metadata of each asset in its own entry. Assets saved
+            either way can always be read, copied and deleted.
         """
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         # The appropriate methods below are marked as autoretry_read - those methods will handle
@@ -52,6 +70,12 @@ class MongoContentStore(ContentStore):
         self.fs_files = mongo_db[bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[bucket + ".chunks"]
 
+        # Content-addressed blobs, refcounted by the fs_files entries that point at them with their blob_id
+        self.content_addressed = content_addressed
+        self.blobs = gridfs.GridFS(mongo_db, bucket + BLOBS_BUCKET_SUFFIX)
+        self.blob_files = mongo_db[bucket + BLOBS_BUCKET_SUFFIX + ".files"]
+        self.blob_chunks = mongo_db[bucket + BLOBS_BUCKET_SUFFIX + ".chunks"]
+
     def close_connections(self):
         """
         Closes any open connections to the underlying databases
@@ -77,9 +101,13 @@ class MongoContentStore(ContentStore):
         elif collections:
             self.fs_files.drop()
             self.chunks.drop()
+            self.blob_files.drop()
+            self.blob_chunks.drop()
         else:
             self.fs_files.remove({})
             self.chunks.remove({})
+            self.blob_files.remove({})
+            self.blob_chunks.remove({})
 
         if connections:
             self.close_connections()
@@ -93,28 +121,91 @@ class MongoContentStore(ContentStore):
         self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
         thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
-        with self.fs.new_file(_id=content_id, filename=six.text_type(content.location), content_type=content.content_type,
-                              displayname=content.name, content_son=content_son,
-                              thumbnail_location=thumbnail_location,
-                              import_path=content.import_path,
-                              # getattr b/c caching may mean some pickled instances don't have attr
-                              locked=getattr(content, 'locked', False)) as fp:
-            if hasattr(content.data, '__iter__'):
-                for chunk in content.data:
-                    fp.write(chunk)
-            else:
-                fp.write(content.data)
+        attrs = dict(
+            filename=six.text_type(content.location), content_type=content.content_type,
+            displayname=content.name, content_son=content_son,
+            thumbnail_location=thumbnail_location,
+            import_path=content.import_path,
+            # getattr b/c caching may mean some pickled instances don't have attr
+            locked=getattr(content, 'locked', False),
+        )
+        if self.content_addressed:
+            self._save_blob_entry(content_id, content.data, attrs)
+        else:
+            with self.fs.new_file(_id=content_id, **attrs) as fp:
+                _write_data(fp, content.data)
 
         return content
 
+    def _save_blob_entry(self, content_id, data, attrs):
+        """
+        Saves data as a content-addressed blob and an fs_files entry, with the given _id and attrs,
+        which points at the blob.
+        """
+        blob = self.blobs.new_file()
+        with blob:
+            _write_data(blob, data)
+        entry = dict(
+            _id=content_id, contentType=attrs.pop('content_type'),
+            length=blob.length, chunkSize=blob.chunk_size, uploadDate=blob.upload_date, md5=blob.md5,
+            blob_id=self._deduplicate_blob(blob),
+        )
+        entry.update(attrs)
+        self.fs_files.insert(entry)
+
+    def _deduplicate_blob(self, blob):
+        """
+        Returns the _id of the blob with the same content as the newly written blob, whose reference
+        is counted, and deletes the newly written blob. If there is no such blob, the newly written
+        blob is counted as referenced once and its _id returned.
+        """
+        existing = self.blob_files.find_and_modify(
+            # blobs without a positive refcount are new or about to be deleted
+            {'md5': blob.md5, 'length': blob.length, 'refcount': {'$gt': 0}},
+            {'$inc': {'refcount': 1}},
+        )
+        if existing is not None:
+            self.blobs.delete(blob._id)  # pylint: disable=protected-access
+            return existing['_id']
+        self.blob_files.update({'_id': blob._id}, {'$set': {'refcount': 1}})  # pylint: disable=protected-access
+        return blob._id  # pylint: disable=protected-access
+
+    def _release_blob(self, blob_id):
+        """
+        Counts one less reference to the given blob, and deletes it once it is no longer referenced.
+        """
+        self.blob_files.update({'_id': blob_id}, {'$inc': {'refcount': -1}})
+        # only delete the blob if no reference was added since, as those require a positive refcount
+        result = self.blob_files.remove({'_id': blob_id, 'refcount': {'$lte': 0}})
+        if result and result.get('n'):
+            self.blob_chunks.remove({'files_id': blob_id})
+
     def delete(self, location_or_id):
         """
         Delete an asset.
         """
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
-        # Deletes of non-existent files are considered successful
-        self.fs.delete(location_or_id)
+        entry = self.fs_files.find_one({'_id': location_or_id}, {'blob_id': True})
+        self._delete_entry(location_or_id, entry.get('blob_id') if entry else None)
+
+    def _delete_entry(self, entry_id, blob_id):
+        """
+        Deletes the fs_files entry with the given _id, and releases its blob if it has one.
+        """
+        if blob_id is None:
+            # Deletes of non-existent files are considered successful
+            self.fs.delete(entry_id)
+        else:
+            self.fs_files.remove({'_id': entry_id})
+            self._release_blob(blob_id)
+
+    def _get_data_file(self, fp):
+        """
+        Returns the GridOut from which to read the data of the asset of the given GridOut.
+        """
+        blob_id = getattr(fp, 'blob_id', None)
+        return fp if blob_id is None else self.blobs.get(blob_id)
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -130,7 +221,7 @@ class MongoContentStore(ContentStore):
                         thumbnail_location[4]
                     )
                 return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                    location, fp.displayname, fp.content_type, self._get_data_file(fp), last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
                     length=fp.length, locked=getattr(fp, 'locked', False),
@@ -145,7 +236,8 @@ class MongoContentStore(ContentStore):
                             thumbnail_location[4]
                         )
                     return StaticContent(
-                        location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
+                        location, fp.displayname, fp.content_type, self._get_data_file(fp).read(),
+                        last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
                         length=fp.length, locked=getattr(fp, 'locked', False),
@@ -200,7 +292,7 @@ class MongoContentStore(ContentStore):
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
             for attr, value in six.iteritems(asset):
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'blob_id']:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
@@ -229,7 +321,7 @@ class MongoContentStore(ContentStore):
             items = self.fs_files.find(query)
             assets_to_delete = assets_to_delete + items.count()
             for asset in items:
-                self.fs.delete(asset[prefix])
+                self._delete_entry(asset[prefix], asset.get('blob_id'))
 
             self.fs_files.remove(query)
         return assets_to_delete
@@ -380,32 +472,41 @@ class MongoContentStore(ContentStore):
             raise NotFoundError(asset_db_key)
         return item
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(
+        self, source_course_key, dest_course_key, streaming=False,
+        max_workers=DEFAULT_COPY_WORKERS, progress_callback=None
+    ):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        By default, this fairly expensively copies all of the data, reading each asset into memory
+        and writing it back through GridFS.
+
+        If streaming is True, the GridFS chunks of each asset are instead copied in batches, without
+        materializing whole files, and up to max_workers assets are copied concurrently.
+
+        Either way, assets saved as content-addressed blobs are copied as new references to their blob.
+
+        If given, progress_callback(copied, total) is called, from the calling thread, after each
+        asset is copied.
         """
         source_query = query_for_course(source_course_key)
+        if streaming:
+            self._copy_all_course_assets_by_chunks(source_query, dest_course_key, max_workers, progress_callback)
+            return
+
+        total = self.fs_files.find(source_query).count() if progress_callback else None
         # it'd be great to figure out how to do all of this on the db server and not pull the bits over
-        for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
+        for copied, asset in enumerate(self.fs_files.find(source_query), 1):
+            if asset.get('blob_id') is not None:
+                self._copy_asset_entry(asset, dest_course_key)
+                if progress_callback:
+                    progress_callback(copied, total)
+                continue
+
             # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, six.string_types):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
-            asset_key['org'] = dest_course_key.org
-            asset_key['course'] = dest_course_key.course
-            if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
-                if 'run' in asset_key:
-                    del asset_key['run']
-                asset_id = asset_key
-            else:  # add the run, since it's the last field, we're golden
-                asset_key['run'] = dest_course_key.run
-                asset_id = six.text_type(
-                    dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
-                )
+            source_content = self.fs.get(self.make_id_son(asset))
+            asset_id, asset_key = self._copied_asset_db_key(asset, dest_course_key)
 
             self.fs.put(
                 source_content.read(),
@@ -418,18 +519,111 @@ class MongoContentStore(ContentStore):
                 # getattr b/c caching may mean some pickled instances don't have attr
                 locked=asset.get('locked', False)
             )
+            if progress_callback:
+                progress_callback(copied, total)
+
+    def _copied_asset_db_key(self, asset, dest_course_key):
+        """
+        Returns the database _id and son of the copy in dest_course_key of the given fs_files entry.
+        """
+        asset_key = self.make_id_son(asset)
+        if isinstance(asset_key, six.string_types):
+            asset_key = AssetKey.from_string(asset_key)
+            __, asset_key = self.asset_db_key(asset_key)
+        asset_key['org'] = dest_course_key.org
+        asset_key['course'] = dest_course_key.course
+        if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
+            if 'run' in asset_key:
+                del asset_key['run']
+            asset_id = asset_key
+        else:  # add the run, since it's the last field, we're golden
+            asset_key['run'] = dest_course_key.run
+            asset_id = six.text_type(
+                dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
+            )
+        return asset_id, asset_key
+
+    def _copy_all_course_assets_by_chunks(self, source_query, dest_course_key, max_workers, progress_callback):
+        """
+        Copies the fs_files entries matching source_query to dest_course_key, chunk by chunk, with a
+        bounded pool of workers.
+        """
+        assets = list(self.fs_files.find(source_query))
+        total = len(assets)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+            futures = [executor.submit(self._copy_asset_entry, asset, dest_course_key) for asset in assets]
+            for copied, future in enumerate(as_completed(futures), 1):
+                # re-raise any error of the worker
+                future.result()
+                if progress_callback:
+                    progress_callback(copied, total)
+
+    def _copy_asset_entry(self, asset, dest_course_key):
+        """
+        Copies the given fs_files entry to dest_course_key, along with either its chunks, in batches
+        of COPY_CHUNKS_BATCH_SIZE, or a reference to its blob.
+        """
+        source_id = self.make_id_son(asset)
+        asset_id, asset_key = self._copied_asset_db_key(asset, dest_course_key)
+        copied_asset = dict(asset)
+
+        # remove any earlier copy
+        self.delete(asset_id)
+        blob_id = asset.get('blob_id')
+        if blob_id is None:
+            self._copy_chunks(self.chunks, source_id, asset_id)
+        else:
+            # blobs without a positive refcount are about to be deleted, so must not be referenced again
+            result = self.blob_files.update({'_id': blob_id, 'refcount': {'$gt': 0}}, {'$inc': {'refcount': 1}})
+            if not result.get('n'):
+                # copy the data of the blob while it still exists, as that of a plain GridFS file
+                del copied_asset['blob_id']
+                if not self._copy_chunks(self.blob_chunks, blob_id, asset_id) and asset['length']:
+                    # the asset was deleted since it was read
+                    log.warning(u'Not copying asset %s, whose data was deleted while copying it', source_id)
+                    return
+
+        # write the file entry last so that the copy is not visible until all of its data is
+        copied_asset.update(
+            _id=asset_id,
+            content_son=asset_key,
+            uploadDate=datetime.utcnow(),
+            locked=asset.get('locked', False),
+        )
+        self.fs_files.save(copied_asset)
+
+    def _copy_chunks(self, source_chunks, source_id, dest_id):
+        """
+        Copies the GridFS chunks of the file source_id in the source_chunks collection to chunks of
+        the file dest_id, in batches of COPY_CHUNKS_BATCH_SIZE, and returns the number of chunks copied.
+        """
+        copied = 0
+        batch = []
+        for chunk in source_chunks.find({'files_id': source_id}).sort('n', pymongo.ASCENDING):
+            del chunk['_id']
+            chunk['files_id'] = dest_id
+            batch.append(chunk)
+            if len(batch) >= COPY_CHUNKS_BATCH_SIZE:
+                self.chunks.insert(batch)
+                copied += len(batch)
+                batch = []
+        if batch:
+            self.chunks.insert(batch)
+            copied += len(batch)
+        return copied
 
     def delete_all_course_assets(self, course_key):
         """
         Delete all assets identified via this course_key. Dangerous operation which may remove assets
-        referenced by other runs or other courses.
+        referenced by other runs or other courses. Content-addressed blobs are only removed once no
+        asset of any course points at them anymore.
         :param course_key:
         """
         course_query = query_for_course(course_key)
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            self._delete_entry(asset_key, asset.get('blob_id'))
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -562,6 +756,26 @@ class MongoContentStore(ContentStore):
             sparse=True,
             background=True
         )
+        # Index needed by `_deduplicate_blob` to look up blobs by their content
+        create_collection_index(
+            self.blob_files,
+            [
+                ('md5', pymongo.ASCENDING),
+                ('length', pymongo.ASCENDING)
+            ],
+            background=True
+        )
+
+
+def _write_data(fp, data):
+    """
+    Writes the given data, a string or an iterable of chunks, to the given GridIn.
+    """
+    if hasattr(data, '__iter__'):
+        for chunk in data:
+            fp.write(chunk)
+    else:
+        fp.write(data)
 
 
 def query_for_course(course_key, category=None):
@@ -1329,11 +1329,16 @@ class ModuleStoreWriteBase(ModuleStoreReadBase, ModuleStoreWrite):
         """
         This base method just copies the assets. The lower level impls must do the actual cloning of
         content.
+
+        If given, the asset_copy_options kwarg is passed as keyword arguments to the contentstore's
+        copy_all_course_assets.
         """
         with self.bulk_operations(dest_course_id):
             # copy the assets
             if self.contentstore:
-                self.contentstore.copy_all_course_assets(source_course_id, dest_course_id)
+                self.contentstore.copy_all_course_assets(
+                    source_course_id, dest_course_id, **(kwargs.get('asset_copy_options') or {})
+                )
             return dest_course_id
 
     def delete_course(self, course_key, user_id, **kwargs):
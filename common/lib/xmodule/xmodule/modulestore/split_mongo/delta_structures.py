@@ -0,0 +1,115 @@
+"""
+Storage of split structures as deltas against a snapshot.
+
+Each edit of a course writes a new structure, which mostly repeats the
+blocks of the previous one.  When SPLIT_MONGO_DELTA_STRUCTURES_SETTINGS
+enables it, a new structure is instead stored as a delta: the document of
+the structure with only the blocks which differ from those of a base
+snapshot (a structure stored in full), and a ``delta`` field of the form::
+
+    {
+        'base': <id of the snapshot>,
+        'count': <number of deltas written against the snapshot so far>,
+        'deleted': [[block_type, block_id] of the blocks of the snapshot which were removed],
+    }
+
+Deltas are always against a snapshot, never against another delta, so
+reading one takes at most one more (usually cached) document.  A
+structure is stored as a new snapshot instead once MAX_DELTAS deltas have
+been written against its base, or once more than MAX_CHANGED_RATIO of
+the blocks of the base have changed.
+
+Since a delta keeps the changed blocks in ``blocks``, queries for the
+structures in which a block changed still find them.
+"""
+from __future__ import absolute_import
+
+from bson import BSON
+from bson.codec_options import CodecOptions
+
+DELTA_FIELD = 'delta'
+
+# Decodes documents as the connection does: with timezone aware datetimes.
+_CODEC_OPTIONS = CodecOptions(tz_aware=True)
+
+
+def is_delta(doc):
+    """
+    Returns whether the given structure document is stored as a delta.
+    """
+    return DELTA_FIELD in doc
+
+
+def normalize(doc):
+    """
+    Returns a copy of the given document as mongo returns it once stored
+    (e.g. with lists rather than tuples and millisecond datetimes), so that
+    its blocks compare equal to those of documents read from mongo.
+    """
+    return decode(encode(doc))
+
+
+def encode(doc):
+    """
+    Returns the BSON encoding of the given document, as the snapshot cache holds it.
+    """
+    return BSON.encode(doc)
+
+
+def decode(data):
+    """
+    Returns a new document decoded from the given BSON.
+    """
+    return BSON(data).decode(codec_options=_CODEC_OPTIONS)
+
+
+def make_delta(doc, base_doc, count, max_changed_ratio):
+    """
+    Returns the delta of the given structure document against the given snapshot,
+    or None if too many of the blocks of the snapshot changed for it to be worth it.
+
+    Arguments:
+        doc (dict): The normalized structure document to store.
+        base_doc (dict): The snapshot, as read from mongo.
+        count (int): The number of deltas against the snapshot, including this one.
+        max_changed_ratio (float): The maximum number of changed and deleted blocks,
+            as a ratio of the number of blocks of the snapshot.
+    """
+    base_blocks = {_block_key(block): block for block in base_doc['blocks']}
+    block_keys = set()
+    changed_blocks = []
+    for block in doc['blocks']:
+        block_key = _block_key(block)
+        block_keys.add(block_key)
+        if base_blocks.get(block_key) != block:
+            changed_blocks.append(block)
+    deleted = [list(block_key) for block_key in base_blocks if block_key not in block_keys]
+
+    if len(changed_blocks) + len(deleted) > max_changed_ratio * len(base_blocks):
+        return None
+
+    delta_doc = dict(doc, blocks=changed_blocks)
+    delta_doc[DELTA_FIELD] = {'base': base_doc['_id'], 'count': count, 'deleted': deleted}
+    return delta_doc
+
+
+def apply_delta(delta_doc, base_doc):
+    """
+    Returns the full structure document of the given delta, given its snapshot.
+    The blocks of base_doc are reused, so it must not be used again.
+    """
+    delta = delta_doc[DELTA_FIELD]
+    replaced = {_block_key(block) for block in delta_doc['blocks']}
+    replaced.update(tuple(block_key) for block_key in delta['deleted'])
+
+    doc = {key: value for key, value in delta_doc.items() if key != DELTA_FIELD}
+    doc['blocks'] = [block for block in base_doc['blocks'] if _block_key(block) not in replaced]
+    doc['blocks'].extend(delta_doc['blocks'])
+    return doc
+
+
+def _block_key(block):
+    """
+    Returns the (block_type, block_id) of the given block document.
+    """
+    return block['block_type'], block['block_id']
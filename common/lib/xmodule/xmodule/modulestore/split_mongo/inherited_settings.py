@@ -0,0 +1,101 @@
+"""
+Computation of the settings that the blocks of a split structure inherit
+from their ancestors.
+
+Most blocks set few or none of the inheritable fields, so rather than
+copying a dict of settings per block, the inherited settings of a block
+are a layer of the fields set on its parent over the settings its parent
+inherits.  A layer is only added where a block sets an inheritable field;
+all other blocks share the layer of their parent.
+"""
+from __future__ import absolute_import
+
+from collections import Mapping
+
+from xmodule.modulestore.inheritance import InheritanceMixin
+from xmodule.modulestore.split_mongo import BlockKey
+
+
+class InheritedSettings(Mapping):
+    """
+    An immutable mapping of inheritable field names to the json values
+    set on the nearest ancestor that sets them.
+    """
+    __slots__ = ('_settings', '_parent')
+
+    def __init__(self, settings=None, parent=None):
+        """
+        Arguments:
+            settings (dict): The field values of this layer.
+            parent (InheritedSettings): The layer these values take
+                precedence over, if any.
+        """
+        self._settings = settings or {}
+        self._parent = parent
+
+    def __getitem__(self, name):
+        layer = self
+        while layer is not None:
+            if name in layer._settings:  # pylint: disable=protected-access
+                return layer._settings[name]  # pylint: disable=protected-access
+            layer = layer._parent  # pylint: disable=protected-access
+        raise KeyError(name)
+
+    def __iter__(self):
+        seen = set()
+        layer = self
+        while layer is not None:
+            for name in layer._settings:  # pylint: disable=protected-access
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+            layer = layer._parent  # pylint: disable=protected-access
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return u"InheritedSettings({!r})".format(dict(self))
+
+    def with_settings_of(self, block_data):
+        """
+        Returns the settings that the children of the given block inherit,
+        given that the block inherits these settings.
+        """
+        settings = {
+            field_name: block_data.fields[field_name]
+            for field_name in InheritanceMixin.fields
+            if field_name in block_data.fields
+        }
+        return InheritedSettings(settings, self) if settings else self
+
+
+def compute_inherited_settings(block_map, root_key, root_settings=None):
+    """
+    Returns a dict of the InheritedSettings of each block reachable from
+    the given root block, by BlockKey.
+
+    The tree is walked iteratively, in pre-order.  A block reachable
+    through several parents inherits through the first of them to be
+    walked, and blocks are only walked once, so cycles end the walk
+    rather than recursing forever.  Children missing from block_map are
+    skipped.
+
+    Arguments:
+        block_map (dict): The BlockData of the blocks, by BlockKey.
+        root_key (BlockKey): The block to start from.
+        root_settings (dict): The settings the root block inherits.
+    """
+    inherited_settings = {}
+    stack = [(root_key, InheritedSettings(root_settings))]
+    while stack:
+        block_key, settings = stack.pop()
+        block_data = block_map.get(block_key)
+        if block_data is None or block_key in inherited_settings:
+            continue
+        inherited_settings[block_key] = settings
+
+        children_settings = settings.with_settings_of(block_data)
+        for child in reversed(block_data.fields.get('children', [])):
+            stack.append((BlockKey(*child), children_settings))
+    return inherited_settings
@@ -3,6 +3,7 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 """
 from __future__ import absolute_import
 
+import copy
 import datetime
 import logging
 import math
@@ -10,22 +11,27 @@ import re
 import zlib
 from contextlib import contextmanager
 from time import time
+from uuid import uuid4
 
 import pymongo
 import pytz
 import six
 import six.moves.cPickle as pickle
+from bson.objectid import ObjectId
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
+from openedx.core.lib.cache_utils import ProcessLRUCache
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo import delta_structures
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -34,6 +40,18 @@ except ImportError:
 new_contract('BlockData', BlockData)
 log = logging.getLogger(__name__)
 
+# The process-level caches of decoded structures, of their indexes and of
+# definitions, keyed by their ids, of course indexes, and of the BSON of
+# the snapshots deltas are stored against, created on first use.  None if
+# not enabled.
+_PROCESS_CACHES = {}
+
+# Maximum number of course indexes cached in each process.
+COURSE_INDEX_PROCESS_CACHE_MAX_COURSES = 1000
+
+# Cached in place of the index of a course that does not exist.
+_NO_COURSE_INDEX = u'no_course_index'
+
 
 def get_cache(alias):
     """
@@ -44,6 +62,119 @@ def get_cache(alias):
     return caches[alias]
 
 
+def get_structure_process_cache():
+    """
+    Returns the process-level cache of decoded structures, sized by their
+    number of blocks, or None if it is not enabled.
+    """
+    return _get_process_caches()['structures']
+
+
+def get_structure_index_process_cache():
+    """
+    Returns the process-level cache of the StructureIndexes of the structures
+    in the process-level cache of structures, sized by their number of blocks,
+    or None if it is not enabled.
+    """
+    return _get_process_caches()['structure_indexes']
+
+
+def get_definition_process_cache():
+    """
+    Returns the process-level cache of definitions, sized by their number,
+    or None if it is not enabled.
+    """
+    return _get_process_caches()['definitions']
+
+
+def clear_process_caches():
+    """
+    Removes all structures, structure indexes, definitions, course indexes
+    and snapshots from the process-level caches, and reads their settings
+    again on next use.
+    """
+    _PROCESS_CACHES.clear()
+
+
+def _get_process_caches():
+    """
+    Returns the process-level caches enabled by the
+    SPLIT_MONGO_PROCESS_CACHE_SETTINGS,
+    SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS and
+    SPLIT_MONGO_DELTA_STRUCTURES_SETTINGS settings, creating them on first
+    use.
+
+    Structures and definitions are never modified once written, so they
+    are cached without expiry.  The blocks of the structures handed out
+    are however modified (e.g. by cache_items, which loads the fields of
+    their definitions into them), so get_structure hands out copies of
+    them, see _copy_structure.  Definitions are not modified.
+    """
+    if not _PROCESS_CACHES:
+        cache_settings = getattr(settings, 'SPLIT_MONGO_PROCESS_CACHE_SETTINGS', {}) if DJANGO_AVAILABLE else {}
+        max_structure_blocks = cache_settings.get('MAX_STRUCTURE_BLOCKS', 0)
+        max_structure_index_blocks = cache_settings.get('MAX_STRUCTURE_INDEX_BLOCKS', 0)
+        max_definitions = cache_settings.get('MAX_DEFINITIONS', 0)
+        course_index_timeout = _course_index_cache_settings().get('PROCESS_CACHE_TIMEOUT', 0)
+        max_snapshot_bytes = _delta_structures_settings().get('SNAPSHOT_CACHE_MAX_BYTES', 0)
+        _PROCESS_CACHES.update(
+            structures=ProcessLRUCache(
+                max_size=max_structure_blocks,
+                sizeof=lambda structure: len(structure['blocks']),
+            ) if max_structure_blocks else None,
+            # indexes are built from the cached structures
+            structure_indexes=ProcessLRUCache(
+                max_size=max_structure_index_blocks,
+                sizeof=len,
+            ) if max_structure_index_blocks and max_structure_blocks else None,
+            definitions=ProcessLRUCache(
+                max_size=max_definitions,
+                sizeof=lambda definition: 1,
+            ) if max_definitions else None,
+            course_indexes=ProcessLRUCache(
+                max_size=COURSE_INDEX_PROCESS_CACHE_MAX_COURSES,
+                sizeof=lambda course_index: 1,
+                timeout=course_index_timeout,
+            ) if course_index_timeout else None,
+            snapshots=ProcessLRUCache(
+                max_size=max_snapshot_bytes,
+                sizeof=len,
+            ) if max_snapshot_bytes else None,
+        )
+    return _PROCESS_CACHES
+
+
+def _copy_structure(structure):
+    """
+    Returns a copy of the given structure whose blocks, along with their
+    fields and edit info, can be modified without changing the given one.
+
+    The values of the fields are not copied, which is what makes this much
+    cheaper than decoding the structure again.
+    """
+    blocks = {}
+    for block_key, block in six.iteritems(structure['blocks']):
+        block = copy.copy(block)
+        block.fields = dict(block.fields)
+        block.edit_info = copy.copy(block.edit_info)
+        blocks[block_key] = block
+    return dict(structure, blocks=blocks)
+
+
+def _course_index_cache_settings():
+    """
+    Returns the SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS setting.
+    """
+    return getattr(settings, 'SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS', {}) if DJANGO_AVAILABLE else {}
+
+
+def _delta_structures_settings():
+    """
+    Returns the SPLIT_MONGO_DELTA_STRUCTURES_SETTINGS setting.
+    """
+    return getattr(settings, 'SPLIT_MONGO_DELTA_STRUCTURES_SETTINGS', {}) if DJANGO_AVAILABLE else {}
+
+
 def round_power_2(value):
     """
     Return value rounded up to the nearest power of 2.
@@ -258,6 +389,107 @@ class CourseStructureCache(object):
             self.cache.set(key, compressed_pickled_data, None)
 
 
+class CourseIndexCache(object):
+    """
+    Cache of the course indexes (the head versions of the branches of
+    courses and libraries), keyed by course.
+
+    Indexes are cached for PROCESS_CACHE_TIMEOUT seconds in each process,
+    and for SHARED_CACHE_TIMEOUT seconds in the default django cache, as
+    set in the SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS setting.  A zero
+    timeout disables that tier.  Indexes must be deleted from the cache
+    when they change; processes other than the one making the change may
+    still serve the previous index from their own tier until it expires.
+
+    The shared tier keys indexes by a generation of the course, which
+    delete changes, and set caches the index under the generation that get
+    found.  So an index read from mongo before a change, but set after it
+    was deleted, is never served from the shared tier.
+    """
+    def __init__(self):
+        self.process_cache = _get_process_caches()['course_indexes']
+        self.shared_timeout = _course_index_cache_settings().get('SHARED_CACHE_TIMEOUT', 0)
+        self.shared_cache = None
+        if DJANGO_AVAILABLE and self.shared_timeout:
+            try:
+                self.shared_cache = get_cache('default')
+            except InvalidCacheBackendError:
+                pass
+        # The generation of each course in the shared tier, by cache key,
+        # as first read by this instance.
+        self._generations = {}
+
+    def get(self, course_key):
+        """
+        Returns a tuple of whether the index of the given course was cached
+        and, if so, a copy of that index (None if the course does not exist).
+        """
+        if self.process_cache is None and self.shared_cache is None:
+            return False, None
+
+        cache_key = self._cache_key(course_key)
+        with TIMER.timer("CourseIndexCache.get", course_key) as tagger:
+            course_index = self.process_cache.get(cache_key) if self.process_cache is not None else None
+            tagger.tag(from_process_cache=str(course_index is not None).lower())
+            if course_index is None and self.shared_cache is not None:
+                course_index = self.shared_cache.get(self._shared_cache_key(cache_key))
+                tagger.tag(from_shared_cache=str(course_index is not None).lower())
+                if course_index is not None and self.process_cache is not None:
+                    self.process_cache.set(cache_key, course_index)
+
+            if course_index is None:
+                return False, None
+            if course_index == _NO_COURSE_INDEX:
+                return True, None
+            # Callers may modify the index they are given.
+            return True, copy.deepcopy(course_index)
+
+    def set(self, course_key, course_index):
+        """
+        Caches the given index, or None if the course does not exist, for
+        the given course.
+        """
+        cache_key = self._cache_key(course_key)
+        cached_index = copy.deepcopy(course_index) if course_index is not None else _NO_COURSE_INDEX
+        if self.process_cache is not None:
+            self.process_cache.set(cache_key, cached_index)
+        if self.shared_cache is not None:
+            self.shared_cache.set(self._shared_cache_key(cache_key), cached_index, self.shared_timeout)
+
+    def delete(self, course_key):
+        """
+        Removes the index of the given course from the cache.
+        """
+        cache_key = self._cache_key(course_key)
+        if self.process_cache is not None:
+            self.process_cache.delete(cache_key)
+        if self.shared_cache is not None:
+            self.shared_cache.set(self._generation_cache_key(cache_key), uuid4().hex, None)
+            self._generations.pop(cache_key, None)
+
+    def _shared_cache_key(self, cache_key):
+        """
+        Returns the key of the index in the shared tier: the given cache key
+        with the generation of the course, as first found by this instance.
+        """
+        if cache_key not in self._generations:
+            generation_cache_key = self._generation_cache_key(cache_key)
+            generation = self.shared_cache.get(generation_cache_key)
+            if generation is None:
+                self.shared_cache.add(generation_cache_key, uuid4().hex, None)
+                generation = self.shared_cache.get(generation_cache_key)
+            self._generations[cache_key] = generation
+        return u"{}.{}".format(cache_key, self._generations[cache_key])
+
+    @staticmethod
+    def _cache_key(course_key):
+        return u"split_course_index.{}+{}+{}".format(course_key.org, course_key.course, course_key.run)
+
+    @staticmethod
+    def _generation_cache_key(cache_key):
+        return u"{}.generation".format(cache_key)
+
+
 class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
@@ -297,8 +529,17 @@ class MongoConnection(object):
         Get the structure from the persistence mechanism whose id is the given key.
 
         This method will use a cached version of the structure if it is available.
+        Structures from the process cache are copies, which callers may modify.
         """
         with TIMER.timer("get_structure", course_context) as tagger_get_structure:
+            process_cache = get_structure_process_cache()
+            if process_cache is not None:
+                structure = process_cache.get(key)
+                tagger_get_structure.tag(from_process_cache=str(structure is not None).lower())
+                tagger_get_structure.measure('process_cache_blocks', process_cache.size)
+                if structure is not None:
+                    return _copy_structure(structure)
+
             cache = CourseStructureCache()
 
             structure = cache.get(key, course_context)
@@ -315,12 +556,19 @@ class MongoConnection(object):
                             six.text_type(key)
                         )
                         return None
+                    tagger_find_one.tag(delta=str(delta_structures.is_delta(doc)).lower())
+                    doc = next(self._expand_deltas([doc], course_context), None)
+                    if doc is None:
+                        return None
                     tagger_find_one.measure("blocks", len(doc['blocks']))
                     structure = structure_from_mongo(doc, course_context)
                     tagger_find_one.sample_rate = 1
 
                 cache.set(key, structure, course_context)
 
+            if process_cache is not None:
+                tagger_get_structure.measure('process_cache_evictions', process_cache.set(key, structure))
+                return _copy_structure(structure)
             return structure
 
     @autoretry_read()
@@ -335,7 +583,7 @@ class MongoConnection(object):
             tagger.measure("requested_ids", len(ids))
             docs = [
                 structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({'_id': {'$in': ids}})
+                for structure in self._expand_deltas(self.structures.find({'_id': {'$in': ids}}), course_context)
             ]
             tagger.measure("structures", len(docs))
             return docs
@@ -351,12 +599,32 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_courselike_blocks_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
+            projection = {'blocks': {'$elemMatch': {'block_type': block_type}}, 'root': 1}
+            docs = list(self.structures.find({'_id': {'$in': ids}}, dict(projection, delta=1)))
+
+            # the block of a delta in which it did not change is in its snapshot
+            unchanged = [doc for doc in docs if delta_structures.is_delta(doc) and not doc.get('blocks')]
+            if unchanged:
+                snapshots = {
+                    snapshot['_id']: snapshot
+                    for snapshot in self.structures.find(
+                        {'_id': {'$in': list({doc['delta']['base'] for doc in unchanged})}}, projection
+                    )
+                }
+                for doc in unchanged:
+                    deleted = {tuple(block_key) for block_key in doc['delta']['deleted']}
+                    doc['blocks'] = [
+                        block
+                        for block in snapshots.get(doc['delta']['base'], {}).get('blocks', [])
+                        if (block['block_type'], block['block_id']) not in deleted
+                    ]
+
             docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find(
-                    {'_id': {'$in': ids}},
-                    {'blocks': {'$elemMatch': {'block_type': block_type}}, 'root': 1}
+                structure_from_mongo(
+                    {key: value for key, value in six.iteritems(doc) if key != delta_structures.DELTA_FIELD},
+                    course_context,
                 )
+                for doc in docs
             ]
             tagger.measure("structures", len(docs))
             return docs
@@ -373,7 +641,9 @@ class MongoConnection(object):
             tagger.measure("base_ids", len(ids))
             docs = [
                 structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({'previous_version': {'$in': ids}})
+                for structure in self._expand_deltas(
+                    self.structures.find({'previous_version': {'$in': ids}}), course_context
+                )
             ]
             tagger.measure("structures", len(docs))
             return docs
@@ -383,6 +653,9 @@ class MongoConnection(object):
         """
         Find all structures that originated from ``original_version`` that contain ``block_key``.
 
+        Of the structures stored as deltas, only those in which the block differs from
+        their snapshot are found, which include all those in which it was updated.
+
         Arguments:
             original_version (str or ObjectID): The id of a structure
             block_key (BlockKey): The id of the block in question
@@ -390,7 +663,7 @@ class MongoConnection(object):
         with TIMER.timer("find_ancestor_structures", course_context) as tagger:
             docs = [
                 structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({
+                for structure in self._expand_deltas(self.structures.find({
                     'original_version': original_version,
                     'blocks': {
                         '$elemMatch': {
@@ -401,7 +674,7 @@ class MongoConnection(object):
                             },
                         },
                     },
-                })
+                }), course_context)
             ]
             tagger.measure("structures", len(docs))
             return docs
@@ -412,7 +685,141 @@ class MongoConnection(object):
         """
         with TIMER.timer("insert_structure", course_context) as tagger:
             tagger.measure("blocks", len(structure["blocks"]))
-            self.structures.insert(structure_to_mongo(structure, course_context))
+            doc = structure_to_mongo(structure, course_context)
+            delta_settings = _delta_structures_settings()
+            if not delta_settings.get('ENABLED', False):
+                self.structures.insert(doc)
+                return
+
+            doc = self._make_delta(doc, delta_settings)
+            tagger.tag(delta=str(delta_structures.is_delta(doc)).lower())
+            self.structures.insert(doc)
+            if delta_structures.is_delta(doc):
+                tagger.measure("delta_blocks", len(doc['blocks']))
+            else:
+                # the next versions are likely to be stored against this snapshot
+                self._cache_snapshot(doc)
+
+    def _make_delta(self, doc, delta_settings):
+        """
+        Returns the document to store for the given structure document: either a delta
+        against the snapshot of its previous version, or the document itself to store it
+        as a new snapshot.
+        """
+        previous_version = doc.get('previous_version')
+        if previous_version is None:
+            return doc
+        previous = self.structures.find_one({'_id': previous_version}, {'delta.base': 1, 'delta.count': 1})
+        if previous is None:
+            return doc
+
+        if delta_structures.is_delta(previous):
+            base_id, count = previous['delta']['base'], previous['delta']['count'] + 1
+        else:
+            base_id, count = previous_version, 1
+        if count > delta_settings.get('MAX_DELTAS', 20):
+            return doc
+
+        snapshot = self._get_snapshots([base_id]).get(base_id)
+        if snapshot is None:
+            return doc
+        delta_doc = delta_structures.make_delta(
+            delta_structures.normalize(doc),
+            delta_structures.decode(snapshot),
+            count,
+            delta_settings.get('MAX_CHANGED_RATIO', 0.5),
+        )
+        return delta_doc if delta_doc is not None else doc
+
+    def _expand_deltas(self, docs, course_context=None):
+        """
+        Yields the full structure documents of the given structure documents, applying
+        those stored as deltas to their snapshots.
+        """
+        docs = list(docs)
+        snapshots = self._get_snapshots(
+            list({doc['delta']['base'] for doc in docs if delta_structures.is_delta(doc)})
+        )
+        for doc in docs:
+            if delta_structures.is_delta(doc):
+                snapshot = snapshots.get(doc['delta']['base'])
+                if snapshot is None:
+                    log.error(
+                        "the snapshot %s of structure %s is missing",
+                        six.text_type(doc['delta']['base']), six.text_type(doc['_id'])
+                    )
+                    continue
+                with TIMER.timer("apply_delta", course_context) as tagger:
+                    tagger.measure("blocks", len(doc['blocks']))
+                    doc = delta_structures.apply_delta(doc, delta_structures.decode(snapshot))
+            yield doc
+
+    def _get_snapshots(self, ids):
+        """
+        Returns a dict of the BSON of the snapshots with the given ids, by id, from the
+        process-level cache of snapshots where they are in it.
+        """
+        process_cache = _get_process_caches()['snapshots']
+        snapshots = {}
+        if process_cache is not None:
+            for _id in ids:
+                snapshot = process_cache.get(_id)
+                if snapshot is not None:
+                    snapshots[_id] = snapshot
+
+        missing_ids = [_id for _id in ids if _id not in snapshots]
+        if missing_ids:
+            for doc in self.structures.find({'_id': {'$in': missing_ids}}):
+                snapshots[doc['_id']] = self._cache_snapshot(doc)
+        return snapshots
+
+    def _cache_snapshot(self, doc):
+        """
+        Adds the given snapshot document to the process-level cache of snapshots, if
+        enabled, and returns its BSON.
+        """
+        snapshot = delta_structures.encode(doc)
+        process_cache = _get_process_caches()['snapshots']
+        if process_cache is not None:
+            process_cache.set(doc['_id'], snapshot)
+        return snapshot
+
+    def find_structure_links(self):
+        """
+        Returns a cursor over the ids, previous and original versions, edit times and
+        delta snapshots of all structures.
+        """
+        return self.structures.find(
+            {}, {'previous_version': 1, 'original_version': 1, 'edited_on': 1, 'delta.base': 1}
+        )
+
+    def find_course_versions(self):
+        """
+        Returns a cursor over the versions of all course indexes.
+        """
+        return self.course_index.find({}, {'versions': 1})
+
+    def find_source_library_versions(self):
+        """
+        Returns the set of the ids of the library structures which the blocks
+        of any structure reference as their source_library_version.
+        """
+        library_versions = set()
+        for structure in self.structures.find(
+                {'blocks.fields.source_library_version': {'$exists': True}},
+                {'blocks.fields.source_library_version': 1},
+        ):
+            for block in structure['blocks']:
+                library_version = block.get('fields', {}).get('source_library_version')
+                if library_version and ObjectId.is_valid(library_version):
+                    library_versions.add(ObjectId(library_version))
+        return library_versions
+
+    def delete_structures(self, ids):
+        """
+        Deletes the structures with the given ids.
+        """
+        self.structures.remove({'_id': {'$in': ids}})
 
     def get_course_index(self, key, ignore_case=False):
         """
@@ -534,7 +941,13 @@ class MongoConnection(object):
         Get the definition from the persistence mechanism whose id is the given key
         """
         with TIMER.timer("get_definition", course_context) as tagger:
-            definition = self.definitions.find_one({'_id': key})
+            process_cache = get_definition_process_cache()
+            definition = process_cache.get(key) if process_cache is not None else None
+            tagger.tag(from_process_cache=str(definition is not None).lower())
+            if definition is None:
+                definition = self.definitions.find_one({'_id': key})
+                if process_cache is not None and definition is not None:
+                    process_cache.set(key, definition)
             tagger.measure("fields", len(definition['fields']))
             tagger.tag(block_type=definition['block_type'])
             return definition
@@ -545,8 +958,25 @@ class MongoConnection(object):
         """
         with TIMER.timer("get_definitions", course_context) as tagger:
             tagger.measure('definitions', len(definitions))
-            definitions = self.definitions.find({'_id': {'$in': definitions}})
-            return definitions
+            process_cache = get_definition_process_cache()
+            if process_cache is None:
+                return self.definitions.find({'_id': {'$in': definitions}})
+
+            cached_definitions = []
+            missing_ids = []
+            for definition_id in definitions:
+                definition = process_cache.get(definition_id)
+                if definition is None:
+                    missing_ids.append(definition_id)
+                else:
+                    cached_definitions.append(definition)
+            tagger.measure('from_process_cache', len(cached_definitions))
+
+            if missing_ids:
+                for definition in self.definitions.find({'_id': {'$in': missing_ids}}):
+                    process_cache.set(definition['_id'], definition)
+                    cached_definitions.append(definition)
+            return cached_definitions
 
     def insert_definition(self, definition, course_context=None):
         """
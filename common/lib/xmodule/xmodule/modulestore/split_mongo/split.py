@@ -104,12 +104,14 @@ from xmodule.modulestore.exceptions import (
     VersionConflictError
 )
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
-from xmodule.modulestore.split_mongo.mongo_connection import DuplicateKeyError, MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import CourseIndexCache, DuplicateKeyError, MongoConnection
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.partitions.partitions_service import PartitionService
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
+from .inherited_settings import compute_inherited_settings
+from .structure_index import get_structure_index
 
 log = logging.getLogger(__name__)
 
@@ -144,6 +146,8 @@ class SplitBulkWriteRecord(BulkOpsRecord):
     def __init__(self):
         super(SplitBulkWriteRecord, self).__init__()
         self.initial_index = None
+        # Whether initial_index was read from the CourseIndexCache.
+        self.initial_index_cached = False
         self.index = None
         self.structures = {}
         self.structures_in_db = set()
@@ -249,8 +253,18 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
     def _start_outermost_bulk_operation(self, bulk_write_record, course_key, ignore_case=False):
         """
         Begin a bulk write operation on course_key.
+
+        The initial index is read through the CourseIndexCache, so that the
+        read-only bulk operations of the LMS don't read it from mongo.  Those
+        which write check that it was current before writing the index.
         """
-        bulk_write_record.initial_index = self.db_connection.get_course_index(course_key, ignore_case=ignore_case)
+        if ignore_case:
+            bulk_write_record.initial_index = self.db_connection.get_course_index(course_key, ignore_case=True)
+            bulk_write_record.initial_index_cached = False
+        else:
+            bulk_write_record.initial_index, bulk_write_record.initial_index_cached = (
+                self._get_course_index_through_cache(course_key)
+            )
         # Ensure that any edits to the index don't pollute the initial_index
         bulk_write_record.index = copy.deepcopy(bulk_write_record.initial_index)
         bulk_write_record.course_key = course_key
@@ -288,6 +302,16 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             dirty = True
 
+            if bulk_write_record.initial_index_cached:
+                current_index = self.db_connection.get_course_index(bulk_write_record.course_key)
+                if current_index != bulk_write_record.initial_index:
+                    # The changes were made to a stale version of the course.
+                    CourseIndexCache().delete(bulk_write_record.course_key)
+                    raise VersionConflictError(
+                        bulk_write_record.course_key,
+                        current_index.get('versions') if current_index is not None else None,
+                    )
+
             if bulk_write_record.initial_index is None:
                 self.db_connection.insert_course_index(bulk_write_record.index, bulk_write_record.course_key)
             else:
@@ -296,17 +320,34 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                     from_index=bulk_write_record.initial_index,
                     course_context=bulk_write_record.course_key
                 )
+            CourseIndexCache().delete(bulk_write_record.course_key)
 
         return dirty
 
     def get_course_index(self, course_key, ignore_case=False):
         """
         Return the index for course_key.
+
+        Outside of bulk operations, indexes are read through the
+        CourseIndexCache, except for case-insensitive lookups.
         """
         if self._is_in_bulk_operation(course_key, ignore_case):
             return self._get_bulk_ops_record(course_key, ignore_case).index
-        else:
+        elif ignore_case:
             return self.db_connection.get_course_index(course_key, ignore_case)
+        return self._get_course_index_through_cache(course_key)[0]
+
+    def _get_course_index_through_cache(self, course_key):
+        """
+        Returns the index for course_key, read through the CourseIndexCache,
+        and whether it came from the cache.
+        """
+        course_index_cache = CourseIndexCache()
+        found, index = course_index_cache.get(course_key)
+        if not found:
+            index = self.db_connection.get_course_index(course_key)
+            course_index_cache.set(course_key, index)
+        return index, found
 
     def delete_course_index(self, course_key):
         """
@@ -316,6 +357,7 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             self._clear_bulk_ops_record(course_key)
 
         self.db_connection.delete_course_index(course_key)
+        CourseIndexCache().delete(course_key)
 
     def insert_course_index(self, course_key, index_entry):
         bulk_write_record = self._get_bulk_ops_record(course_key)
@@ -323,6 +365,7 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             bulk_write_record.index = index_entry
         else:
             self.db_connection.insert_course_index(index_entry, course_key)
+            CourseIndexCache().delete(course_key)
 
     def update_course_index(self, course_key, updated_index_entry):
         """
@@ -337,6 +380,7 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             bulk_write_record.index = updated_index_entry
         else:
             self.db_connection.update_course_index(updated_index_entry, course_context=course_key)
+            CourseIndexCache().delete(course_key)
 
     def get_structure(self, course_key, version_guid):
         bulk_write_record = self._get_bulk_ops_record(course_key)
@@ -1324,12 +1368,23 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         path_cache = None
         parents_cache = None
 
+        # look up the blocks which may match in the indexes of the structure, where it has them
+        structure_index = self.get_structure_index(course_locator, course.structure)
+        candidates = None
+        if structure_index is not None:
+            candidates = structure_index.find_candidates(qualifiers, settings)
+        if candidates is None:
+            candidates = six.iterkeys(course.structure['blocks'])
+
         if not include_orphans:
             path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+            if structure_index is not None:
+                parents_cache = structure_index.parents
+            else:
+                parents_cache = self.build_block_key_to_parents_mapping(course.structure)
 
-        for block_id, value in six.iteritems(course.structure['blocks']):
-            if _block_matches_all(value):
+        for block_id in candidates:
+            if _block_matches_all(course.structure['blocks'][block_id]):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
                         block_id.type in DETACHED_XBLOCK_TYPES or
@@ -1380,7 +1435,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if parents_cache is None:
             xblock_parents = self._get_parents_from_structure(block_key, course.structure)
         else:
-            xblock_parents = parents_cache[block_key]
+            xblock_parents = parents_cache.get(block_key, [])
 
         if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
             # Found, xblock has the path to the root
@@ -1412,14 +1467,20 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        structure_index = self.get_structure_index(locator.course_key, course.structure)
+        if structure_index is not None:
+            parents_cache = structure_index.parents
+            all_parent_ids = parents_cache.get(BlockKey.from_usage_key(locator), [])
+        else:
+            parents_cache = None
+            all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
         parent_ids = [
             valid_parent
             for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
+            if self.has_path_to_root(valid_parent, course, parents_cache=parents_cache)
         ]
 
         if len(parent_ids) == 0:
@@ -1906,6 +1967,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if source_index is None:
             raise ItemNotFoundError("Cannot find a course at {0}. Aborting".format(source_course_id))
 
+        asset_copy_options = kwargs.pop('asset_copy_options', None)
         with self.bulk_operations(dest_course_id):
             new_course = self.create_course(
                 dest_course_id.org, dest_course_id.course, dest_course_id.run,
@@ -1917,7 +1979,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 **kwargs
             )
             # don't copy assets until we create the course in case something's awry
-            super(SplitMongoModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            super(SplitMongoModuleStore, self).clone_course(
+                source_course_id, dest_course_id, user_id, fields, asset_copy_options=asset_copy_options, **kwargs
+            )
             return new_course
 
     DEFAULT_ROOT_COURSE_BLOCK_ID = 'course'
@@ -2030,7 +2094,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 root_block.fields.update(self._serialize_fields(root_category, block_fields))
             if definition_fields is not None:
                 old_def = self.get_definition(locator, root_block.definition)
-                new_fields = old_def['fields']
+                # Copy the fields, as the definition may be cached.
+                new_fields = dict(old_def['fields'])
                 new_fields.update(definition_fields)
                 definition_id = self._update_definition_from_data(locator, old_def, new_fields, user_id).definition_id
                 root_block.definition = definition_id
@@ -2767,51 +2832,40 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         self._emit_course_deleted_signal(course_key)
 
-    @contract(block_map="dict(BlockKey: dict)", block_key=BlockKey)
+    @contract(block_map="dict(BlockKey: BlockData)", block_key=BlockKey)
     def inherit_settings(
         self, block_map, block_key, inherited_settings_map, inheriting_settings=None, inherited_from=None
-    ):
+    ):  # pylint: disable=unused-argument
         """
-        Updates block_data with any inheritable setting set by an ancestor and recurses to children.
-        """
-        if block_key not in block_map:
-            return
-        block_data = block_map[block_key]
+        Updates inherited_settings_map with the inheritable settings that block_key and its descendants
+        inherit from their ancestors, given that block_key inherits inheriting_settings.
 
-        if inheriting_settings is None:
-            inheriting_settings = {}
-
-        if inherited_from is None:
-            inherited_from = []
+        NOTE: this shows the values which all fields would have if inherited: i.e., not set to the
+        locally defined value but to value set by nearest ancestor who sets it. Children missing
+        from block_map (e.g., cross pointers, or pointers to privates left by migrations) are skipped.
+        inherited_from is no longer used: each block is only visited once, so cycles can't recurse.
+        """
+        for key, settings in six.iteritems(compute_inherited_settings(block_map, block_key, inheriting_settings)):
+            inherited_settings_map.setdefault(key, {}).update(settings)
 
-        # the currently passed down values take precedence over any previously cached ones
-        # NOTE: this should show the values which all fields would have if inherited: i.e.,
-        # not set to the locally defined value but to value set by nearest ancestor who sets it
-        inherited_settings_map.setdefault(block_key, {}).update(inheriting_settings)
+    def get_structure_index(self, course_key, structure):
+        """
+        Returns the StructureIndex of the blocks of the given structure, or None for structures
+        which are being edited, whose blocks may still change, or which are not indexed.
 
-        # update the inheriting w/ what should pass to children
-        inheriting_settings = inherited_settings_map[block_key].copy()
-        block_fields = block_data.fields
-        for field_name in inheritance.InheritanceMixin.fields:
-            if field_name in block_fields:
-                inheriting_settings[field_name] = block_fields[field_name]
+        The indexes of structures in the database are cached per structure id, as they never change.
+        """
+        if self._is_structure_being_edited(course_key, structure):
+            return None
+        return get_structure_index(structure['_id'])
 
-        for child in block_fields.get('children', []):
-            try:
-                if child in inherited_from:
-                    raise Exception(u'Infinite loop detected when inheriting to {}, having already inherited from {}'.format(child, inherited_from))
-                self.inherit_settings(
-                    block_map,
-                    BlockKey(*child),
-                    inherited_settings_map,
-                    inheriting_settings,
-                    inherited_from + [child]
-                )
-            except KeyError:
-                # here's where we need logic for looking up in other structures when we allow cross pointers
-                # but it's also getting this during course creation if creating top down w/ children set or
-                # migration where the old mongo published had pointers to privates
-                pass
+    def _is_structure_being_edited(self, course_key, structure):
+        """
+        Returns whether the given structure is being edited in an active bulk operation
+        on the given course, and so is not in the database yet.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        return bulk_write_record.active and structure['_id'] not in bulk_write_record.structures_in_db
 
     def descendants(self, block_map, block_id, depth, descendent_map):
         """
@@ -0,0 +1,189 @@
+"""
+Secondary indexes of the blocks of split structures, so that get_items
+queries with typical qualifiers (``category`` or a plain setting value)
+don't have to match every block of the course.
+
+Indexes are only built on first use and only narrow the blocks to
+match: get_items still matches each of the candidates they return
+against all of its qualifiers.  They are cached in each process, as
+set by MAX_STRUCTURE_INDEX_BLOCKS in SPLIT_MONGO_PROCESS_CACHE_SETTINGS.
+"""
+from __future__ import absolute_import
+
+from types import NoneType
+
+import six
+
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    get_structure_index_process_cache,
+    get_structure_process_cache
+)
+
+# The types of criteria which only match values equal to them, and so
+# can be looked up in an index.
+_INDEXABLE_CRITERIA_TYPES = six.string_types + six.integer_types + (bool, float, tuple, NoneType)
+
+
+class StructureIndex(object):
+    """
+    The indexes of the blocks of a structure by block type, by the
+    values of their settings and by child.
+    """
+    def __init__(self, structure):
+        self._blocks = structure['blocks']
+        self._positions = None
+        self._by_type = None
+        self._by_setting = {}
+        self._parents = None
+
+    def __len__(self):
+        return len(self._blocks)
+
+    @property
+    def parents(self):
+        """
+        A dict of the BlockKeys of the parents of each block, by BlockKey.
+        Blocks without a parent are not in it.
+        """
+        if self._parents is None:
+            self._parents = {}
+            for parent_key, block_data in six.iteritems(self._blocks):
+                for child_key in block_data.fields.get('children', []):
+                    parents = self._parents.setdefault(child_key, [])
+                    if parent_key not in parents:
+                        parents.append(parent_key)
+        return self._parents
+
+    def blocks_of_type(self, block_type):
+        """
+        Returns the BlockKeys of the blocks of the given type.
+        """
+        if self._by_type is None:
+            self._by_type = {}
+            for block_key in self._blocks:
+                self._by_type.setdefault(block_key.type, []).append(block_key)
+        return self._by_type.get(block_type, [])
+
+    def blocks_with_setting(self, field_name, value):
+        """
+        Returns the BlockKeys of the blocks which set the given field to the
+        given value or to a list containing it.
+        """
+        if field_name not in self._by_setting:
+            index = {}
+            for block_key, block_data in six.iteritems(self._blocks):
+                if field_name in block_data.fields:
+                    for field_value in _flatten(block_data.fields[field_name]):
+                        block_keys = index.setdefault(field_value, [])
+                        if not block_keys or block_keys[-1] != block_key:
+                            block_keys.append(block_key)
+            self._by_setting[field_name] = index
+        return self._by_setting[field_name].get(value, [])
+
+    def find_candidates(self, qualifiers, settings):
+        """
+        Returns the BlockKeys of the blocks which may match the given get_items
+        qualifiers (on the BlockData) and settings (on its fields), in the order of
+        the structure's blocks, or None if none of them can be looked up.
+        """
+        candidates = [
+            self._lookup(self.blocks_of_type, criteria)
+            for key, criteria in six.iteritems(qualifiers) if key == 'block_type'
+        ]
+        candidates.extend(
+            self._lookup(lambda value, field_name=field_name: self.blocks_with_setting(field_name, value), criteria)
+            for field_name, criteria in six.iteritems(settings)
+        )
+        candidates = [block_keys for block_keys in candidates if block_keys is not None]
+        if not candidates:
+            return None
+
+        candidates.sort(key=len)
+        others = [set(block_keys) for block_keys in candidates[1:]]
+        return [block_key for block_key in candidates[0] if all(block_key in other for other in others)]
+
+    def _lookup(self, get_blocks, criteria):
+        """
+        Returns the BlockKeys of the blocks that get_blocks returns for the values the
+        given criteria may match, or None if the criteria can't be looked up.
+        """
+        if isinstance(criteria, dict) and list(criteria) == ['$in']:
+            values = criteria['$in']
+        else:
+            values = [criteria]
+        if not all(_is_indexable(value) for value in values):
+            return None
+
+        if len(values) == 1:
+            return get_blocks(values[0])
+        block_keys = set()
+        for value in values:
+            block_keys.update(get_blocks(value))
+        return sorted(block_keys, key=self._position)
+
+    def _position(self, block_key):
+        """
+        Returns the position of the given block among the blocks of the structure.
+        """
+        if self._positions is None:
+            self._positions = {block_key: position for position, block_key in enumerate(self._blocks)}
+        return self._positions[block_key]
+
+
+def _is_indexable(criteria):
+    """
+    Returns whether the given get_items criteria only matches values equal to it.
+    """
+    if not isinstance(criteria, _INDEXABLE_CRITERIA_TYPES):
+        return False
+    try:
+        hash(criteria)
+    except TypeError:
+        return False
+    return True
+
+
+def _flatten(value):
+    """
+    Yields the hashable values that get_items criteria equal to them match in the
+    given field value: the value itself or, for lists, each of their elements.
+    """
+    if isinstance(value, list):
+        for element in value:
+            for flattened in _flatten(element):
+                yield flattened
+    else:
+        try:
+            hash(value)
+        except TypeError:
+            # unhashable values (e.g. dicts) never equal an indexable criteria
+            return
+        yield value
+
+
+def get_structure_index(structure_id):
+    """
+    Returns the StructureIndex of the persisted structure with the given id,
+    creating it only once per structure id, or None if the indexes are not
+    enabled or the structure is not in the process-level cache of structures.
+
+    Indexes are built from the blocks of the cached structure, which are
+    never modified, rather than from the copies of them that callers are
+    given and may modify (see MongoConnection.get_structure).
+
+    Structures that are being edited (those of an active bulk operation
+    that are not in the database yet) must not be indexed, since their
+    blocks may still change.
+    """
+    index_cache = get_structure_index_process_cache()
+    if index_cache is None:
+        return None
+
+    structure_index = index_cache.get(structure_id)
+    if structure_index is None:
+        structure = get_structure_process_cache().get(structure_id)
+        if structure is None:
+            return None
+        structure_index = StructureIndex(structure)
+        index_cache.set(structure_id, structure_index)
+    return structure_index
@@ -12,10 +12,12 @@ from uuid import uuid4
 
 import ddt
 import path
+from mock import Mock, patch
 from opaque_keys.edx.keys import AssetKey
 from opaque_keys.edx.locator import AssetLocator, CourseLocator
 
 from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore import mongo
 from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -53,13 +55,13 @@ class TestContentstore(unittest.TestCase):
             del CourseLocator.deprecated
         return super(TestContentstore, cls).tearDownClass()
 
-    def set_up_assets(self, deprecated):
+    def set_up_assets(self, deprecated, content_addressed=False):
         """
         Setup contentstore w/ proper overriding of deprecated.
         """
         # since MongoModuleStore and MongoContentStore are basically assumed to be together, create this class
         # as well
-        self.contentstore = MongoContentStore(HOST, DB, port=PORT)
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, content_addressed=content_addressed)
         self.addCleanup(self.contentstore._drop_database)  # pylint: disable=protected-access
 
         AssetLocator.deprecated = deprecated
@@ -199,6 +201,98 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_copy_assets_streaming(self, deprecated):
+        """
+        copy_all_course_assets, chunk by chunk
+        """
+        # a chunk size smaller than the files gives them several chunks, copied in several batches
+        with patch('gridfs.grid_file.DEFAULT_CHUNK_SIZE', 1024):
+            self.set_up_assets(deprecated)
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        progress_callback = Mock()
+        with patch.object(mongo, 'COPY_CHUNKS_BATCH_SIZE', 2):
+            self.contentstore.copy_all_course_assets(
+                self.course1_key, dest_course, streaming=True, max_workers=2, progress_callback=progress_callback
+            )
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            dest_key = dest_course.make_asset_key('asset', filename)
+            source = self.contentstore.find(asset_key)
+            copied = self.contentstore.find(dest_key)
+            for propname in ['name', 'content_type', 'length', 'locked', 'content_digest', 'data']:
+                self.assertEqual(getattr(source, propname), getattr(copied, propname))
+
+        __, count = self.contentstore.get_all_content_for_course(dest_course)
+        self.assertEqual(count, len(self.course1_files))
+        total = len(self.course1_files)
+        self.assertEqual(
+            [call[0] for call in progress_callback.call_args_list],
+            [(copied, total) for copied in range(1, total + 1)],
+        )
+
+    @ddt.data(True, False)
+    def test_content_addressed(self, deprecated):
+        """
+        Test that assets with the same content share a blob, which is kept until no asset refers to it
+        """
+        self.set_up_assets(deprecated, content_addressed=True)
+        # picture1.jpg is in both courses
+        shared_blob_ids = set(
+            self.contentstore.get_attr(course_key.make_asset_key('asset', 'picture1.jpg'), 'blob_id')
+            for course_key in (self.course1_key, self.course2_key)
+        )
+        self.assertEqual(len(shared_blob_ids), 1)
+        shared_blob_id = shared_blob_ids.pop()
+        self.assertEqual(self.contentstore.blob_files.find_one({'_id': shared_blob_id})['refcount'], 2)
+        self.assertEqual(self.contentstore.blob_files.count(), 5)
+        self.assertEqual(self.contentstore.chunks.count(), 0)
+
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            with open("{}/static/{}".format(DATA_DIR, filename), "rb") as f:
+                data = f.read()
+            self.assertEqual(self.contentstore.find(asset_key).data, data)
+            self.assertEqual(b''.join(self.contentstore.find(asset_key, as_stream=True).stream_data()), data)
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assertEqual(self.contentstore.blob_files.count(), 5)
+        self.assertEqual(self.contentstore.blob_files.find_one({'_id': shared_blob_id})['refcount'], 3)
+        dest_key = dest_course.make_asset_key('asset', 'picture1.jpg')
+        self.assertEqual(
+            self.contentstore.find(dest_key).data,
+            self.contentstore.find(self.course1_key.make_asset_key('asset', 'picture1.jpg')).data,
+        )
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.contentstore.delete_all_course_assets(self.course2_key)
+        self.assertEqual(self.contentstore.blob_files.find_one({'_id': shared_blob_id})['refcount'], 1)
+        self.assertEqual(self.contentstore.find(dest_key).length, len(self.contentstore.find(dest_key).data))
+
+        self.contentstore.delete_all_course_assets(dest_course)
+        self.assertEqual(self.contentstore.blob_files.count(), 0)
+        self.assertEqual(self.contentstore.blob_chunks.count(), 0)
+
+    @ddt.data(True, False)
+    def test_copy_released_blob(self, deprecated):
+        """
+        Test that copying an asset whose blob is being deleted copies its data rather than referencing it
+        """
+        self.set_up_assets(deprecated, content_addressed=True)
+        asset_key = self.course1_key.make_asset_key('asset', 'picture1.jpg')
+        blob_id = self.contentstore.get_attr(asset_key, 'blob_id')
+        # as _release_blob leaves it before removing it
+        self.contentstore.blob_files.update({'_id': blob_id}, {'$set': {'refcount': 0}})
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        dest_key = dest_course.make_asset_key('asset', 'picture1.jpg')
+        self.assertIsNone(self.contentstore.get_attr(dest_key, 'blob_id'))
+        self.assertEqual(self.contentstore.blob_files.find_one({'_id': blob_id})['refcount'], 0)
+        self.assertEqual(self.contentstore.find(dest_key).data, self.contentstore.find(asset_key).data)
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
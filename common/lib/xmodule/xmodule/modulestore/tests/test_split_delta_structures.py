@@ -0,0 +1,88 @@
+""" Test the storage of split_mongo structures as deltas """
+from __future__ import absolute_import
+
+import datetime
+import unittest
+
+from bson.objectid import ObjectId
+from pytz import UTC
+
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.delta_structures import apply_delta, is_delta, make_delta, normalize
+
+
+class TestDeltaStructures(unittest.TestCase):
+    """ Test make_delta and apply_delta against small structure documents """
+
+    def setUp(self):
+        super(TestDeltaStructures, self).setUp()
+        self.base_doc = normalize(self._structure_doc([
+            self._block('course', 'course', children=[['chapter', 'chapter1'], ['chapter', 'chapter2']]),
+            self._block('chapter', 'chapter1', display_name='Chapter 1'),
+            self._block('chapter', 'chapter2', display_name='Chapter 2'),
+            self._block('chapter', 'chapter3', display_name='Chapter 3'),
+        ]))
+
+    def _block(self, block_type, block_id, **fields):
+        """
+        Returns the document of a block with the given fields.
+        """
+        return {
+            'block_type': block_type,
+            'block_id': block_id,
+            'definition': ObjectId(),
+            'fields': fields,
+            'edit_info': {'edited_on': datetime.datetime(2019, 1, 1, 0, 0, 0, 123456, tzinfo=UTC)},
+        }
+
+    def _structure_doc(self, blocks):
+        """
+        Returns the document of a structure with the given blocks.
+        """
+        return {'_id': ObjectId(), 'root': BlockKey('course', 'course'), 'blocks': blocks}
+
+    def _edited_doc(self):
+        """
+        Returns a normalized structure document with one block of the base changed,
+        one deleted and one added.
+        """
+        blocks = [dict(block) for block in self.base_doc['blocks'] if block['block_id'] != 'chapter3']
+        blocks[1]['fields'] = {'display_name': 'Chapter one'}
+        blocks.append(normalize(self._block('chapter', 'chapter4')))
+        return normalize(self._structure_doc(blocks))
+
+    def test_make_delta(self):
+        delta_doc = make_delta(self._edited_doc(), self.base_doc, 3, 1)
+
+        self.assertTrue(is_delta(delta_doc))
+        self.assertFalse(is_delta(self.base_doc))
+        self.assertEqual([block['block_id'] for block in delta_doc['blocks']], ['chapter1', 'chapter4'])
+        self.assertEqual(
+            delta_doc['delta'],
+            {'base': self.base_doc['_id'], 'count': 3, 'deleted': [['chapter', 'chapter3']]},
+        )
+
+    def test_too_many_changes(self):
+        self.assertIsNone(make_delta(self._edited_doc(), self.base_doc, 1, 0.5))
+
+    def test_apply_delta(self):
+        doc = self._edited_doc()
+        delta_doc = make_delta(doc, self.base_doc, 1, 1)
+
+        applied_doc = apply_delta(delta_doc, normalize(self.base_doc))
+        self.assertNotIn('delta', applied_doc)
+        self.assertEqual(
+            sorted(applied_doc['blocks'], key=lambda block: block['block_id']),
+            sorted(doc['blocks'], key=lambda block: block['block_id']),
+        )
+        self.assertEqual(dict(applied_doc, blocks=None), dict(doc, blocks=None))
+
+    def test_normalized_blocks_unchanged(self):
+        # tuples and microseconds, which mongo does not store, don't make blocks differ
+        doc = self._structure_doc([dict(block) for block in self.base_doc['blocks']])
+        doc['blocks'][0] = dict(
+            doc['blocks'][0],
+            fields={'children': [BlockKey('chapter', 'chapter1'), BlockKey('chapter', 'chapter2')]},
+            edit_info={'edited_on': datetime.datetime(2019, 1, 1, 0, 0, 0, 123456, tzinfo=UTC)},
+        )
+        self.assertEqual(make_delta(normalize(doc), self.base_doc, 1, 1)['blocks'], [])
@@ -0,0 +1,64 @@
+""" Test the computation of split_mongo inherited settings """
+from __future__ import absolute_import
+
+import unittest
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.inherited_settings import compute_inherited_settings
+
+
+class TestInheritedSettings(unittest.TestCase):
+    """ Test compute_inherited_settings against a small tree """
+
+    def setUp(self):
+        super(TestInheritedSettings, self).setUp()
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'chapter')
+        self.sequential = BlockKey('sequential', 'sequential')
+        self.problem = BlockKey('problem', 'problem')
+        self.other_problem = BlockKey('problem', 'other_problem')
+        self.block_map = {
+            self.course: self._block_data([self.chapter], start='2019-01-01', graded=False),
+            self.chapter: self._block_data([self.sequential]),
+            self.sequential: self._block_data(
+                [self.problem, self.other_problem, BlockKey('problem', 'missing')],
+                graded=True,
+                display_name='Not inheritable',
+            ),
+            self.problem: self._block_data([], start='2019-02-01'),
+            self.other_problem: self._block_data([]),
+        }
+
+    def _block_data(self, children, **fields):
+        """
+        Returns the BlockData of a block with the given children and fields.
+        """
+        fields['children'] = [list(child) for child in children]
+        return BlockData(block_type='block', fields=fields)
+
+    def test_nearest_ancestor_setting(self):
+        inherited_settings = compute_inherited_settings(self.block_map, self.course)
+
+        self.assertEqual(dict(inherited_settings[self.course]), {})
+        self.assertEqual(dict(inherited_settings[self.chapter]), {'start': '2019-01-01', 'graded': False})
+        self.assertEqual(dict(inherited_settings[self.problem]), {'start': '2019-01-01', 'graded': True})
+        self.assertNotIn('display_name', inherited_settings[self.problem])
+        self.assertNotIn(BlockKey('problem', 'missing'), inherited_settings)
+
+    def test_shared_layers(self):
+        inherited_settings = compute_inherited_settings(self.block_map, self.course)
+
+        # blocks whose parent sets no inheritable field share its layer
+        self.assertIs(inherited_settings[self.sequential], inherited_settings[self.chapter])
+        self.assertIs(inherited_settings[self.problem], inherited_settings[self.other_problem])
+
+    def test_root_settings(self):
+        inherited_settings = compute_inherited_settings(self.block_map, self.chapter, {'due': '2019-03-01'})
+        self.assertEqual(dict(inherited_settings[self.problem]), {'due': '2019-03-01', 'graded': True})
+        self.assertNotIn(self.course, inherited_settings)
+
+    def test_cycle(self):
+        self.block_map[self.problem].fields['children'] = [list(self.course)]
+        inherited_settings = compute_inherited_settings(self.block_map, self.course)
+        self.assertEqual(len(inherited_settings), len(self.block_map))
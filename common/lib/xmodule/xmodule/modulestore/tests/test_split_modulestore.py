@@ -15,6 +15,7 @@ import six
 from ccx_keys.locator import CCXBlockUsageLocator
 from contracts import contract
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test.utils import override_settings
 from mock import patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId, VersionTree
 from path import Path as path
@@ -36,6 +37,11 @@ from xmodule.modulestore.exceptions import (
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    CourseIndexCache,
+    clear_process_caches,
+    get_structure_process_cache
+)
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -1004,6 +1010,39 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @override_settings(SPLIT_MONGO_PROCESS_CACHE_SETTINGS={'MAX_STRUCTURE_BLOCKS': 1000, 'MAX_DEFINITIONS': 1000})
+    def test_process_cache(self):
+        clear_process_caches()
+        self.addCleanup(clear_process_caches)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the decoded structure is served from the process cache, even though
+        # the course structure cache is a dummy cache
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        self.assertEqual(cached_structure, not_cached_structure)
+        self.assertEqual(get_structure_process_cache().size, len(cached_structure['blocks']))
+
+        # the blocks handed out are copies, so modifying them leaves the cached ones unchanged
+        root_block = cached_structure['blocks'][cached_structure['root']]
+        root_block.fields['display_name'] = 'modified'
+        root_block.definition_loaded = True
+        root_block.edit_info._subtree_edited_by = self.user  # pylint: disable=protected-access
+        with check_mongo_calls(0):
+            cached_root_block = self._get_structure(self.new_course)['blocks'][cached_structure['root']]
+        self.assertNotEqual(cached_root_block.fields.get('display_name'), 'modified')
+        self.assertFalse(cached_root_block.definition_loaded)
+        self.assertIsNone(cached_root_block.edit_info._subtree_edited_by)  # pylint: disable=protected-access
+
+        root_block = cached_structure['blocks'][cached_structure['root']]
+        with check_mongo_calls(1):
+            definition = modulestore().db_connection.get_definition(root_block.definition)
+        with check_mongo_calls(0):
+            self.assertEqual(modulestore().db_connection.get_definitions([root_block.definition]), [definition])
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1013,6 +1052,150 @@ class TestCourseStructureCache(SplitModuleTest):
         )
 
 
+@override_settings(SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS={'PROCESS_CACHE_TIMEOUT': 60})
+class TestCourseIndexCache(SplitModuleTest):
+    """Tests for the CourseIndexCache"""
+
+    def setUp(self):
+        super(TestCourseIndexCache, self).setUp()
+        clear_process_caches()
+        self.addCleanup(clear_process_caches)
+        self.user = random.getrandbits(32)
+        self.new_course = modulestore().create_course('org', 'course', 'test_run', self.user, BRANCH_NAME_DRAFT)
+        self.course_key = self.new_course.id.replace(branch=None)
+
+    def test_cached_until_updated(self):
+        with check_mongo_calls(1):
+            index = modulestore().get_course_index(self.course_key)
+        with check_mongo_calls(0):
+            self.assertEqual(modulestore().get_course_index(self.course_key), index)
+
+        index['search_targets'] = {'wiki_slug': 'cached'}
+        modulestore().update_course_index(self.course_key, index)
+        with check_mongo_calls(1):
+            self.assertEqual(
+                modulestore().get_course_index(self.course_key)['search_targets'],
+                {'wiki_slug': 'cached'},
+            )
+
+    def test_cached_copy(self):
+        modulestore().get_course_index(self.course_key)['versions'] = {}
+        self.assertNotEqual(modulestore().get_course_index(self.course_key)['versions'], {})
+
+    def test_missing_course(self):
+        course_key = CourseLocator(org='org', course='missing', run='run')
+        with check_mongo_calls(1):
+            self.assertIsNone(modulestore().get_course_index(course_key))
+        with check_mongo_calls(0):
+            self.assertIsNone(modulestore().get_course_index(course_key))
+
+    def test_read_only_bulk_operation(self):
+        index = modulestore().get_course_index(self.course_key)
+        with check_mongo_calls(0):
+            with modulestore().bulk_operations(self.course_key):
+                self.assertEqual(modulestore().get_course_index(self.course_key), index)
+
+    def test_bulk_operation_on_stale_index(self):
+        index = modulestore().get_course_index(self.course_key)
+        # another process updates the index, which this process still has cached
+        index['search_targets'] = {'wiki_slug': 'current'}
+        modulestore().db_connection.update_course_index(index)
+
+        with self.assertRaises(VersionConflictError):
+            with modulestore().bulk_operations(self.course_key):
+                stale_index = modulestore().get_course_index(self.course_key)
+                stale_index['search_targets'] = {'wiki_slug': 'stale'}
+                modulestore().update_course_index(self.course_key, stale_index)
+        self.assertEqual(
+            modulestore().db_connection.get_course_index(self.course_key)['search_targets'],
+            {'wiki_slug': 'current'},
+        )
+
+    @override_settings(SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS={'SHARED_CACHE_TIMEOUT': 60})
+    def test_shared_cache_set_after_delete(self):
+        clear_process_caches()
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+
+        # an index read before the course changed is cached after the change deleted it
+        reader = CourseIndexCache()
+        self.assertEqual(reader.get(self.course_key), (False, None))
+        stale_index = modulestore().db_connection.get_course_index(self.course_key)
+        CourseIndexCache().delete(self.course_key)
+        reader.set(self.course_key, stale_index)
+
+        self.assertEqual(CourseIndexCache().get(self.course_key), (False, None))
+        writer = CourseIndexCache()
+        writer.get(self.course_key)
+        writer.set(self.course_key, stale_index)
+        self.assertEqual(CourseIndexCache().get(self.course_key), (True, stale_index))
+
+
+@override_settings(SPLIT_MONGO_DELTA_STRUCTURES_SETTINGS={'ENABLED': True, 'MAX_DELTAS': 2, 'MAX_CHANGED_RATIO': 10})
+class TestDeltaStructures(SplitModuleTest):
+    """Tests for storing structures as deltas against a snapshot"""
+
+    def setUp(self):
+        super(TestDeltaStructures, self).setUp()
+        clear_process_caches()
+        self.addCleanup(clear_process_caches)
+        self.course = modulestore().create_course(
+            'org', 'delta', 'run', 'testbot', BRANCH_NAME_DRAFT, fields={'display_name': 'delta course'}
+        )
+        self.course_version = self.course.location.as_object_id(self.course.location.version_guid)
+        self.chapter = modulestore().create_child(
+            'testbot', self.course.location, block_type='chapter', block_id='chapter',
+            fields={'display_name': 'chapter'},
+        )
+        self.chapter_key = BlockKey('chapter', 'chapter')
+
+    def _stored_structure(self, structure_id):
+        """
+        Returns the document of the given structure, as stored in mongo.
+        """
+        return modulestore().db_connection.structures.find_one({'_id': structure_id})
+
+    def _update_chapter(self, display_name):
+        """
+        Updates the display_name of the chapter, and returns the id of the new structure.
+        """
+        self.chapter.display_name = display_name
+        self.chapter = modulestore().update_item(self.chapter, 'testbot')
+        return self.chapter.update_version
+
+    def test_stored_as_deltas(self):
+        versions = [self.chapter.update_version] + [
+            self._update_chapter(display_name) for display_name in ('first', 'second', 'third')
+        ]
+        docs = [self._stored_structure(version) for version in versions]
+
+        self.assertNotIn('delta', self._stored_structure(self.course_version))
+        # a new snapshot is stored after MAX_DELTAS deltas
+        self.assertEqual([doc.get('delta', {}).get('count') for doc in docs], [1, 2, None, 1])
+        self.assertEqual(docs[0]['delta']['base'], self.course_version)
+        self.assertEqual(docs[3]['delta']['base'], versions[2])
+        # only the blocks changed since the snapshot are stored
+        self.assertEqual([block['block_id'] for block in docs[3]['blocks']], ['chapter'])
+        self.assertEqual(docs[3]['delta']['deleted'], [])
+
+    def test_read_from_deltas(self):
+        version = self._update_chapter('updated')
+        clear_process_caches()
+
+        structure = modulestore().db_connection.find_structures_by_id([version])[0]
+        self.assertEqual(set(structure['blocks']), {structure['root'], self.chapter_key})
+        self.assertEqual(structure['blocks'][self.chapter_key].fields['display_name'], 'updated')
+        course_summaries = modulestore().get_course_summaries(BRANCH_NAME_DRAFT)
+        self.assertIn('delta course', [course_summary.display_name for course_summary in course_summaries])
+
+        modulestore().delete_item(self.chapter.location, 'testbot')
+        course = modulestore().get_course(self.course.id.for_branch(BRANCH_NAME_DRAFT))
+        version = course.location.as_object_id(course.location.version_guid)
+        self.assertIn('delta', self._stored_structure(version))
+        structure = modulestore().db_connection.find_structures_by_id([version])[0]
+        self.assertEqual(set(structure['blocks']), {structure['root']})
+
+
 class SplitModuleItemTests(SplitModuleTest):
     '''
     Item read tests including inheritance
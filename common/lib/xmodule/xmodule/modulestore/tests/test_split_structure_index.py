@@ -0,0 +1,105 @@
+""" Test the indexes of split_mongo structures """
+from __future__ import absolute_import
+
+import re
+import unittest
+
+from bson.objectid import ObjectId
+from django.test.utils import override_settings
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import clear_process_caches, get_structure_process_cache
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, get_structure_index
+
+
+class TestStructureIndex(unittest.TestCase):
+    """ Test StructureIndex against a small structure """
+
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'chapter')
+        self.problem = BlockKey('problem', 'problem')
+        self.other_problem = BlockKey('problem', 'other_problem')
+        self.html = BlockKey('html', 'html')
+        self.structure = {
+            '_id': ObjectId(),
+            'root': self.course,
+            'blocks': {
+                self.course: self._block_data([self.chapter]),
+                self.chapter: self._block_data(
+                    [self.problem, self.other_problem, self.html, self.problem],
+                    graded=True,
+                ),
+                self.problem: self._block_data([], graded=True, group_access={'1': [2]}),
+                self.other_problem: self._block_data([], graded=False, tags=['a', 'b']),
+                self.html: self._block_data([], tags=['b']),
+            },
+        }
+        self.index = StructureIndex(self.structure)
+
+    def _block_data(self, children, **fields):
+        """
+        Returns the BlockData of a block with the given children and fields.
+        """
+        fields['children'] = children
+        return BlockData(block_type='block', fields=fields)
+
+    def test_blocks_of_type(self):
+        self.assertEqual(set(self.index.blocks_of_type('problem')), {self.problem, self.other_problem})
+        self.assertEqual(self.index.blocks_of_type('video'), [])
+
+    def test_blocks_with_setting(self):
+        self.assertEqual(set(self.index.blocks_with_setting('graded', True)), {self.chapter, self.problem})
+        self.assertEqual(self.index.blocks_with_setting('graded', False), [self.other_problem])
+        self.assertEqual(set(self.index.blocks_with_setting('tags', 'b')), {self.other_problem, self.html})
+        self.assertEqual(self.index.blocks_with_setting('group_access', 'a'), [])
+        self.assertEqual(self.index.blocks_with_setting('children', self.problem), [self.chapter])
+
+    def test_parents(self):
+        self.assertEqual(self.index.parents[self.problem], [self.chapter])
+        self.assertNotIn(self.course, self.index.parents)
+
+    def test_find_candidates(self):
+        self.assertEqual(
+            set(self.index.find_candidates({'block_type': 'problem'}, {'graded': True})),
+            {self.problem},
+        )
+        self.assertEqual(
+            set(self.index.find_candidates({'block_type': {'$in': ['html', 'chapter']}}, {})),
+            {self.chapter, self.html},
+        )
+        self.assertEqual(
+            set(self.index.find_candidates({}, {'tags': 'b', 'graded': re.compile('.')})),
+            {self.other_problem, self.html},
+        )
+        self.assertIsNone(self.index.find_candidates({'block_type': re.compile('prob')}, {}))
+        self.assertIsNone(self.index.find_candidates({}, {'graded': {'$exists': True}}))
+
+    def test_candidates_in_block_order(self):
+        blocks = list(self.structure['blocks'])
+        candidates = self.index.find_candidates({'block_type': {'$in': ['problem', 'html', 'course']}}, {})
+        self.assertEqual(candidates, [block_key for block_key in blocks if block_key in set(candidates)])
+
+    @override_settings(
+        SPLIT_MONGO_PROCESS_CACHE_SETTINGS={'MAX_STRUCTURE_BLOCKS': 10, 'MAX_STRUCTURE_INDEX_BLOCKS': 10},
+    )
+    def test_cached_per_structure(self):
+        clear_process_caches()
+        self.addCleanup(clear_process_caches)
+
+        # only the structures in the process cache are indexed
+        self.assertIsNone(get_structure_index(self.structure['_id']))
+        get_structure_process_cache().set(self.structure['_id'], self.structure)
+        structure_index = get_structure_index(self.structure['_id'])
+        self.assertEqual(len(structure_index), len(self.structure['blocks']))
+        self.assertIs(get_structure_index(self.structure['_id']), structure_index)
+
+    @override_settings(SPLIT_MONGO_PROCESS_CACHE_SETTINGS={'MAX_STRUCTURE_BLOCKS': 10})
+    def test_not_enabled(self):
+        clear_process_caches()
+        self.addCleanup(clear_process_caches)
+
+        get_structure_process_cache().set(self.structure['_id'], self.structure)
+        self.assertIsNone(get_structure_index(self.structure['_id']))
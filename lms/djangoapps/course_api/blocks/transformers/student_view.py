@@ -12,6 +12,7 @@ class StudentViewTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
     STUDENT_VIEW_DATA = 'student_view_data'
     STUDENT_VIEW_MULTI_DEVICE = 'student_view_multi_device'
 
@@ -31,44 +32,66 @@ class StudentViewTransformer(BlockStructureTransformer):
         block_structure.request_xblock_fields('category')
 
         for block_key in block_structure.topological_traversal():
-            block = block_structure.get_xblock(block_key)
+            cls._collect_block(block_structure, block_key)
 
-            # We're iterating through descriptors (not bound to a user) that are
-            # given to us by the modulestore. The reason we look at
-            # block.__class__ is to avoid the XModuleDescriptor -> XModule
-            # proxying that would happen if we just examined block directly,
-            # since it's likely that student_view() is going to be defined on
-            # the XModule side.
-            #
-            # If that proxying happens, this method will throw an
-            # UndefinedContext exception, because we haven't initialized any of
-            # the user-specific context.
-            #
-            # This isn't a problem for pure XBlocks, because it's all in one
-            # class, and there's no proxying. So basically, if you encounter a
-            # problem where your particular XModule explodes here (and don't
-            # have the time to convert it to an XBlock), please try refactoring
-            # so that you declare your student_view() method in a common
-            # ancestor class of both your Descriptor and Module classes. As an
-            # example, I changed the name of HtmlFields to HtmlBlock and moved
-            # student_view() from HtmlModuleMixin to HtmlBlock.
-            student_view = getattr(block.__class__, 'student_view', None)
-            supports_multi_device = block.has_support(student_view, 'multi_device')
+    @classmethod
+    def collect_incremental(cls, block_structure, collected_block_structure, changed_block_keys):
+        """
+        Collect student_view_multi_device and student_view_data values for
+        changed blocks only, since they depend on nothing but the block.
+        """
+        block_structure.request_xblock_fields('category')
+
+        unchanged_block_keys = [
+            block_key for block_key in block_structure.get_block_keys() if block_key not in changed_block_keys
+        ]
+        block_structure.copy_transformer_block_data(cls, collected_block_structure, unchanged_block_keys)
+        for block_key in changed_block_keys:
+            cls._collect_block(block_structure, block_key)
+
+    @classmethod
+    def _collect_block(cls, block_structure, block_key):
+        """
+        Collect student_view_multi_device and student_view_data values for the given block
+        """
+        block = block_structure.get_xblock(block_key)
+
+        # We're iterating through descriptors (not bound to a user) that are
+        # given to us by the modulestore. The reason we look at
+        # block.__class__ is to avoid the XModuleDescriptor -> XModule
+        # proxying that would happen if we just examined block directly,
+        # since it's likely that student_view() is going to be defined on
+        # the XModule side.
+        #
+        # If that proxying happens, this method will throw an
+        # UndefinedContext exception, because we haven't initialized any of
+        # the user-specific context.
+        #
+        # This isn't a problem for pure XBlocks, because it's all in one
+        # class, and there's no proxying. So basically, if you encounter a
+        # problem where your particular XModule explodes here (and don't
+        # have the time to convert it to an XBlock), please try refactoring
+        # so that you declare your student_view() method in a common
+        # ancestor class of both your Descriptor and Module classes. As an
+        # example, I changed the name of HtmlFields to HtmlBlock and moved
+        # student_view() from HtmlModuleMixin to HtmlBlock.
+        student_view = getattr(block.__class__, 'student_view', None)
+        supports_multi_device = block.has_support(student_view, 'multi_device')
 
+        block_structure.set_transformer_block_field(
+            block_key,
+            cls,
+            cls.STUDENT_VIEW_MULTI_DEVICE,
+            supports_multi_device,
+        )
+        if getattr(block, 'student_view_data', None):
+            student_view_data = block.student_view_data()
             block_structure.set_transformer_block_field(
                 block_key,
                 cls,
-                cls.STUDENT_VIEW_MULTI_DEVICE,
-                supports_multi_device,
+                cls.STUDENT_VIEW_DATA,
+                student_view_data,
             )
-            if getattr(block, 'student_view_data', None):
-                student_view_data = block.student_view_data()
-                block_structure.set_transformer_block_field(
-                    block_key,
-                    cls,
-                    cls.STUDENT_VIEW_DATA,
-                    student_view_data,
-                )
 
     def transform(self, usage_info, block_structure):
         """
@@ -4,6 +4,7 @@ Tests for StudentViewTransformer.
 from __future__ import absolute_import
 
 import ddt
+from mock import patch
 
 # pylint: disable=protected-access
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
@@ -66,3 +67,23 @@ class TestStudentViewTransformer(ModuleStoreTestCase):
                 html_block_key, StudentViewTransformer, StudentViewTransformer.STUDENT_VIEW_MULTI_DEVICE,
             )
         )
+
+    def test_collect_incremental(self):
+        StudentViewTransformer.collect(self.block_structure)
+        self.block_structure._collect_requested_xblock_fields()
+
+        html_block_key = self.course_key.make_usage_key('html', 'toyhtml')
+        video_block_key = self.course_key.make_usage_key('video', 'sample_video')
+        block_structure = BlockStructureFactory.create_from_modulestore(self.course_usage_key, self.store)
+        with patch.object(
+            StudentViewTransformer, '_collect_block', wraps=StudentViewTransformer._collect_block,
+        ) as mock_collect_block:
+            StudentViewTransformer.collect_incremental(block_structure, self.block_structure, {html_block_key})
+        mock_collect_block.assert_called_once_with(block_structure, html_block_key)
+
+        for block_key in (html_block_key, video_block_key):
+            for field_name in (StudentViewTransformer.STUDENT_VIEW_DATA, StudentViewTransformer.STUDENT_VIEW_MULTI_DEVICE):
+                self.assertEqual(
+                    block_structure.get_transformer_block_field(block_key, StudentViewTransformer, field_name),
+                    self.block_structure.get_transformer_block_field(block_key, StudentViewTransformer, field_name),
+                )
@@ -57,6 +57,7 @@ def get_course_blocks(
         starting_block_usage_key,
         transformers=None,
         collected_block_structure=None,
+        collected_transformers=None,
 ):
     """
     A higher order function implemented on top of the
@@ -79,6 +80,11 @@ def get_course_blocks(
             BlockStructureManager.get_collected.  Can be optionally
             provided if already available, for optimization.
 
+        collected_transformers ([BlockStructureTransformer]) - If
+            given, only the collected data of these transformers and of
+            the transformers to apply is loaded.  See
+            BlockStructureManager.get_transformed.
+
     Returns:
         BlockStructureBlockData - A transformed block structure,
             starting at starting_block_usage_key, that has undergone the
@@ -96,4 +102,5 @@ def get_course_blocks(
         transformers,
         starting_block_usage_key,
         collected_block_structure,
+        collected_transformers,
     )
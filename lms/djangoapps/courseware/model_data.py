@@ -27,6 +27,7 @@ import json
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 
 import six
 from contracts import contract, new_contract
@@ -39,7 +40,9 @@ from xblock.exceptions import InvalidScopeError, KeyValueMultiSaveError
 from xblock.fields import Scope, UserScope
 from xblock.runtime import KeyValueStore
 
+from courseware.toggles import WAFFLE_SWITCHES, WRITE_BEHIND_USER_STATE
 from courseware.user_state_client import DjangoXBlockUserStateClient
+from openedx.core.lib.cache_utils import get_cache
 from xmodule.modulestore.django import modulestore
 
 from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
@@ -352,6 +355,10 @@ class UserStateCache(object):
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
+        # While write_behind is set, set_many only records its updates
+        # here, until they are written by flush.
+        self.write_behind = False
+        self._pending_updates = defaultdict(dict)
 
     def cache_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
@@ -391,6 +398,7 @@ class UserStateCache(object):
 
         Returns: datetime if there was a modified date, or None otherwise
         """
+        self.flush()
         try:
             return self._client.get(
                 self.user.username,
@@ -415,6 +423,12 @@ class UserStateCache(object):
 
             pending_updates[cache_key][kvs_key.field_name] = value
 
+        if self.write_behind:
+            for cache_key, field_state in six.iteritems(pending_updates):
+                self._pending_updates[cache_key].update(field_state)
+                self._cache[cache_key].update(field_state)
+            return
+
         try:
             self._client.set_many(
                 self.user.username,
@@ -426,6 +440,27 @@ class UserStateCache(object):
         finally:
             self._cache.update(pending_updates)
 
+    def flush(self):
+        """
+        Write the user state updates recorded by `set_many` while
+        `write_behind` was set, with a single write per block.
+
+        Raises: KeyValueMultiSaveError if the updates fail to save. The
+            failed updates are not retried.
+        """
+        if not self._pending_updates:
+            return
+
+        pending_updates, self._pending_updates = self._pending_updates, defaultdict(dict)
+        try:
+            self._client.set_many(
+                self.user.username,
+                pending_updates
+            )
+        except DatabaseError:
+            log.exception(u"Saving user state failed for %s", self.user.username)
+            raise KeyValueMultiSaveError([])
+
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def get(self, kvs_key):
         """
@@ -462,6 +497,8 @@ class UserStateCache(object):
         if kvs_key.field_name not in field_state:
             raise KeyError(kvs_key.field_name)
 
+        # The field may not have been written yet.
+        self.flush()
         self._client.delete(self.user.username, cache_key, fields=[kvs_key.field_name])
         del field_state[kvs_key.field_name]
 
@@ -928,6 +965,46 @@ class FieldDataCache(object):
 
         return self.cache[key.scope].last_modified(key)
 
+    def flush(self):
+        """
+        Write any user state updates that have been deferred by `write_behind`.
+
+        Raises: KeyValueMultiSaveError if the updates fail to save
+        """
+        self.cache[Scope.user_state].flush()
+
+    @contextmanager
+    def write_behind(self):
+        """
+        Context manager that, if the WRITE_BEHIND_USER_STATE switch is on,
+        defers the user state writes made within it and coalesces them into
+        a single write per block when it exits, including when it exits with
+        an exception. Reads of the deferred fields return the values
+        written, and `flush` may be called to write them early.
+        """
+        user_state_cache = self.cache[Scope.user_state]
+        if (
+                self.read_only or
+                user_state_cache.write_behind or
+                not WAFFLE_SWITCHES.is_enabled(WRITE_BEHIND_USER_STATE)
+        ):
+            yield
+            return
+
+        user_state_cache.write_behind = True
+        try:
+            yield
+        except Exception:
+            user_state_cache.write_behind = False
+            try:
+                self.flush()
+            except KeyValueMultiSaveError:
+                # Don't mask the exception that is being raised.
+                log.exception(u'Error saving deferred user state for %s', self.user.username)
+            raise
+        user_state_cache.write_behind = False
+        self.flush()
+
     def __len__(self):
         return sum(len(cache) for cache in self.cache.values())
 
@@ -940,6 +1017,7 @@ class ScoresClient(object):
     handles the read side of things.
     """
     Score = namedtuple('Score', 'correct total created')
+    _CACHE_NAMESPACE = u'courseware.model_data.ScoresClient'
 
     def __init__(self, course_key, user_id):
         self.course_key = course_key
@@ -983,11 +1061,41 @@ class ScoresClient(object):
             )
         return self._locations_to_scores.get(location.replace(version=None, branch=None))
 
+    @classmethod
+    def prefetch(cls, course_key, user_ids, scorable_locations):
+        """
+        Fetches the scores of all the given users for the given locations in a
+        single query, for use by create_for_locations until cleared.
+        """
+        prefetched = {user_id: {} for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(prefetched),
+            course_id=course_key,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade', 'created'
+        ):
+            prefetched[user_id][location.map_into_course(course_key)] = cls.Score(correct, total, created)
+        get_cache(cls._CACHE_NAMESPACE)[six.text_type(course_key)] = prefetched
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears the scores prefetched for the given course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(six.text_type(course_key), None)
+
     @classmethod
     def create_for_locations(cls, course_id, user_id, scorable_locations):
         """Create a ScoresClient with pre-fetched data for the given locations."""
         client = cls(course_id, user_id)
-        client.fetch_scores(scorable_locations)
+        prefetched = get_cache(cls._CACHE_NAMESPACE).get(six.text_type(course_id), {}).get(user_id)
+        if prefetched is not None:
+            client._locations_to_scores.update(prefetched)
+            client._has_fetched = True
+        else:
+            client.fetch_scores(scorable_locations)
         return client
 
 
@@ -55,6 +55,7 @@ from courseware.masquerade import (
     setup_masquerade
 )
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
+from courseware.toggles import FUSED_URL_REWRITE, WAFFLE_SWITCHES
 from edxmako.shortcuts import render_to_string
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from lms.djangoapps.grades.api import GradesUtilService
@@ -79,7 +80,8 @@ from openedx.core.lib.xblock_utils import (
     is_xblock_aside,
     replace_course_urls,
     replace_jump_to_id_urls,
-    replace_static_urls
+    replace_static_urls,
+    replace_urls
 )
 from openedx.core.lib.xblock_utils import request_token as xblock_request_token
 from openedx.core.lib.xblock_utils import wrap_xblock
@@ -704,28 +706,38 @@ def get_module_system_for_user(
     # prefix is going to have to be specific to the module, not the directory
     # that the xml was loaded from
 
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
-    #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
-    # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
-    # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': text_type(course_id), 'module_id': ''}),
-    ))
+    if WAFFLE_SWITCHES.is_enabled(FUSED_URL_REWRITE):
+        # Rewrite the /static, /course and /jump_to_id urls below in a single pass
+        block_wrappers.append(partial(
+            replace_urls,
+            getattr(descriptor, 'data_dir', None),
+            course_id,
+            reverse('jump_to_id', kwargs={'course_id': text_type(course_id), 'module_id': ''}),
+            static_asset_path=static_asset_path or descriptor.static_asset_path
+        ))
+    else:
+        # Rewrite urls beginning in /static to point to course-specific content
+        block_wrappers.append(partial(
+            replace_static_urls,
+            getattr(descriptor, 'data_dir', None),
+            course_id=course_id,
+            static_asset_path=static_asset_path or descriptor.static_asset_path
+        ))
+
+        # Allow URLs of the form '/course/' refer to the root of multicourse directory
+        #   hierarchy of this course
+        block_wrappers.append(partial(replace_course_urls, course_id))
+
+        # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
+        # is an improvement over the /course/... format for studio authored courses,
+        # because it is agnostic to course-hierarchy.
+        # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
+        # function, we just need to specify something to get the reverse() to work.
+        block_wrappers.append(partial(
+            replace_jump_to_id_urls,
+            course_id,
+            reverse('jump_to_id', kwargs={'course_id': text_type(course_id), 'module_id': ''}),
+        ))
 
     block_wrappers.append(partial(display_access_messages, user))
     block_wrappers.append(partial(course_expiration_wrapper, user))
@@ -1071,6 +1083,19 @@ def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_inf
 
     Returns (instance, tracking_context)
     """
+    instance, tracking_context, _ = _get_module_and_field_data_cache_by_usage_id(
+        request, course_id, usage_id, disable_staff_debug_info=disable_staff_debug_info, course=course
+    )
+    return instance, tracking_context
+
+
+def _get_module_and_field_data_cache_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False,
+                                                 course=None):
+    """
+    Gets a module instance based on its `usage_id` in a course, for a given request/user
+
+    Returns (instance, tracking_context, field_data_cache)
+    """
     user = request.user
 
     try:
@@ -1125,7 +1150,7 @@ def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_inf
         log.debug(u"No module %s for user %s -- access denied?", usage_key, user)
         raise Http404
 
-    return (instance, tracking_context)
+    return (instance, tracking_context, field_data_cache)
 
 
 def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course=None):
@@ -1164,7 +1189,7 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
             block_usage_key = usage_key.usage_key
         else:
             block_usage_key = usage_key
-        instance, tracking_context = get_module_by_usage_id(
+        instance, tracking_context, field_data_cache = _get_module_and_field_data_cache_by_usage_id(
             request, course_id, six.text_type(block_usage_key), course=course
         )
 
@@ -1186,7 +1211,8 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
                     handler_instance = get_aside_from_xblock(instance, usage_key.aside_type)
                 else:
                     handler_instance = instance
-                resp = handler_instance.handle(handler, req, suffix)
+                with field_data_cache.write_behind():
+                    resp = handler_instance.handle(handler, req, suffix)
                 if suffix == 'problem_check' \
                         and course \
                         and getattr(course, 'entrance_exam_enabled', False) \
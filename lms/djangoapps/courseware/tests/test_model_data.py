@@ -9,6 +9,7 @@ from functools import partial
 from django.db import DatabaseError
 from django.test import TestCase
 from mock import Mock, patch
+from waffle.testutils import override_switch
 from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
@@ -23,6 +24,7 @@ from courseware.models import (
 from courseware.tests.factories import StudentInfoFactory
 from courseware.tests.factories import StudentModuleFactory as cmfStudentModuleFactory
 from courseware.tests.factories import StudentPrefsFactory, UserStateSummaryFactory, course_id, location
+from courseware.toggles import WRITE_BEHIND_USER_STATE
 from student.tests.factories import UserFactory
 
 
@@ -228,6 +230,93 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         self.assertEquals(exception_context.exception.saved_field_names, [])
 
 
+@override_switch('courseware.{}'.format(WRITE_BEHIND_USER_STATE), active=True)
+class TestStudentModuleWriteBehind(TestCase):
+    """Tests for deferred user_state writes via FieldDataCache.write_behind"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestStudentModuleWriteBehind, self).setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value', 'b_field': 'b_value'}))
+        self.user = student_module.student
+        self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
+
+        self.field_data_cache = FieldDataCache(
+            [mock_descriptor([mock_field(Scope.user_state, 'a_field')])], course_id, self.user
+        )
+        self.kvs = DjangoKeyValueStore(self.field_data_cache)
+
+    def stored_state(self):
+        """Return the user state stored in the database"""
+        return json.loads(StudentModule.objects.get().state)
+
+    def test_writes_are_coalesced(self):
+        # The three writes are made as a single update, with a single history row.
+        with self.assertNumQueries(4, using='default'):
+            with self.assertNumQueries(1, using='student_module_history'):
+                with self.field_data_cache.write_behind():
+                    self.kvs.set(user_state_key('a_field'), 'new_value')
+                    self.kvs.set(user_state_key('a_field'), 'newer_value')
+                    self.kvs.set(user_state_key('not_a_field'), 'other_value')
+                    self.assertEquals('newer_value', self.kvs.get(user_state_key('a_field')))
+                    self.assertEquals('b_value', self.kvs.get(user_state_key('b_field')))
+                    self.assertTrue(self.kvs.has(user_state_key('not_a_field')))
+
+        self.assertEquals(
+            {'a_field': 'newer_value', 'b_field': 'b_value', 'not_a_field': 'other_value'},
+            self.stored_state(),
+        )
+
+    def test_explicit_flush(self):
+        with self.field_data_cache.write_behind():
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.field_data_cache.flush()
+            self.assertEquals('new_value', self.stored_state()['a_field'])
+            with self.assertNumQueries(0):
+                self.field_data_cache.flush()
+
+    def test_delete_deferred_field(self):
+        with self.field_data_cache.write_behind():
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.kvs.set(user_state_key('not_a_field'), 'other_value')
+            self.kvs.delete(user_state_key('not_a_field'))
+            self.assertFalse(self.kvs.has(user_state_key('not_a_field')))
+        self.assertEquals({'a_field': 'new_value', 'b_field': 'b_value'}, self.stored_state())
+
+    def test_exception_flushes_writes(self):
+        with self.assertRaises(ValueError):
+            with self.field_data_cache.write_behind():
+                self.kvs.set(user_state_key('a_field'), 'new_value')
+                raise ValueError()
+        self.assertEquals('new_value', self.stored_state()['a_field'])
+
+    def test_flush_failure_does_not_mask_exception(self):
+        with patch('django.db.models.Model.save', side_effect=DatabaseError):
+            with self.assertRaises(ValueError):
+                with self.field_data_cache.write_behind():
+                    self.kvs.set(user_state_key('a_field'), 'new_value')
+                    raise ValueError()
+
+    def test_flush_failure(self):
+        with patch('django.db.models.Model.save', side_effect=DatabaseError):
+            with self.assertRaises(KeyValueMultiSaveError):
+                with self.field_data_cache.write_behind():
+                    self.kvs.set(user_state_key('a_field'), 'new_value')
+
+    def test_writes_after_exit(self):
+        with self.field_data_cache.write_behind():
+            pass
+        self.kvs.set(user_state_key('a_field'), 'new_value')
+        self.assertEquals('new_value', self.stored_state()['a_field'])
+
+    @override_switch('courseware.{}'.format(WRITE_BEHIND_USER_STATE), active=False)
+    def test_switch_off(self):
+        with self.field_data_cache.write_behind():
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.assertEquals('new_value', self.stored_state()['a_field'])
+
+
 class TestMissingStudentModule(TestCase):
     # Tell Django to clean out all databases, not just default
     multi_db = True
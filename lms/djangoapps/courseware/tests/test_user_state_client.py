@@ -5,11 +5,16 @@ defined in edx_user_state_client.
 
 from __future__ import absolute_import
 
+import json
 from collections import defaultdict
 
 from edx_user_state_client.tests import UserStateClientTestBase
+from opaque_keys.edx.locator import CourseLocator
+from waffle.testutils import override_switch
 
+from courseware.models import StudentModule
 from courseware.tests.factories import UserFactory
+from courseware.toggles import BULK_SET_USER_STATE, WAFFLE_NAMESPACE
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
@@ -35,3 +40,34 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
         super(TestDjangoUserStateClient, self).setUp()
         self.client = DjangoXBlockUserStateClient()
         self.users = defaultdict(UserFactory.create)
+
+
+@override_switch(u'{}.{}'.format(WAFFLE_NAMESPACE, BULK_SET_USER_STATE), active=True)
+class TestDjangoUserStateClientBulkSet(TestDjangoUserStateClient):
+    """
+    Tests of the DjangoUserStateClient backend when setting state with
+    batched queries.
+    It reuses all tests from :class:`~UserStateClientTestBase`.
+    """
+    __test__ = True
+
+    def test_set_many_queries(self):
+        user = UserFactory.create()
+        client = DjangoXBlockUserStateClient(user)
+        course_key = CourseLocator(u'org', u'course', u'run')
+        block_keys = [course_key.make_usage_key(u'problem', u'problem_{}'.format(idx)) for idx in range(3)]
+
+        # Read the existing rows, bulk create the missing ones (in a
+        # savepoint) and read them back.
+        with self.assertNumQueries(5, using='default'):
+            client.set_many(user.username, {block_key: {u'a': 1} for block_key in block_keys})
+
+        # Read the existing rows and update them (in a savepoint).
+        with self.assertNumQueries(4, using='default'):
+            client.set_many(user.username, {block_key: {u'b': 2} for block_key in block_keys})
+
+        self.assertEqual(
+            [json.loads(student_module.state) for student_module in StudentModule.objects.filter(student=user)],
+            [{u'a': 1, u'b': 2}] * 3,
+        )
+        self.assertEqual(len(list(client.get_history(user.username, block_keys[0]))), 2)
@@ -0,0 +1,22 @@
+"""
+Waffle switches for the courseware app.
+"""
+from __future__ import absolute_import
+
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'courseware'
+WAFFLE_SWITCHES = WaffleSwitchNamespace(name=WAFFLE_NAMESPACE)
+
+# Switches
+
+# Writes the user state of many blocks with a few batched queries.
+BULK_SET_USER_STATE = u'bulk_set_user_state'
+
+# Coalesces the user state writes of an XBlock handler request into a
+# single write per block, made when the handler returns.
+WRITE_BEHIND_USER_STATE = u'write_behind_user_state'
+
+# Rewrites the urls of rendered blocks in a single pass.
+FUSED_URL_REWRITE = u'fused_url_rewrite'
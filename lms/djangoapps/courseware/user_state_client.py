@@ -14,13 +14,17 @@ import six
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
-from django.db import transaction
+from django.db import router, transaction
+from django.db.models import Case, TextField, Value, When
+from django.db.models.signals import post_save
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_django_utils import monitoring as monitoring_utils
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
 from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.toggles import BULK_SET_USER_STATE, WAFFLE_SWITCHES
 
 try:
     import simplejson as json
@@ -244,6 +248,25 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        if WAFFLE_SWITCHES.is_enabled(BULK_SET_USER_STATE):
+            self._bulk_set_many(user, block_keys_to_state)
+        else:
+            self._set_many_individually(user, block_keys_to_state)
+
+        # Events for the entire set_many call.
+        finish_time = time()
+        duration = (finish_time - evt_time) * 1000  # milliseconds
+        self._nr_stat_accumulate('set_many', 'duration', duration)
+
+    def _set_many_individually(self, user, block_keys_to_state):
+        """
+        Overlays the given states over the stored states of the given user,
+        with a find_or_create and a save of each `StudentModule`.
+
+        Arguments:
+            user (User): The user whose state is to be set.
+            block_keys_to_state (dict): A dict mapping UsageKeys to state dicts.
+        """
         for usage_key, state in block_keys_to_state.items():
             try:
                 student_module, created = StudentModule.objects.get_or_create(
@@ -307,10 +330,109 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             # Event to record number of existing fields updated in set/set_many.
             num_fields_updated = max(0, len(state) - num_new_fields_set)
 
-        # Events for the entire set_many call.
-        finish_time = time()
-        duration = (finish_time - evt_time) * 1000  # milliseconds
-        self._nr_stat_accumulate('set_many', 'duration', duration)
+    def _bulk_set_many(self, user, block_keys_to_state):
+        """
+        Overlays the given states over the stored states of the given user,
+        with one query to read the existing `StudentModule`s (per course),
+        one to update them all and one to create all missing ones.
+
+        Bulk queries do not send model signals, so post_save is sent for
+        each saved `StudentModule` so that its history is still recorded.
+
+        Arguments:
+            user (User): The user whose state is to be set.
+            block_keys_to_state (dict): A dict mapping UsageKeys to state dicts.
+        """
+        existing_student_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(user.username, list(block_keys_to_state))
+        }
+
+        created_student_modules, updated_student_modules = [], []
+        for usage_key, state in six.iteritems(block_keys_to_state):
+            student_module = existing_student_modules.get(usage_key)
+            if student_module is None:
+                created_student_modules.append(StudentModule(
+                    student=user,
+                    course_id=usage_key.course_key,
+                    module_state_key=usage_key,
+                    state=json.dumps(state),
+                    module_type=usage_key.block_type,
+                ))
+            else:
+                current_state = {} if student_module.state is None else json.loads(student_module.state)
+                current_state.update(state)
+                student_module.state = json.dumps(current_state)
+                updated_student_modules.append(student_module)
+
+        if updated_student_modules:
+            modified = timezone.now()
+            try:
+                with transaction.atomic():
+                    # Only the state is written, so that no score set by some other
+                    # piece of the code since it was read is overwritten.
+                    StudentModule.objects.filter(
+                        id__in=[student_module.id for student_module in updated_student_modules],
+                    ).update(
+                        state=Case(
+                            *[
+                                When(id=student_module.id, then=Value(student_module.state))
+                                for student_module in updated_student_modules
+                            ],
+                            output_field=TextField()
+                        ),
+                        modified=modified,
+                    )
+            except IntegrityError:
+                # See https://openedx.atlassian.net/browse/TNL-5365
+                log.warning(u"set_many: IntegrityError for student {} updating {} block keys: {}".format(
+                    user, len(updated_student_modules),
+                    [student_module.module_state_key for student_module in updated_student_modules],
+                ))
+                updated_student_modules = []
+            for student_module in updated_student_modules:
+                student_module.modified = modified
+
+        if created_student_modules:
+            try:
+                with transaction.atomic():
+                    StudentModule.objects.bulk_create(created_student_modules)
+            except IntegrityError:
+                # PLAT-1109 - Rows may have been created by another process since
+                # they were read. Ignore the error, as get_or_create does above.
+                log.warning(u"set_many: IntegrityError for student {} creating {} block keys: {}".format(
+                    user, len(created_student_modules),
+                    [student_module.module_state_key for student_module in created_student_modules],
+                ))
+                created_student_modules = []
+            else:
+                # Primary keys are not set by bulk_create on all databases.
+                if any(student_module.pk is None for student_module in created_student_modules):
+                    created_student_modules = list(StudentModule.objects.filter(
+                        student=user,
+                        course_id__in={student_module.course_id for student_module in created_student_modules},
+                        module_state_key__in=[
+                            student_module.module_state_key for student_module in created_student_modules
+                        ],
+                    ))
+
+        for created, student_modules in ((True, created_student_modules), (False, updated_student_modules)):
+            for student_module in student_modules:
+                post_save.send(
+                    sender=StudentModule,
+                    instance=student_module,
+                    created=created,
+                    update_fields=None,
+                    raw=False,
+                    using=router.db_for_write(StudentModule, instance=student_module),
+                )
+
+                # DataDog and New Relic reporting
+                block_type = student_module.module_state_key.block_type
+                self._nr_block_stat_accumulate('set_many', block_type, 'size', len(student_module.state))
+                self._nr_block_stat_increment(
+                    'set_many', block_type, 'blocks_created' if created else 'blocks_updated',
+                )
 
     def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
         """
@@ -7,12 +7,15 @@ import json
 
 import ddt
 import mock
-from django.test import RequestFactory, TestCase
+import requests
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils import translation
 from edx_django_utils.cache import RequestCache
 from mock import Mock, patch
 from pytz import UTC
 from six import text_type
+from waffle.testutils import override_switch
 
 import lms.djangoapps.discussion.django_comment_client.utils as utils
 from course_modes.models import CourseMode
@@ -28,8 +31,14 @@ from openedx.core.djangoapps.course_groups import cohorts
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohorted
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
 from openedx.core.djangoapps.django_comment_common.comment_client.utils import (
+    CONCURRENT_REQUESTS,
+    USE_POOLED_SESSION,
     CommentClientMaintenanceError,
-    perform_request
+    CommentClientRequestError,
+    get_session,
+    perform_concurrently,
+    perform_request,
+    reset_session
 )
 from openedx.core.djangoapps.django_comment_common.models import (
     CourseDiscussionSettings,
@@ -1830,6 +1839,114 @@ class ClientConfigurationTestCase(TestCase):
         self.assertEqual(result, {})
 
 
+@override_switch('comment_client.{}'.format(USE_POOLED_SESSION), active=True)
+class PooledSessionTestCase(TestCase):
+    """Test cases for requests to the comment service through the pooled session."""
+
+    def setUp(self):
+        super(PooledSessionTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+        reset_session()
+        self.addCleanup(reset_session)
+
+    @patch.object(requests.Session, 'request')
+    def test_session_is_reused(self, mock_request):
+        response = Mock()
+        response.status_code = 200
+        response.json = lambda: {}
+        mock_request.return_value = response
+
+        self.assertEqual(perform_request('GET', 'http://www.google.com'), {})
+        self.assertEqual(perform_request('GET', 'http://www.google.com'), {})
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertIs(get_session(), get_session())
+
+    @override_settings(COMMENTS_SERVICE_CONNECTION_POOL={'POOL_MAXSIZE': 3, 'MAX_RETRIES': 2, 'KEEP_ALIVE': False})
+    def test_session_settings(self):
+        session = get_session()
+        adapter = session.get_adapter('http://www.google.com')
+        self.assertEqual(adapter._pool_maxsize, 3)  # pylint: disable=protected-access
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(session.headers['Connection'], 'close')
+
+    def test_reset_session(self):
+        session = get_session()
+        reset_session()
+        self.assertIsNot(get_session(), session)
+
+
+@override_switch('comment_client.{}'.format(CONCURRENT_REQUESTS), active=True)
+class PerformConcurrentlyTestCase(TestCase):
+    """Test cases for making independent requests to the comment service concurrently."""
+
+    def setUp(self):
+        super(PerformConcurrentlyTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+
+    @patch('requests.request')
+    def test_results_in_order(self, mock_request):
+        def request_impl(method, url, **kwargs):  # pylint: disable=unused-argument
+            response = Mock()
+            response.status_code = 200
+            response.json = lambda: {'url': url, 'language': kwargs['headers']['Accept-Language']}
+            return response
+        mock_request.side_effect = request_impl
+
+        with translation.override('eo'):
+            results = perform_concurrently(
+                lambda: perform_request('GET', 'http://www.google.com/1'),
+                lambda: perform_request('GET', 'http://www.google.com/2'),
+            )
+        self.assertEqual(results, [
+            {'url': 'http://www.google.com/1', 'language': 'eo'},
+            {'url': 'http://www.google.com/2', 'language': 'eo'},
+        ])
+
+    def test_first_exception_is_raised(self):
+        def fail(message):
+            raise CommentClientRequestError(message)
+        calls = [lambda: 1, lambda: fail('first'), lambda: fail('second')]
+        with self.assertRaisesRegexp(CommentClientRequestError, 'first'):
+            perform_concurrently(*calls)
+
+    def test_nested_calls(self):
+        results = perform_concurrently(
+            lambda: perform_concurrently(lambda: 1, lambda: 2),
+            lambda: 3,
+        )
+        self.assertEqual(results, [[1, 2], 3])
+
+    @override_switch('comment_client.{}'.format(USE_POOLED_SESSION), active=True)
+    @patch('openedx.core.djangoapps.django_comment_common.comment_client.utils.close_old_connections')
+    @patch.object(requests.Session, 'request')
+    def test_calls_in_context(self, mock_request, mock_close_old_connections):
+        response = Mock()
+        response.status_code = 200
+        response.json = lambda: {}
+        mock_request.return_value = response
+
+        # the switch is read by the calling thread, and the database
+        # connections of the pool threads are closed after each call
+        results = perform_concurrently(
+            lambda: perform_request('GET', 'http://www.google.com/1'),
+            lambda: perform_request('GET', 'http://www.google.com/2'),
+        )
+        self.assertEqual(results, [{}, {}])
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_close_old_connections.call_count, 2)
+
+    @override_switch('comment_client.{}'.format(CONCURRENT_REQUESTS), active=False)
+    def test_sequential(self):
+        calls = []
+        results = perform_concurrently(lambda: calls.append(1) or 1, lambda: calls.append(2) or 2)
+        self.assertEqual(results, [1, 2])
+        self.assertEqual(calls, [1, 2])
+
+
 def set_discussion_division_settings(
         course_key, enable_cohorts=False, always_divide_inline_discussions=False,
         divided_discussions=[], division_scheme=CourseDiscussionSettings.COHORT
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 import itertools
 from collections import defaultdict
 from enum import Enum
+from functools import partial
 
 import six
 from django.core.exceptions import ValidationError
@@ -49,7 +50,11 @@ from lms.djangoapps.discussion.rest_api.serializers import (
 )
 from openedx.core.djangoapps.django_comment_common.comment_client.comment import Comment
 from openedx.core.djangoapps.django_comment_common.comment_client.thread import Thread
-from openedx.core.djangoapps.django_comment_common.comment_client.utils import CommentClientRequestError
+from openedx.core.djangoapps.django_comment_common.comment_client.user import User as CommentClientUser
+from openedx.core.djangoapps.django_comment_common.comment_client.utils import (
+    CommentClientRequestError,
+    perform_concurrently
+)
 from openedx.core.djangoapps.django_comment_common.signals import (
     comment_created,
     comment_deleted,
@@ -120,10 +125,13 @@ def _get_thread_and_context(request, thread_id, retrieve_kwargs=None):
             retrieve_kwargs["with_responses"] = False
         if "mark_as_read" not in retrieve_kwargs:
             retrieve_kwargs["mark_as_read"] = False
-        cc_thread = Thread(id=thread_id).retrieve(**retrieve_kwargs)
+        cc_thread, cc_requester = perform_concurrently(
+            partial(Thread(id=thread_id).retrieve, **retrieve_kwargs),
+            CommentClientUser.from_django_user(request.user).retrieve,
+        )
         course_key = CourseKey.from_string(cc_thread["course_id"])
         course = _get_course(course_key, request.user)
-        context = get_context(course, request, cc_thread)
+        context = get_context(course, request, cc_thread, cc_requester)
         course_discussion_settings = get_course_discussion_settings(course_key)
         if (
                 not context["is_requester_privileged"] and
@@ -4,7 +4,7 @@ Views handling read (GET) requests for the Discussion tab and inline discussions
 from __future__ import absolute_import, print_function
 
 import logging
-from functools import wraps
+from functools import partial, wraps
 
 import six
 from django.conf import settings
@@ -531,18 +531,24 @@ def create_user_profile_context(request, course_key, user_id):
     }
 
     group_id = get_group_id_for_comments_service(request, course_key)
+    profiled_user_kwargs = {'id': user_id, 'course_id': course_key}
     if group_id is not None:
         query_params['group_id'] = group_id
-        profiled_user = cc.User(id=user_id, course_id=course_key, group_id=group_id)
-    else:
-        profiled_user = cc.User(id=user_id, course_id=course_key)
-
-    threads, page, num_pages = profiled_user.active_threads(query_params)
+        profiled_user_kwargs['group_id'] = group_id
+    profiled_user = cc.User(**profiled_user_kwargs)
+
+    # The calls are made concurrently, so each gets its own user object
+    # rather than reading one while retrieve updates it.
+    (threads, page, num_pages), _, _ = cc.utils.perform_concurrently(
+        partial(cc.User(**profiled_user_kwargs).active_threads, query_params),
+        user.retrieve,
+        profiled_user.retrieve,
+    )
     query_params['page'] = page
     query_params['num_pages'] = num_pages
 
     with function_trace("get_metadata_for_threads"):
-        user_info = cc.User.from_django_user(request.user).to_dict()
+        user_info = user.to_dict()
         annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
 
     is_staff = has_permission(request.user, 'openclose_thread', course.id)
@@ -647,12 +653,14 @@ def followed_threads(request, course_key, user_id):
         if group_id is not None:
             query_params['group_id'] = group_id
 
-        paginated_results = profiled_user.subscribed_threads(query_params)
+        paginated_results, user_info = cc.utils.perform_concurrently(
+            partial(profiled_user.subscribed_threads, query_params),
+            cc.User.from_django_user(request.user).to_dict,
+        )
         print("\n \n \n paginated results \n \n \n ")
         print(paginated_results)
         query_params['page'] = paginated_results.page
         query_params['num_pages'] = paginated_results.num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
 
         with function_trace("get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(
@@ -35,7 +35,9 @@ def graded_subsections_for_course_id(course_id):
     Return graded subsections for the course.
     """
     from lms.djangoapps.grades.context import graded_subsections_for_course
-    return graded_subsections_for_course(course_data.CourseData(user=None, course_key=course_id).collected_structure)
+    return graded_subsections_for_course(
+        course_data.CourseData(user=None, course_key=course_id).grades_collected_structure
+    )
 
 
 def override_subsection_grade(
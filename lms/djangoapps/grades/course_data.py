@@ -4,7 +4,7 @@ Code used to get and cache the requested course-data
 
 from __future__ import absolute_import
 
-from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.course_blocks.api import get_course_block_access_transformers, get_course_blocks
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from xmodule.modulestore.django import modulestore
 
@@ -27,6 +27,7 @@ class CourseData(object):
             )
         self.user = user
         self._collected_block_structure = collected_block_structure
+        self._grades_collected_block_structure = None
         self._structure = structure
         self._course = course
         self._course_key = course_key
@@ -60,7 +61,8 @@ class CourseData(object):
             self._structure = get_course_blocks(
                 self.user,
                 self.location,
-                collected_block_structure=self._collected_block_structure,
+                collected_block_structure=self._collected_block_structure or self._grades_collected_block_structure,
+                collected_transformers=[GradesTransformer],
             )
         return self._structure
 
@@ -70,6 +72,21 @@ class CourseData(object):
             self._collected_block_structure = get_block_structure_manager(self.course_key).get_collected()
         return self._collected_block_structure
 
+    @property
+    def grades_collected_structure(self):
+        """
+        The collected block structure for grading, which may only have the
+        collected data of the course block access transformers and of the
+        GradesTransformer.  Not to be used for anything but grading.
+        """
+        if self._collected_block_structure is not None:
+            return self._collected_block_structure
+        if self._grades_collected_block_structure is None:
+            self._grades_collected_block_structure = get_block_structure_manager(self.course_key).get_collected(
+                self._grades_transformer_names(),
+            )
+        return self._grades_collected_block_structure
+
     @property
     def course(self):
         if not self._course:
@@ -115,4 +132,12 @@ class CourseData(object):
 
     @property
     def effective_structure(self):
-        return self._structure or self._collected_block_structure
+        return self._structure or self._collected_block_structure or self._grades_collected_block_structure
+
+    def _grades_transformer_names(self):
+        """
+        Returns the names of the transformers whose collected data is
+        needed for grading.
+        """
+        transformers = get_course_block_access_transformers(self.user) + [GradesTransformer]
+        return {transformer.name() for transformer in transformers}
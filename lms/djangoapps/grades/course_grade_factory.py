@@ -3,26 +3,45 @@ Course Grade Factory Class
 """
 from __future__ import absolute_import
 
-from collections import namedtuple
+import json
+from collections import OrderedDict, namedtuple
+from itertools import islice
 from logging import getLogger
 
 import six
+from django.conf import settings
+from django.db import transaction
 from six import text_type
 
+from courseware.model_data import ScoresClient
 from openedx.core.djangoapps.signals.signals import (
     COURSE_GRADE_CHANGED,
     COURSE_GRADE_NOW_FAILED,
     COURSE_GRADE_NOW_PASSED
 )
+from xmodule.graders import AggregatedScore
 
 from .config import assume_zero_if_absent, should_persist_grades
+from .config.waffle import BULK_PREFETCH_GRADES, INCREMENTAL_COURSE_GRADE_UPDATES, waffle
 from .course_data import CourseData
-from .course_grade import CourseGrade, ZeroCourseGrade
+from .course_grade import CourseGrade, ZeroCourseGrade, _uniqueify_and_keep_order
 from .models import PersistentCourseGrade
-from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .models_api import (
+    are_course_and_subsection_grades_prefetched,
+    bulk_prefetch_grade_overrides_and_visible_blocks,
+    clear_bulk_prefetched_grade_overrides_and_visible_blocks,
+    clear_prefetched_course_grades,
+    prefetch_course_and_subsection_grades,
+    prefetch_grade_overrides_and_visible_blocks
+)
+from .scores import compute_percent, possibly_scored
 
 log = getLogger(__name__)
 
+# Number of users whose grades and scores are prefetched together by
+# CourseGradeFactory.iter when the BULK_PREFETCH_GRADES switch is enabled.
+BULK_PREFETCH_BATCH_SIZE = 100
+
 
 class CourseGradeFactory(object):
     """
@@ -68,6 +87,7 @@ class CourseGradeFactory(object):
             course_structure=None,
             course_key=None,
             force_update_subsections=False,
+            changed_subsection_grade=None,
     ):
         """
         Computes, updates, and returns the CourseGrade for the given
@@ -75,8 +95,21 @@ class CourseGradeFactory(object):
 
         At least one of course, collected_block_structure, course_structure,
         or course_key should be provided.
+
+        If changed_subsection_grade is given and incremental course grade
+        updates are enabled, the persisted course grade is updated from the
+        subsection scores stored with it and that single changed subsection
+        grade, rather than from all of the user's subsection grades.
         """
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
+        if (
+                changed_subsection_grade is not None and
+                not force_update_subsections and
+                waffle().is_enabled(INCREMENTAL_COURSE_GRADE_UPDATES)
+        ):
+            course_grade = self._update_incrementally(user, course_data, changed_subsection_grade)
+            if course_grade is not None:
+                return course_grade
         return self._update(
             user,
             course_data,
@@ -108,16 +141,60 @@ class CourseGradeFactory(object):
         course_data = CourseData(
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
-        stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if waffle().is_enabled(BULK_PREFETCH_GRADES):
+            for result in self._iter_bulk_prefetched_grade_results(users, course_data, force_update):
+                yield result
+        else:
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
+
+    def _iter_bulk_prefetched_grade_results(self, users, course_data, force_update):
+        """
+        Yields a GradeResult for each of the given users, prefetching the
+        data needed to grade each batch of BULK_PREFETCH_BATCH_SIZE users
+        in a handful of queries per batch rather than per user.
+        """
+        course_key = course_data.course_key
+        persist_grades = should_persist_grades(course_key)
+        prefetch_grades = persist_grades and not force_update and not are_course_and_subsection_grades_prefetched(
+            course_key
+        )
+        prefetch_overrides = persist_grades and force_update
+        prefetch_scores = force_update or not persist_grades
+        if prefetch_scores:
+            scorable_locations = [
+                block_key for block_key in course_data.grades_collected_structure if possibly_scored(block_key)
+            ]
+
+        users = iter(users)
+        while True:
+            batch = list(islice(users, BULK_PREFETCH_BATCH_SIZE))
+            if not batch:
+                return
+            try:
+                if prefetch_grades:
+                    prefetch_course_and_subsection_grades(course_key, batch)
+                if prefetch_overrides:
+                    bulk_prefetch_grade_overrides_and_visible_blocks(batch, course_key)
+                if prefetch_scores:
+                    ScoresClient.prefetch(course_key, [user.id for user in batch], scorable_locations)
+
+                for user in batch:
+                    yield self._iter_grade_result(user, course_data, force_update)
+            finally:
+                if prefetch_grades:
+                    clear_prefetched_course_grades(course_key)
+                if prefetch_overrides:
+                    clear_bulk_prefetched_grade_overrides_and_visible_blocks(batch, course_key)
+                if prefetch_scores:
+                    ScoresClient.clear_prefetched_data(course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
             kwargs = {
                 'user': user,
                 'course': course_data.course,
-                'collected_block_structure': course_data.collected_structure,
+                'collected_block_structure': course_data.grades_collected_structure,
                 'course_key': course_data.course_key,
             }
             if force_update:
@@ -197,8 +274,111 @@ class CourseGradeFactory(object):
                 percent_grade=course_grade.percent,
                 letter_grade=course_grade.letter_grade or "",
                 passed=course_grade.passed,
+                graded_subsections_json=json.dumps(_graded_subsection_scores(course_grade)),
+            )
+
+        CourseGradeFactory._send_course_grade_signals(user, course_data, course_grade)
+
+        log.info(
+            u'Grades: Update, %s, User: %s, %s, persisted: %s',
+            course_data.full_string(), user.id, course_grade, should_persist,
+        )
+
+        return course_grade
+
+    @staticmethod
+    def _update_incrementally(user, course_data, subsection_grade):
+        """
+        Updates the persisted course grade of the given user from the graded
+        subsection scores stored with it and the given changed subsection
+        grade.  Returns the updated CourseGrade, or None if the course grade
+        cannot be updated incrementally and must be recomputed.
+        """
+        if not should_persist_grades(course_data.course_key):
+            return None
+
+        # Loaded before locking the persisted grade, as it may take a while.
+        course_structure = course_data.structure
+        subsection_order = {
+            text_type(subsection_key): index
+            for index, subsection_key in enumerate(
+                subsection_key
+                for chapter_key in course_structure.get_children(course_data.location)
+                for subsection_key in _uniqueify_and_keep_order(course_structure.get_children(chapter_key))
             )
+        }
+        grader = CourseGrade._prep_course_for_grading(course_data.course).grader  # pylint: disable=protected-access
+        grade_cutoffs = course_data.course.grade_cutoffs
+
+        with transaction.atomic():
+            try:
+                # Locked until the updated grade is saved, so that the change
+                # of a concurrent update of the stored scores is not lost.
+                persistent_grade = PersistentCourseGrade.objects.select_for_update().get(
+                    user_id=user.id, course_id=course_data.course_key,
+                )
+            except PersistentCourseGrade.DoesNotExist:
+                return None
+            graded_subsection_scores = persistent_grade.graded_subsection_scores
+            if (
+                    graded_subsection_scores is None or
+                    persistent_grade.course_version != (course_data.version or u'') or
+                    persistent_grade.grading_policy_hash != course_data.grading_policy_hash
+            ):
+                return None
+
+            location = text_type(subsection_grade.location)
+            for subsection_scores in graded_subsection_scores.values():
+                subsection_scores[:] = [scores for scores in subsection_scores if scores[0] != location]
+            if subsection_grade.graded and subsection_grade.graded_total.possible > 0:
+                graded_subsection_scores.setdefault(subsection_grade.format, []).append(
+                    [location, subsection_grade.graded_total.earned, subsection_grade.graded_total.possible],
+                )
+
+            # Keep the subsections in course order, dropping any the user no
+            # longer has access to, as CourseGrade does.
+            grade_sheet = {}
+            for assignment_type, subsection_scores in graded_subsection_scores.items():
+                subsection_scores[:] = sorted(
+                    (scores for scores in subsection_scores if scores[0] in subsection_order),
+                    key=lambda scores: subsection_order[scores[0]],
+                )
+                grade_sheet[assignment_type] = OrderedDict(
+                    (scores[0], _GradedSubsectionScore(*scores)) for scores in subsection_scores
+                )
 
+            grader_result = grader.grade(grade_sheet, generate_random_scores=settings.GENERATE_PROFILE_SCORES)
+            percent = CourseGrade._compute_percent(grader_result)  # pylint: disable=protected-access
+            letter_grade = CourseGrade._compute_letter_grade(grade_cutoffs, percent)  # pylint: disable=protected-access
+            passed = CourseGrade._compute_passed(grade_cutoffs, percent)  # pylint: disable=protected-access
+
+            PersistentCourseGrade.update_or_create(
+                user_id=user.id,
+                course_id=course_data.course_key,
+                course_version=course_data.version,
+                course_edited_timestamp=course_data.edited_on,
+                grading_policy_hash=course_data.grading_policy_hash,
+                percent_grade=percent,
+                letter_grade=letter_grade or "",
+                passed=passed,
+                graded_subsections_json=json.dumps(graded_subsection_scores),
+            )
+        course_grade = CourseGrade(user, course_data, percent, letter_grade, passed)
+        CourseGradeFactory._send_course_grade_signals(user, course_data, course_grade)
+
+        log.info(
+            u'Grades: Incremental update, %s, User: %s, %s, subsection: %s',
+            course_data.full_string(), user.id, course_grade, location,
+        )
+        return course_grade
+
+    @staticmethod
+    def _send_course_grade_signals(user, course_data, course_grade):
+        """
+        Sends a COURSE_GRADE_CHANGED signal to listeners and
+        COURSE_GRADE_NOW_PASSED if learner has passed course or
+        COURSE_GRADE_NOW_FAILED if learner is now failing course.
+        """
         COURSE_GRADE_CHANGED.send_robust(
             sender=None,
             user=user,
@@ -220,9 +400,27 @@ class CourseGradeFactory(object):
                 grade=course_grade,
             )
 
-        log.info(
-            u'Grades: Update, %s, User: %s, %s, persisted: %s',
-            course_data.full_string(), user.id, course_grade, should_persist,
-        )
 
-        return course_grade
+class _GradedSubsectionScore(object):
+    """
+    The graded score of a subsection, as stored with a persisted course
+    grade, in the form the course grader expects of subsection grades.
+    """
+    def __init__(self, location, earned, possible):
+        self.display_name = location
+        self.graded_total = AggregatedScore(earned, possible, True, None)
+        self.percent_graded = compute_percent(self.graded_total.earned, self.graded_total.possible)
+
+
+def _graded_subsection_scores(course_grade):
+    """
+    Returns the graded subsection scores the given course grade was
+    calculated from, in the format of PersistentCourseGrade.graded_subsection_scores.
+    """
+    return {
+        assignment_type: [
+            [text_type(location), subsection_grade.graded_total.earned, subsection_grade.graded_total.possible]
+            for location, subsection_grade in six.iteritems(subsection_grades)
+        ]
+        for assignment_type, subsection_grades in six.iteritems(course_grade.graded_subsections_by_format)
+    }
@@ -0,0 +1,98 @@
+"""
+Command to check the persisted course grades of the given courses, including
+those updated incrementally from their stored graded subsection scores,
+against a full recompute from the learners' subsection grades.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from lms.djangoapps.grades.course_data import CourseData
+from lms.djangoapps.grades.course_grade import CourseGrade
+from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.grades.models import PersistentCourseGrade
+from openedx.core.lib.command_utils import parse_course_keys
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Meant to be run periodically, while incremental course grade updates are enabled.
+
+    Example usage:
+        $ ./manage.py lms check_course_grade_aggregates 'course-v1:edX+DemoX+Demo_Course' --fix --settings=devstack
+    """
+    help = 'Compares persisted course grades against a full recompute from the learners\' subsection grades.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help='Course keys of the courses to check.',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            default=False,
+            help='Recompute and save the course grades that are found to be inconsistent.',
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            checked, inconsistent = self._check_course(course_key, options['fix'])
+            self.stdout.write(
+                '{}: {} of {} course grades are inconsistent.'.format(course_key, inconsistent, checked)
+            )
+
+    def _check_course(self, course_key, fix):
+        """
+        Checks the persisted course grades of the given course, returning
+        the number of grades checked and the number found inconsistent.
+        """
+        course = modulestore().get_course(course_key, depth=0)
+        checked, inconsistent = 0, 0
+        for persistent_grade in PersistentCourseGrade.objects.filter(course_id=course_key).iterator():
+            user = User.objects.get(id=persistent_grade.user_id)
+            course_grade = self._recompute(user, course)
+            # as CourseGradeFactory reads it
+            persisted_passed = persistent_grade.letter_grade != ''
+            checked += 1
+            if (
+                    persistent_grade.percent_grade != course_grade.percent or
+                    persistent_grade.letter_grade != (course_grade.letter_grade or '') or
+                    persisted_passed != course_grade.passed or
+                    (course_grade.passed and persistent_grade.passed_timestamp is None)
+            ):
+                inconsistent += 1
+                log.warning(
+                    'Grades: Inconsistent course grade for user %s in course %s: persisted %s%% (%s, passed: %s), '
+                    'recomputed %s%% (%s, passed: %s).',
+                    user.id,
+                    course_key,
+                    persistent_grade.percent_grade,
+                    persistent_grade.letter_grade,
+                    persisted_passed,
+                    course_grade.percent,
+                    course_grade.letter_grade,
+                    course_grade.passed,
+                )
+                if fix:
+                    CourseGradeFactory().update(user, course=course)
+        return checked, inconsistent
+
+    def _recompute(self, user, course):
+        """
+        Returns the course grade of the given user, computed from their
+        persisted subsection grades and, for subsections without one, from
+        their scores, without saving any grade.
+        """
+        course_grade = CourseGrade(user, CourseData(user, course=course))
+        # Subsection grades missing from the database are created read_only,
+        # and left unsaved since bulk_create_unsaved is not called.
+        return course_grade.update()
@@ -0,0 +1,56 @@
+"""
+Tests for check_course_grade_aggregates management command.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import ddt
+import six
+from django.core.management import call_command
+
+from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
+from lms.djangoapps.grades.tests.base import GradeTestBase
+from lms.djangoapps.grades.tests.utils import mock_get_score
+
+
+@ddt.ddt
+class TestCheckCourseGradeAggregates(GradeTestBase):
+    """
+    Tests check_course_grade_aggregates management command.
+    """
+    def setUp(self):
+        super(TestCheckCourseGradeAggregates, self).setUp()
+        with mock_get_score(1, 2):
+            CourseGradeFactory().update(self.request.user, self.course, force_update_subsections=True)
+
+    def _run_command(self, *args):
+        """
+        Runs the command for the test course, returning its output.
+        """
+        out = six.StringIO()
+        call_command('check_course_grade_aggregates', six.text_type(self.course.id), *args, stdout=out)
+        return out.getvalue()
+
+    def _persisted_percent(self):
+        return PersistentCourseGrade.objects.get(user_id=self.request.user.id, course_id=self.course.id).percent_grade
+
+    def test_consistent(self):
+        self.assertIn('0 of 1 course grades are inconsistent', self._run_command())
+        self.assertEqual(self._persisted_percent(), 0.5)
+
+    @ddt.data(True, False)
+    def test_inconsistent(self, fix):
+        PersistentCourseGrade.objects.filter(user_id=self.request.user.id).update(percent_grade=0.9)
+        self.assertIn('1 of 1 course grades are inconsistent', self._run_command(*(['--fix'] if fix else [])))
+        self.assertEqual(self._persisted_percent(), 0.5 if fix else 0.9)
+
+    def test_inconsistent_passed(self):
+        PersistentCourseGrade.objects.filter(user_id=self.request.user.id).update(passed_timestamp=None)
+        self.assertIn('1 of 1 course grades are inconsistent', self._run_command())
+
+    def test_subsection_grades_not_saved(self):
+        PersistentSubsectionGrade.objects.filter(user_id=self.request.user.id).delete()
+        with mock_get_score(1, 2):
+            self.assertIn('0 of 1 course grades are inconsistent', self._run_command())
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user_id=self.request.user.id).exists())
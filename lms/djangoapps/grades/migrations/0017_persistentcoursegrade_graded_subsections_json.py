@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0016_auto_20190703_1446'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='persistentcoursegrade',
+            name='graded_subsections_json',
+            field=models.TextField(blank=True, null=True, verbose_name='JSON of graded subsection scores'),
+        ),
+    ]
@@ -42,6 +42,7 @@ class BlockRecordList(object):
     """
     An immutable ordered list of BlockRecord objects.
     """
+    _CACHE_NAMESPACE = u"grades.models.BlockRecordList"
 
     def __init__(self, blocks, course_key, version=None):
         self.blocks = tuple(blocks)
@@ -117,11 +118,30 @@ class BlockRecordList(object):
         return cls(record_generator, course_key, version=data['version'])
 
     @classmethod
-    def from_list(cls, blocks, course_key):
+    def from_list(cls, blocks, course_key, course_version=None):
         """
         Return a BlockRecordList from the given list and course_key.
-        """
-        return cls(blocks, course_key)
+
+        If the version of the course structure the blocks were collected
+        from is given, identical lists of blocks share a single
+        BlockRecordList for the rest of the request, so that its JSON value
+        and hash are computed once for all the learners that have the same
+        visible blocks rather than once per learner.
+        """
+        if course_version is None:
+            return cls(blocks, course_key)
+
+        memo = get_cache(cls._CACHE_NAMESPACE).setdefault((unicode(course_key), course_version), {})
+        blocks = tuple(blocks)
+        # Values that compare equal but serialize differently (1 and 1.0)
+        # must not share a BlockRecordList.
+        memo_key = tuple(
+            (block, type(block.weight), type(block.raw_possible), type(block.graded)) for block in blocks
+        )
+        block_record_list = memo.get(memo_key)
+        if block_record_list is None:
+            block_record_list = memo[memo_key] = cls(blocks, course_key)
+        return block_record_list
 
 
 class VisibleBlocks(models.Model):
@@ -182,8 +202,9 @@ class VisibleBlocks(models.Model):
         exists corresponding to the hash_value of ``blocks``.
         """
         prefetched = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(user_id, blocks.course_key))
+        existing = cls._existing_in_course(blocks.course_key)
         if prefetched is not None:
-            model = prefetched.get(blocks.hash_value)
+            model = prefetched.get(blocks.hash_value) or existing.get(blocks.hash_value)
             if not model:
                 # We still have to do a get_or_create, because
                 # another user may have had this block hash created,
@@ -191,12 +212,15 @@ class VisibleBlocks(models.Model):
                 model, _ = cls.objects.get_or_create(
                     hashed=blocks.hash_value, blocks_json=blocks.json_value, course_id=blocks.course_key,
                 )
-                cls._update_cache(user_id, blocks.course_key, [model])
+            cls._update_cache(user_id, blocks.course_key, [model])
         else:
-            model, _ = cls.objects.get_or_create(
-                hashed=blocks.hash_value,
-                defaults={u'blocks_json': blocks.json_value, u'course_id': blocks.course_key},
-            )
+            model = existing.get(blocks.hash_value)
+            if not model:
+                model, _ = cls.objects.get_or_create(
+                    hashed=blocks.hash_value,
+                    defaults={u'blocks_json': blocks.json_value, u'course_id': blocks.course_key},
+                )
+        existing[model.hashed] = model
         return model
 
     @classmethod
@@ -216,6 +240,9 @@ class VisibleBlocks(models.Model):
             for brl in block_record_lists
         ])
         cls._update_cache(user_id, course_key, created)
+        cls._existing_in_course(course_key).update(
+            {visible_block.hashed: visible_block for visible_block in created}
+        )
         return created
 
     @classmethod
@@ -226,9 +253,21 @@ class VisibleBlocks(models.Model):
         only for those that aren't already created.
         """
         cached_records = cls.bulk_read(user_id, course_key)
-        non_existent_brls = {brl.hash_value for brl in block_record_lists if brl.hash_value not in cached_records}
+        existing = cls._existing_in_course(course_key)
+        non_existent_brls = {
+            brl for brl in block_record_lists
+            if brl.hash_value not in cached_records and brl.hash_value not in existing
+        }
         cls.bulk_create(user_id, course_key, non_existent_brls)
 
+    @classmethod
+    def _existing_in_course(cls, course_key):
+        """
+        Returns the dict, shared by all users for the rest of the request,
+        of the VisibleBlocks of the given course known to exist, by hash.
+        """
+        return get_cache(cls._CACHE_NAMESPACE).setdefault(u"visible_blocks_existing.{}".format(course_key), {})
+
     @classmethod
     def _initialize_cache(cls, user_id, course_key):
         """
@@ -244,6 +283,30 @@ class VisibleBlocks(models.Model):
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = prefetched
         return prefetched
 
+    @classmethod
+    def prefetch_for_users(cls, users, course_key):
+        """
+        Initializes the cache with the visible blocks of each of the given users
+        in the given course, in a single query.
+        """
+        prefetched = {user.id: {} for user in users}
+        grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks').filter(
+            user_id__in=list(prefetched),
+            course_id=course_key,
+        )
+        for grade in grades_with_blocks:
+            prefetched[grade.user_id][grade.visible_blocks.hashed] = grade.visible_blocks
+        for user_id, user_prefetched in prefetched.items():
+            get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = user_prefetched
+
+    @classmethod
+    def clear_prefetched_data_for_users(cls, users, course_key):
+        """
+        Clears the cached visible blocks of the given users in the given course.
+        """
+        for user in users:
+            get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(user.id, course_key), None)
+
     @classmethod
     def _update_cache(cls, user_id, course_key, visible_blocks):
         """
@@ -371,6 +434,13 @@ class PersistentSubsectionGrade(TimeStampedModel):
         """
         get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
 
+    @classmethod
+    def has_prefetched_data(cls, course_key):
+        """
+        Returns whether grades are prefetched for this course in the RequestCache.
+        """
+        return cls._cache_key(course_key) in get_cache(cls._CACHE_NAMESPACE)
+
     @classmethod
     def read_grade(cls, user_id, usage_key):
         """
@@ -470,7 +540,9 @@ class PersistentSubsectionGrade(TimeStampedModel):
         if not params.get('course_id', None):
             params['course_id'] = params['usage_key'].course_key
         params['course_version'] = params.get('course_version', None) or ""
-        params['visible_blocks'] = BlockRecordList.from_list(params['visible_blocks'], params['course_id'])
+        params['visible_blocks'] = BlockRecordList.from_list(
+            params['visible_blocks'], params['course_id'], params['course_version'],
+        )
 
     @classmethod
     def _prepare_params_visible_blocks_id(cls, params):
@@ -535,6 +607,11 @@ class PersistentCourseGrade(TimeStampedModel):
     # Information related to course completion
     passed_timestamp = models.DateTimeField(u'Date learner earned a passing grade', blank=True, null=True)
 
+    # The graded subsection scores from which the grade was calculated, by
+    # assignment type, so that the grade can be updated from a single changed
+    # subsection grade without reading all of the learner's subsection grades.
+    graded_subsections_json = models.TextField(u'JSON of graded subsection scores', blank=True, null=True)
+
     _CACHE_NAMESPACE = u"grades.models.PersistentCourseGrade"
 
     def __unicode__(self):
@@ -550,6 +627,18 @@ class PersistentCourseGrade(TimeStampedModel):
             u"passed timestamp: {}".format(self.passed_timestamp),
         ])
 
+    @property
+    def graded_subsection_scores(self):
+        """
+        Returns the graded subsection scores the grade was calculated from,
+        as a dict of lists of [subsection usage id, earned, possible] in
+        course order, keyed by assignment type.  Returns None if they were
+        not stored with the grade.
+        """
+        if self.graded_subsections_json is None:
+            return None
+        return json.loads(self.graded_subsections_json)
+
     @classmethod
     def prefetch(cls, course_id, users):
         """
@@ -568,6 +657,13 @@ class PersistentCourseGrade(TimeStampedModel):
         """
         get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
 
+    @classmethod
+    def has_prefetched_data(cls, course_key):
+        """
+        Returns whether grades are prefetched for this course in the RequestCache.
+        """
+        return cls._cache_key(course_key) in get_cache(cls._CACHE_NAMESPACE)
+
     @classmethod
     def read(cls, user_id, course_id):
         """
@@ -684,6 +780,29 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def prefetch_for_users(cls, users, course_key):
+        """
+        Prefetches the overrides of each of the given users in the given course, in a single query.
+        """
+        prefetched = {user.id: {} for user in users}
+        overrides = cls.objects.select_related('grade').filter(
+            grade__user_id__in=list(prefetched),
+            grade__course_id=course_key,
+        )
+        for override in overrides:
+            prefetched[override.grade.user_id][override.grade.usage_key] = override
+        for user_id, user_prefetched in prefetched.items():
+            get_cache(cls._CACHE_NAMESPACE)[(user_id, str(course_key))] = user_prefetched
+
+    @classmethod
+    def clear_prefetched_data_for_users(cls, users, course_key):
+        """
+        Clears the prefetched overrides of the given users in the given course.
+        """
+        for user in users:
+            get_cache(cls._CACHE_NAMESPACE).pop((user.id, str(course_key)), None)
+
     @classmethod
     def get_override(cls, user_id, usage_key):
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
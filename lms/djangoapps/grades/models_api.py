@@ -10,13 +10,43 @@ from lms.djangoapps.grades.models import PersistentSubsectionGrade as _Persisten
 from lms.djangoapps.grades.models import PersistentSubsectionGradeOverride as _PersistentSubsectionGradeOverride
 from lms.djangoapps.grades.models import VisibleBlocks as _VisibleBlocks
 from lms.djangoapps.utils import _get_key
+from openedx.core.lib.cache_utils import get_cache
+
+_BULK_PREFETCH_CACHE_NAMESPACE = u'grades.models_api.bulk_prefetch'
 
 
 def prefetch_grade_overrides_and_visible_blocks(user, course_key):
+    if (user.id, str(course_key)) in get_cache(_BULK_PREFETCH_CACHE_NAMESPACE):
+        return
     _PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
     _VisibleBlocks.bulk_read(user.id, course_key)
 
 
+def bulk_prefetch_grade_overrides_and_visible_blocks(users, course_key):
+    """
+    Prefetches the overrides and visible blocks of all the given users at
+    once, in place of prefetch_grade_overrides_and_visible_blocks for each
+    user, until cleared.
+    """
+    _PersistentSubsectionGradeOverride.prefetch_for_users(users, course_key)
+    _VisibleBlocks.prefetch_for_users(users, course_key)
+    get_cache(_BULK_PREFETCH_CACHE_NAMESPACE).update({(user.id, str(course_key)): True for user in users})
+
+
+def clear_bulk_prefetched_grade_overrides_and_visible_blocks(users, course_key):
+    _PersistentSubsectionGradeOverride.clear_prefetched_data_for_users(users, course_key)
+    _VisibleBlocks.clear_prefetched_data_for_users(users, course_key)
+    for user in users:
+        get_cache(_BULK_PREFETCH_CACHE_NAMESPACE).pop((user.id, str(course_key)), None)
+
+
+def are_course_and_subsection_grades_prefetched(course_key):
+    return (
+        _PersistentCourseGrade.has_prefetched_data(course_key) or
+        _PersistentSubsectionGrade.has_prefetched_data(course_key)
+    )
+
+
 def prefetch_course_grades(course_key, users):
     _PersistentCourseGrade.prefetch(course_key, users)
 
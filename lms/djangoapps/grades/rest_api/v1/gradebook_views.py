@@ -520,7 +520,7 @@ class GradebookView(GradeViewMixin, PaginatedAPIView):
         # over users to determine their subsection grades.  We purposely avoid fetching
         # the user-specific course structure for each user, because that is very expensive.
         course_data = CourseData(user=None, course=course)
-        graded_subsections = list(grades_context.graded_subsections_for_course(course_data.collected_structure))
+        graded_subsections = list(grades_context.graded_subsections_for_course(course_data.grades_collected_structure))
 
         if request.GET.get('username'):
             with self._get_user_or_raise(request, course_key) as grade_user:
@@ -555,7 +555,7 @@ class GradebookView(GradeViewMixin, PaginatedAPIView):
 
             with bulk_gradebook_view_context(course_key, users):
                 for user, course_grade, exc in CourseGradeFactory().iter(
-                    users, course_key=course_key, collected_block_structure=course_data.collected_structure
+                    users, course_key=course_key, collected_block_structure=course_data.grades_collected_structure
                 ):
                     if not exc:
                         entry = self._gradebook_entry(user, course, graded_subsections, course_grade)
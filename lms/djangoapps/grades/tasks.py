@@ -4,30 +4,36 @@ This module contains tasks for asynchronous execution of grade updates.
 
 from __future__ import absolute_import
 
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from logging import getLogger
+from uuid import uuid4
 
 import six
 from celery import task
 from celery_utils.persist_on_failure import LoggedPersistOnFailureTask
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db.utils import DatabaseError
 from edx_django_utils.monitoring import set_custom_metric, set_custom_metrics_for_course_key
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.locator import CourseLocator
+from pytz import UTC
 from submissions import api as sub_api
 
 from courseware.model_data import get_score
+from courseware.models import StudentModule
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.models import ComputeGradesSetting
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from student.models import CourseEnrollment
 from track.event_transaction_utils import set_event_transaction_id, set_event_transaction_type
-from util.date_utils import from_timestamp
+from util.date_utils import from_timestamp, to_timestamp
 from xmodule.modulestore.django import modulestore
 
-from .config.waffle import DISABLE_REGRADE_ON_POLICY_CHANGE, waffle
+from .config.waffle import COALESCE_GRADE_RECALCULATIONS, DISABLE_REGRADE_ON_POLICY_CHANGE, waffle
 from .constants import ScoreDatabaseTableEnum
 from .course_grade_factory import CourseGradeFactory
 from .exceptions import DatabaseNotReadyError
@@ -38,6 +44,8 @@ from .transformer import GradesTransformer
 
 log = getLogger(__name__)
 
+COALESCE_WINDOW_SECONDS = 10
+COALESCED_RECALCULATIONS_TIMEOUT_SECONDS = 60 * 60 * 24
 COURSE_GRADE_TIMEOUT_SECONDS = 1200
 KNOWN_RETRY_ERRORS = (  # Errors we expect occasionally, should be resolved on retry
     DatabaseError,
@@ -45,6 +53,7 @@ KNOWN_RETRY_ERRORS = (  # Errors we expect occasionally, should be resolved on r
     DatabaseNotReadyError,
 )
 RECALCULATE_GRADE_DELAY_SECONDS = 2  # to prevent excessive _has_db_updated failures. See TNL-6424.
+MAX_COALESCED_RECALCULATIONS = 500
 RETRY_DELAY_SECONDS = 40
 SUBSECTION_GRADE_TIMEOUT_SECONDS = 300
 
@@ -180,6 +189,272 @@ def recalculate_subsection_grade_v3(self, **kwargs):
     _recalculate_subsection_grade(self, **kwargs)
 
 
+def enqueue_subsection_grade_recalculation(recalculation_kwargs):
+    """
+    Enqueues the recalculation of the subsection grades affected by a
+    score change, given the keyword arguments of recalculate_subsection_grade_v3.
+
+    When the COALESCE_GRADE_RECALCULATIONS switch is enabled, the changes
+    of student module scores in a course are collected for
+    COALESCE_WINDOW_SECONDS and recalculated together by a single
+    recalculate_coalesced_subsection_grades task, rather than by one task
+    per score change.  Deleted scores, and those of submissions and
+    overrides, are always recalculated on their own, as that task could not
+    find them again in the database should the cache lose them.
+    """
+    if waffle().is_enabled(COALESCE_GRADE_RECALCULATIONS) and _is_coalescable(recalculation_kwargs):
+        try:
+            _add_coalesced_recalculation(recalculation_kwargs)
+            return
+        except ValueError:
+            # The batch expired from the cache before the score change
+            # could be added to it, so recalculate on its own instead.
+            log.info(u"Grades: could not coalesce the recalculation {}.".format(recalculation_kwargs))
+
+    recalculate_subsection_grade_v3.apply_async(
+        kwargs=recalculation_kwargs,
+        countdown=RECALCULATE_GRADE_DELAY_SECONDS,
+    )
+
+
+@task(
+    bind=True,
+    base=LoggedPersistOnFailureTask,
+    time_limit=COURSE_GRADE_TIMEOUT_SECONDS,
+    routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY
+)
+def recalculate_coalesced_subsection_grades(self, **kwargs):
+    """
+    Recalculates the subsection grades affected by the score changes
+    coalesced in the batch ``batch_id`` of the course ``course_id``, which
+    started at the timestamp ``batch_start``.
+
+    The batch is closed first, so that score changes added to it later are
+    recalculated on their own.  The cache does not keep score changes
+    durably, so if any of the batch's are missing from it, the score
+    changes are instead found again in the database: those of all the
+    student module scores of the course modified since the batch started.
+
+    Score changes for the same user and block are recalculated once, as
+    are the subsections containing several changed blocks of a user.  The
+    grade events of each subsection are emitted in the event transaction of
+    its latest score change, or in none for score changes found again in
+    the database.
+
+    Score changes that are not in the database yet, and those of users whose
+    recalculation fails, are handed off to recalculate_subsection_grade_v3 to
+    be retried individually.
+    """
+    course_key = CourseKey.from_string(kwargs['course_id'])
+    recalculations, complete = _pop_coalesced_recalculations(kwargs['batch_id'])
+    if are_grades_frozen(course_key):
+        log.info(
+            u"Attempted recalculate_coalesced_subsection_grades for course '%s', but grades are frozen.",
+            course_key,
+        )
+        return
+
+    if not complete:
+        # Scores are saved shortly before their changes are added to a
+        # batch, so the search starts a window before the batch did.
+        recalculations = _find_student_module_score_changes(
+            course_key,
+            from_timestamp(kwargs['batch_start']) - timedelta(seconds=COALESCE_WINDOW_SECONDS),
+        ) + recalculations
+
+    set_custom_metrics_for_course_key(course_key)
+    set_custom_metric('coalesced_recalculations', len(recalculations))
+
+    store = modulestore()
+    with store.bulk_operations(course_key):
+        course = store.get_course(course_key, depth=0)
+        for user_id, user_recalculations in six.iteritems(_group_coalesced_recalculations(recalculations)):
+            to_retry = []
+            try:
+                score_changes = []
+                for recalculation_kwargs in user_recalculations:
+                    scored_block_usage_key = UsageKey.from_string(
+                        recalculation_kwargs['usage_id']
+                    ).replace(course_key=course_key)
+                    if _has_db_updated_with_new_score(self, scored_block_usage_key, **recalculation_kwargs):
+                        score_changes.append((
+                            scored_block_usage_key,
+                            recalculation_kwargs['only_if_higher'],
+                            recalculation_kwargs['score_deleted'],
+                            recalculation_kwargs.get('force_update_subsections', False),
+                            (
+                                recalculation_kwargs.get('event_transaction_id'),
+                                recalculation_kwargs.get('event_transaction_type'),
+                            ),
+                        ))
+                    else:
+                        to_retry.append(recalculation_kwargs)
+
+                if score_changes:
+                    _update_subsection_grades_for_user(course, User.objects.get(id=user_id), score_changes)
+            except Exception as exc:  # pylint: disable=broad-except
+                log.info(u"Grades: coalesced recalculation failed for user {} in course {}: {}".format(
+                    user_id,
+                    course_key,
+                    repr(exc),
+                ))
+                to_retry = user_recalculations
+
+            for recalculation_kwargs in to_retry:
+                recalculate_subsection_grade_v3.apply_async(
+                    kwargs=recalculation_kwargs,
+                    countdown=RETRY_DELAY_SECONDS,
+                )
+
+
+def _is_coalescable(recalculation_kwargs):
+    """
+    Returns whether the given recalculation can be coalesced: whether it is
+    for a student module score that was not deleted.
+    """
+    return (
+        recalculation_kwargs['score_db_table'] == ScoreDatabaseTableEnum.courseware_student_module and
+        not recalculation_kwargs['score_deleted']
+    )
+
+
+def _find_student_module_score_changes(course_key, modified_since):
+    """
+    Returns the kwargs of the recalculations of the student module scores
+    of the given course which were modified since the given datetime.
+    """
+    return [
+        dict(
+            user_id=user_id,
+            course_id=six.text_type(course_key),
+            usage_id=six.text_type(usage_key),
+            only_if_higher=False,
+            expected_modified_time=to_timestamp(modified),
+            score_deleted=False,
+            score_db_table=ScoreDatabaseTableEnum.courseware_student_module,
+        )
+        for user_id, usage_key, modified in StudentModule.objects.filter(
+            course_id=course_key,
+            modified__gte=modified_since,
+            grade__isnull=False,
+        ).values_list('student_id', 'module_state_key', 'modified')
+    ]
+
+
+def _add_coalesced_recalculation(recalculation_kwargs, start_new_batch=False):
+    """
+    Adds the given recalculation to the current batch of its course,
+    starting a batch, along with the task that recalculates it, if there
+    is none.
+
+    Raises:
+        ValueError if the batch expired from the cache or was closed meanwhile.
+    """
+    course_id = recalculation_kwargs['course_id']
+    batch_cache_key = _coalesced_batch_cache_key(course_id)
+    if start_new_batch:
+        cache.delete(batch_cache_key)
+
+    batch_id = uuid4().hex
+    if cache.add(batch_cache_key, batch_id, COALESCE_WINDOW_SECONDS):
+        cache.set(_coalesced_count_cache_key(batch_id), 0, COALESCED_RECALCULATIONS_TIMEOUT_SECONDS)
+        recalculate_coalesced_subsection_grades.apply_async(
+            kwargs=dict(course_id=course_id, batch_id=batch_id, batch_start=to_timestamp(datetime.now(UTC))),
+            countdown=COALESCE_WINDOW_SECONDS + RECALCULATE_GRADE_DELAY_SECONDS,
+        )
+    else:
+        batch_id = cache.get(batch_cache_key)
+        if batch_id is None:
+            raise ValueError(u"Grades: batch of course {} expired".format(course_id))
+
+    index = cache.incr(_coalesced_count_cache_key(batch_id))
+    if index > MAX_COALESCED_RECALCULATIONS and not start_new_batch:
+        _add_coalesced_recalculation(recalculation_kwargs, start_new_batch=True)
+    else:
+        cache.set(
+            _coalesced_recalculation_cache_key(batch_id, index),
+            recalculation_kwargs,
+            COALESCED_RECALCULATIONS_TIMEOUT_SECONDS,
+        )
+        # The batch is closed before its recalculations are popped, so
+        # one added after they were must be recalculated on its own.
+        if cache.get(_coalesced_closed_cache_key(batch_id)):
+            raise ValueError(u"Grades: batch {} of course {} closed".format(batch_id, course_id))
+
+
+def _pop_coalesced_recalculations(batch_id):
+    """
+    Closes the given batch, and returns its recalculations, in the order
+    they were added, removing them from the cache, along with whether
+    none of them were missing from the cache.
+    """
+    cache.set(_coalesced_closed_cache_key(batch_id), True, COALESCED_RECALCULATIONS_TIMEOUT_SECONDS)
+    count_cache_key = _coalesced_count_cache_key(batch_id)
+    count = cache.get(count_cache_key)
+    recalculation_cache_keys = [
+        _coalesced_recalculation_cache_key(batch_id, index)
+        for index in six.moves.range(1, (count or 0) + 1)
+    ]
+    cached_recalculations = cache.get_many(recalculation_cache_keys)
+    cache.delete_many(recalculation_cache_keys + [count_cache_key])
+
+    complete = count is not None and len(cached_recalculations) == len(recalculation_cache_keys)
+    if not complete:
+        log.warning(
+            u"Grades: {} of {} coalesced recalculations of batch {} are missing from the cache, so the score "
+            u"changes of the batch are found in the database instead.".format(
+                len(recalculation_cache_keys) - len(cached_recalculations) if count is not None else u"some",
+                count if count is not None else u"unknown",
+                batch_id,
+            )
+        )
+    recalculations = [
+        cached_recalculations[key] for key in recalculation_cache_keys if key in cached_recalculations
+    ]
+    return recalculations, complete
+
+
+def _group_coalesced_recalculations(recalculations):
+    """
+    Returns the given recalculations grouped by user id, merging those of
+    the same user and block into a single recalculation that takes the
+    arguments of the latest one.
+    """
+    by_user = OrderedDict()
+    for recalculation_kwargs in recalculations:
+        user_recalculations = by_user.setdefault(recalculation_kwargs['user_id'], OrderedDict())
+        previous_kwargs = user_recalculations.pop(recalculation_kwargs['usage_id'], None)
+        if previous_kwargs is not None:
+            recalculation_kwargs = dict(
+                recalculation_kwargs,
+                only_if_higher=previous_kwargs['only_if_higher'] and recalculation_kwargs['only_if_higher'],
+                force_update_subsections=(
+                    previous_kwargs.get('force_update_subsections', False) or
+                    recalculation_kwargs.get('force_update_subsections', False)
+                ),
+            )
+        user_recalculations[recalculation_kwargs['usage_id']] = recalculation_kwargs
+    return OrderedDict(
+        (user_id, list(user_recalculations.values())) for user_id, user_recalculations in six.iteritems(by_user)
+    )
+
+
+def _coalesced_batch_cache_key(course_id):
+    return u"grades.tasks.coalesced_batch.{}".format(course_id)
+
+
+def _coalesced_count_cache_key(batch_id):
+    return u"grades.tasks.coalesced_count.{}".format(batch_id)
+
+
+def _coalesced_recalculation_cache_key(batch_id, index):
+    return u"grades.tasks.coalesced_recalculation.{}.{}".format(batch_id, index)
+
+
+def _coalesced_closed_cache_key(batch_id):
+    return u"grades.tasks.coalesced_closed.{}".format(batch_id)
+
+
 def _recalculate_subsection_grade(self, **kwargs):
     """
     Updates a saved subsection grade.
@@ -309,32 +584,62 @@ def _update_subsection_grades(
     student = User.objects.get(id=user_id)
     store = modulestore()
     with store.bulk_operations(course_key):
-        course_structure = get_course_blocks(student, store.make_course_usage_key(course_key))
-        subsections_to_update = course_structure.get_transformer_block_field(
-            scored_block_usage_key,
-            GradesTransformer,
-            'subsections',
-            set(),
+        course = store.get_course(course_key, depth=0)
+        _update_subsection_grades_for_user(
+            course,
+            student,
+            [(scored_block_usage_key, only_if_higher, score_deleted, force_update_subsections, None)],
         )
 
-        course = store.get_course(course_key, depth=0)
-        subsection_grade_factory = SubsectionGradeFactory(student, course, course_structure)
-
-        for subsection_usage_key in subsections_to_update:
-            if subsection_usage_key in course_structure:
-                subsection_grade = subsection_grade_factory.update(
-                    course_structure[subsection_usage_key],
-                    only_if_higher,
-                    score_deleted,
-                    force_update_subsections,
-                )
-                SUBSECTION_SCORE_CHANGED.send(
-                    sender=None,
-                    course=course,
-                    course_structure=course_structure,
-                    user=student,
-                    subsection_grade=subsection_grade,
-                )
+
+def _update_subsection_grades_for_user(course, student, score_changes):
+    """
+    Updates the subsection grades of the given student containing the
+    blocks of the given list of (scored_block_usage_key, only_if_higher,
+    score_deleted, force_update_subsections, event_transaction) score
+    changes, updating each subsection once, and signals that those
+    subsection grades were updated.
+
+    event_transaction is the (id, type) of the event transaction of the
+    score change, which the grade events of its subsections are emitted
+    in, or None to keep the current one.  A subsection containing blocks
+    of several score changes is emitted in the last one's.
+    """
+    course_structure = get_course_blocks(student, modulestore().make_course_usage_key(course.id))
+    subsections_to_update = OrderedDict()
+    for score_change in score_changes:
+        scored_block_usage_key, only_if_higher, score_deleted, force_update_subsections = score_change[:4]
+        event_transaction = score_change[4]
+        for subsection_usage_key in course_structure.get_transformer_block_field(
+                scored_block_usage_key,
+                GradesTransformer,
+                'subsections',
+                set(),
+        ):
+            previous = subsections_to_update.get(subsection_usage_key)
+            if previous is not None:
+                only_if_higher = previous[0][0] and only_if_higher
+                score_deleted = previous[0][1] or score_deleted
+                force_update_subsections = previous[0][2] or force_update_subsections
+            subsections_to_update[subsection_usage_key] = (
+                (only_if_higher, score_deleted, force_update_subsections),
+                event_transaction,
+            )
+
+    subsection_grade_factory = SubsectionGradeFactory(student, course, course_structure)
+    for subsection_usage_key, (update_args, event_transaction) in six.iteritems(subsections_to_update):
+        if subsection_usage_key in course_structure:
+            if event_transaction is not None:
+                set_event_transaction_id(event_transaction[0])
+                set_event_transaction_type(event_transaction[1])
+            subsection_grade = subsection_grade_factory.update(course_structure[subsection_usage_key], *update_args)
+            SUBSECTION_SCORE_CHANGED.send(
+                sender=None,
+                course=course,
+                course_structure=course_structure,
+                user=student,
+                subsection_grade=subsection_grade,
+            )
 
 
 def _course_task_args(course_key, **kwargs):
@@ -4,7 +4,7 @@ Tests for CourseData utility class.
 from __future__ import absolute_import
 
 import six
-from mock import patch
+from mock import Mock, call, patch
 
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -14,6 +14,7 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..course_data import CourseData
+from ..transformer import GradesTransformer
 
 
 class CourseDataTest(ModuleStoreTestCase):
@@ -98,3 +99,18 @@ class CourseDataTest(ModuleStoreTestCase):
         # full_string returns minimal value when structures aren't readily available.
         course_data = CourseData(self.user, course_key=self.course.id)
         self.assertIn(u'empty course structure', course_data.full_string())
+
+    def test_grades_collected_structure(self):
+        course_data = CourseData(self.user, course_key=self.course.id)
+        with patch('lms.djangoapps.grades.course_data.get_block_structure_manager') as mock_manager:
+            get_collected = mock_manager.return_value.get_collected
+            get_collected.side_effect = [Mock(), Mock()]
+            grades_collected_structure = course_data.grades_collected_structure
+            collected_structure = course_data.collected_structure
+        self.assertIsNot(grades_collected_structure, collected_structure)
+        self.assertIn(GradesTransformer.name(), get_collected.call_args_list[0][0][0])
+        self.assertEqual(get_collected.call_args_list[1], call())
+
+        # a given collected block structure is used for grading
+        course_data = CourseData(self.user, collected_block_structure=self.collected_structure)
+        self.assertIs(course_data.grades_collected_structure, self.collected_structure)
@@ -11,15 +11,22 @@ from mock import patch
 from six import text_type
 
 from courseware.access import has_access
+from courseware.model_data import ScoresClient
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
 from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
-from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
+from ..config.waffle import (
+    ASSUME_ZERO_GRADE_IF_ABSENT,
+    BULK_PREFETCH_GRADES,
+    INCREMENTAL_COURSE_GRADE_UPDATES,
+    waffle
+)
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentCourseGrade
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
 from .base import GradeTestBase
 from .utils import mock_get_score
@@ -128,6 +135,28 @@ class TestCourseGradeFactory(GradeTestBase):
         with self.assertNumQueries(5):
             _assert_read(expected_pass=False, expected_percent=0.0)  # updated to grade of 0.0
 
+    def test_incremental_update(self):
+        grade_factory = CourseGradeFactory()
+        with mock_get_score(1, 2):
+            grade_factory.update(self.request.user, self.course, force_update_subsections=True)
+        with mock_get_score(2, 2):
+            subsection_grade = self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
+
+        with waffle().override(INCREMENTAL_COURSE_GRADE_UPDATES, active=True):
+            with patch.object(CourseGradeFactory, '_update', wraps=CourseGradeFactory._update) as mock_update:
+                course_grade = grade_factory.update(
+                    self.request.user,
+                    course=self.course,
+                    course_structure=self.course_structure,
+                    changed_subsection_grade=subsection_grade,
+                )
+        self.assertFalse(mock_update.called)
+        self.assertEqual(course_grade.percent, 0.75)
+        self.assertEqual(PersistentCourseGrade.read(self.request.user.id, self.course.id).percent_grade, 0.75)
+
+        # The incrementally updated grade matches a full recompute.
+        self.assertEqual(grade_factory.update(self.request.user, self.course).percent, course_grade.percent)
+
     @patch.dict(settings.FEATURES, {'ASSUME_ZERO_GRADE_IF_ABSENT_FOR_ALL_TESTS': False})
     @ddt.data(*itertools.product((True, False), (True, False)))
     @ddt.unpack
@@ -337,6 +366,35 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         self.assertIsNotNone(all_course_grades[student2])
         self.assertIsNotNone(all_course_grades[student5])
 
+    @patch('lms.djangoapps.grades.course_grade_factory.BULK_PREFETCH_BATCH_SIZE', 2)
+    def test_bulk_prefetch(self):
+        with persistent_grades_feature_flags(global_flag=True, enabled_for_all_courses=True):
+            expected_grades = {
+                student: (course_grade.percent, course_grade.letter_grade)
+                for student, course_grade, _ in CourseGradeFactory().iter(self.students, self.course)
+            }
+
+            with waffle().override(BULK_PREFETCH_GRADES, active=True):
+                with patch.object(ScoresClient, 'prefetch', wraps=ScoresClient.prefetch) as mock_scores_prefetch:
+                    updated_grades = {
+                        student: (course_grade.percent, course_grade.letter_grade)
+                        for student, course_grade, _ in CourseGradeFactory().iter(
+                            self.students, self.course, force_update=True,
+                        )
+                    }
+                self.assertEqual(mock_scores_prefetch.call_count, 3)
+                self.assertEqual(updated_grades, expected_grades)
+
+                with patch.object(
+                    PersistentCourseGrade, 'prefetch', wraps=PersistentCourseGrade.prefetch,
+                ) as mock_grades_prefetch:
+                    read_grades = {
+                        student: (course_grade.percent, course_grade.letter_grade)
+                        for student, course_grade, _ in CourseGradeFactory().iter(self.students, self.course)
+                    }
+                self.assertEqual(mock_grades_prefetch.call_count, 3)
+                self.assertEqual(read_grades, expected_grades)
+
     def _course_grades_and_errors_for(self, course, students):
         """
         Simple helper method to iterate through student grades and give us
@@ -15,6 +15,7 @@ import six
 from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
+from edx_django_utils.cache import RequestCache
 from freezegun import freeze_time
 from mock import patch
 from opaque_keys import InvalidKeyError
@@ -42,6 +43,7 @@ class BlockRecordListTestCase(TestCase):
 
     def setUp(self):
         super(BlockRecordListTestCase, self).setUp()
+        RequestCache.clear_all_namespaces()
         self.course_key = CourseLocator(
             org='some_org',
             course='some_course',
@@ -65,6 +67,21 @@ class BlockRecordListTestCase(TestCase):
             brs
         )
 
+    def test_from_list_shared_within_course_version(self):
+        locator = BlockUsageLocator(course_key=self.course_key, block_type='problem', block_id='block_id')
+        blocks = [BlockRecord(locator=locator, weight=1, raw_possible=10, graded=True)]
+        brl = BlockRecordList.from_list(blocks, self.course_key, 'version_a')
+
+        self.assertIs(brl, BlockRecordList.from_list(list(blocks), self.course_key, 'version_a'))
+        self.assertIsNot(brl, BlockRecordList.from_list(blocks, self.course_key, 'version_b'))
+        self.assertIsNot(brl, BlockRecordList.from_list(blocks, self.course_key))
+
+        float_weight_brl = BlockRecordList.from_list(
+            [BlockRecord(locator=locator, weight=1.0, raw_possible=10, graded=True)], self.course_key, 'version_a',
+        )
+        self.assertIsNot(brl, float_weight_brl)
+        self.assertNotEqual(brl.hash_value, float_weight_brl.hash_value)
+
 
 class GradesModelTestCase(TestCase):
     """
@@ -72,6 +89,7 @@ class GradesModelTestCase(TestCase):
     """
     def setUp(self):
         super(GradesModelTestCase, self).setUp()
+        RequestCache.clear_all_namespaces()
         self.course_key = CourseLocator(
             org='some_org',
             course='some_course',
@@ -202,6 +220,21 @@ class VisibleBlocksTest(GradesModelTestCase):
         with self.assertRaises(AttributeError):
             visible_blocks.blocks = expected_blocks
 
+    def test_existing_shared_across_users(self):
+        """
+        Once created for one user, a VisibleBlocks is reused for other users
+        without querying for it again.
+        """
+        block_record_list = BlockRecordList.from_list([self.record_a], self.course_key)
+        created = VisibleBlocks.cached_get_or_create(self.user_id, block_record_list)
+        with self.assertNumQueries(0):
+            self.assertEqual(created, VisibleBlocks.cached_get_or_create(self.user_id + 1, block_record_list))
+
+        VisibleBlocks.bulk_read(self.user_id + 2, self.course_key)
+        with self.assertNumQueries(0):
+            VisibleBlocks.bulk_get_or_create(self.user_id + 2, self.course_key, [block_record_list])
+            self.assertEqual(created, VisibleBlocks.cached_get_or_create(self.user_id + 2, block_record_list))
+
 
 @ddt.ddt
 class PersistentSubsectionGradeTest(GradesModelTestCase):
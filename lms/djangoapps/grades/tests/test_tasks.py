@@ -13,14 +13,22 @@ import ddt
 import pytz
 import six
 from django.conf import settings
+from django.core.cache import cache
 from django.db.utils import IntegrityError
+from django.test.utils import override_settings
 from django.utils import timezone
 from mock import MagicMock, patch
 from six.moves import range
 
+from courseware.tests.factories import StudentModuleFactory
 from lms.djangoapps.grades import tasks
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
-from lms.djangoapps.grades.config.waffle import ENFORCE_FREEZE_GRADE_AFTER_COURSE_END, waffle_flags
+from lms.djangoapps.grades.config.waffle import (
+    COALESCE_GRADE_RECALCULATIONS,
+    ENFORCE_FREEZE_GRADE_AFTER_COURSE_END,
+    waffle,
+    waffle_flags
+)
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
 from lms.djangoapps.grades.services import GradesService
@@ -31,6 +39,7 @@ from lms.djangoapps.grades.tasks import (
     compute_all_grades_for_course,
     compute_grades_for_course,
     compute_grades_for_course_v2,
+    recalculate_coalesced_subsection_grades,
     recalculate_subsection_grade_v3
 )
 from openedx.core.djangoapps.content.block_structure.exceptions import BlockStructureNotFound
@@ -416,6 +425,139 @@ class RecalculateSubsectionGradeTest(HasCourseWithProblemsMixin, ModuleStoreTest
         self.assertFalse(mock_retry.called)
 
 
+@patch.dict(settings.FEATURES, {'PERSISTENT_GRADES_ENABLED_FOR_ALL_TESTS': False})
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CoalescedRecalculationTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
+    """
+    Ensures that score changes are coalesced into a single recalculation
+    per course when the COALESCE_GRADE_RECALCULATIONS switch is enabled.
+    """
+    ENABLED_SIGNALS = ['course_published', 'pre_publish']
+
+    def setUp(self):
+        super(CoalescedRecalculationTest, self).setUp()
+        self.user = UserFactory()
+        PersistentGradesEnabledFlag.objects.create(enabled_for_all_courses=True, enabled=True)
+        self.set_up_course()
+        self.second_problem = ItemFactory.create(parent=self.sequential, category='problem')
+
+    def _send_score_changes(self):
+        """
+        Sends a burst of score changes, twice for the same problem, each in
+        its own event transaction, and returns the batch recalculation
+        task's kwargs and the ids of those event transactions.
+        """
+        event_transaction_ids = []
+        with waffle().override(COALESCE_GRADE_RECALCULATIONS, active=True):
+            with patch(
+                'lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.apply_async',
+            ) as mock_coalesced_apply, patch(
+                'lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async',
+            ) as mock_task_apply:
+                for usage_key in (self.problem.location, self.problem.location, self.second_problem.location):
+                    event_transaction_ids.append(create_new_event_transaction_id())
+                    send_args = dict(self.problem_weighted_score_changed_kwargs, usage_id=six.text_type(usage_key))
+                    PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **send_args)
+
+        self.assertEqual(mock_coalesced_apply.call_count, 1)
+        self.assertFalse(mock_task_apply.called)
+        return mock_coalesced_apply.call_args[1]['kwargs'], event_transaction_ids
+
+    def _recalculate_batch(self, coalesced_kwargs):
+        """
+        Runs the batch recalculation task, with scores that are in the
+        database, and returns the score changes it updated grades for.
+        """
+        with patch(
+            'lms.djangoapps.grades.tasks.get_score',
+            return_value=MagicMock(modified=datetime.utcnow().replace(tzinfo=pytz.UTC) + timedelta(days=1)),
+        ):
+            with patch('lms.djangoapps.grades.tasks._update_subsection_grades_for_user') as mock_update:
+                recalculate_coalesced_subsection_grades.apply(kwargs=coalesced_kwargs)
+        self.assertEqual(mock_update.call_count, 1)
+        return mock_update.call_args[0][2]
+
+    @patch('lms.djangoapps.grades.signals.signals.SUBSECTION_SCORE_CHANGED.send')
+    def test_subsection_recalculated_once(self, mock_subsection_signal):
+        coalesced_kwargs, _ = self._send_score_changes()
+        with patch(
+            'lms.djangoapps.grades.tasks.get_score',
+            return_value=MagicMock(modified=datetime.utcnow().replace(tzinfo=pytz.UTC) + timedelta(days=1)),
+        ):
+            with mock_get_score(1, 2):
+                recalculate_coalesced_subsection_grades.apply(kwargs=coalesced_kwargs)
+
+        self.assertEqual(mock_subsection_signal.call_count, 1)
+        self.assertEqual(len(PersistentSubsectionGrade.bulk_read_grades(self.user.id, self.course.id)), 1)
+
+    def test_event_transaction_per_score_change(self):
+        coalesced_kwargs, event_transaction_ids = self._send_score_changes()
+        score_changes = self._recalculate_batch(coalesced_kwargs)
+        self.assertEqual(
+            [(score_change[0], score_change[4][0]) for score_change in score_changes],
+            [
+                (self.problem.location, six.text_type(event_transaction_ids[1])),
+                (self.second_problem.location, six.text_type(event_transaction_ids[2])),
+            ],
+        )
+
+    def test_score_changes_found_when_evicted(self):
+        coalesced_kwargs, _ = self._send_score_changes()
+        cache.clear()
+        StudentModuleFactory.create(
+            student=self.user,
+            course_id=self.course.id,
+            module_state_key=self.problem.location,
+            grade=1,
+            max_grade=2,
+        )
+        score_changes = self._recalculate_batch(coalesced_kwargs)
+        self.assertEqual([score_change[0] for score_change in score_changes], [self.problem.location])
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async')
+    def test_recalculated_individually_when_batch_closed(self, mock_task_apply):
+        coalesced_kwargs, _ = self._send_score_changes()
+        self._recalculate_batch(coalesced_kwargs)
+        # A score change added between the batch's closing and popping.
+        cache.set(tasks._coalesced_count_cache_key(coalesced_kwargs['batch_id']), 3)
+
+        with waffle().override(COALESCE_GRADE_RECALCULATIONS, active=True):
+            PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **self.problem_weighted_score_changed_kwargs)
+        self.assertEqual(mock_task_apply.call_count, 1)
+        self.assertEqual(
+            mock_task_apply.call_args[1]['kwargs']['usage_id'],
+            six.text_type(self.problem.location),
+        )
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async')
+    def test_submission_score_recalculated_individually(self, mock_task_apply):
+        with waffle().override(COALESCE_GRADE_RECALCULATIONS, active=True):
+            with patch(
+                'lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.apply_async',
+            ) as mock_coalesced_apply:
+                send_args = dict(
+                    self.problem_weighted_score_changed_kwargs,
+                    score_db_table=ScoreDatabaseTableEnum.submissions,
+                )
+                PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **send_args)
+        self.assertFalse(mock_coalesced_apply.called)
+        self.assertEqual(mock_task_apply.call_count, 1)
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async')
+    def test_retry_individually_when_db_not_updated(self, mock_task_apply):
+        coalesced_kwargs, _ = self._send_score_changes()
+        with patch(
+            'lms.djangoapps.grades.tasks.get_score',
+            return_value=MagicMock(modified=datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(days=1)),
+        ):
+            recalculate_coalesced_subsection_grades.apply(kwargs=coalesced_kwargs)
+
+        self.assertEqual(
+            sorted(call[1]['kwargs']['usage_id'] for call in mock_task_apply.call_args_list),
+            sorted([six.text_type(self.problem.location), six.text_type(self.second_problem.location)]),
+        )
+
+
 @ddt.ddt
 class ComputeGradesForCourseTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
     """
@@ -20,13 +20,15 @@ import hashlib
 import json
 import logging
 import os.path
+import shutil
+import tempfile
 from uuid import uuid4
 
 import six
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 from opaque_keys.edx.django.models import CourseKeyField
 from six import text_type
@@ -35,6 +37,10 @@ from openedx.core.storage import get_storage
 
 logger = logging.getLogger(__name__)
 
+# Size in bytes beyond which report buffers are spilled from memory to a
+# temporary file on local disk.
+DEFAULT_REPORT_SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
 # define custom states used by InstructorTask
 QUEUING = 'QUEUING'
 PROGRESS = 'PROGRESS'
@@ -276,6 +282,63 @@ class DjangoStorageReportStore(ReportStore):
         output_buffer.seek(0)
         self.store(course_id, filename, output_buffer)
 
+    def open_rows_buffer(self):
+        """
+        Return a new, empty CSV buffer that rows can be incrementally added to
+        with `append_rows` and that is later written to the storage backend
+        with `store_rows_buffer`.
+
+        The buffer is kept in memory up to `REPORT_SPOOL_MAX_SIZE` bytes and
+        is spilled to a temporary file on local disk beyond that, so that
+        memory use does not grow with the size of the report.
+        """
+        max_size = getattr(settings, 'REPORT_SPOOL_MAX_SIZE', DEFAULT_REPORT_SPOOL_MAX_SIZE)
+        output_buffer = tempfile.SpooledTemporaryFile(max_size=max_size)
+        # Adding unicode signature (BOM) for MS Excel 2013 compatibility
+        output_buffer.write(codecs.BOM_UTF8)
+        return output_buffer
+
+    def append_rows(self, output_buffer, rows):
+        """
+        Append the given rows (each row is an iterable of strings) in csv
+        format to a buffer returned by `open_rows_buffer`.
+        """
+        csvwriter = csv.writer(output_buffer)
+        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+
+    def store_rows_buffer(self, course_id, filename, output_buffer):
+        """
+        Write the contents of a buffer returned by `open_rows_buffer` to the
+        storage backend, streaming it in chunks, and close the buffer.
+        """
+        output_buffer.seek(0)
+        try:
+            self.store(course_id, filename, File(output_buffer))
+        finally:
+            output_buffer.close()
+
+    def append_stored_rows(self, output_buffer, course_id, filename):
+        """
+        Append the rows of a CSV file previously written with
+        `store_rows_buffer` to a buffer returned by `open_rows_buffer`,
+        without its unicode signature.  Returns False if there is no such file.
+        """
+        path = self.path_to(course_id, filename)
+        if not self.storage.exists(path):
+            return False
+        with self.storage.open(path) as stored_file:
+            signature = stored_file.read(len(codecs.BOM_UTF8))
+            if signature != codecs.BOM_UTF8:
+                output_buffer.write(signature)
+            shutil.copyfileobj(stored_file, output_buffer)
+        return True
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file named `filename` for the given course, if it exists.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples.
@@ -353,6 +353,74 @@ def queue_subtasks_for_query(
     return progress
 
 
+# pylint: disable=bad-continuation
+def queue_subtasks_for_shards(
+    entry,
+    action_name,
+    create_subtask_fcn,
+    shards,
+    total_num_items,
+    final_subtask_id,
+):
+    """
+    Queues one subtask for each of a list of precomputed shards of work.
+
+    Arguments:
+        `entry` : the InstructorTask object for which subtasks are being queued.
+        `action_name` : a past-tense verb that can be used for constructing readable status messages.
+        `create_subtask_fcn` : a function of two arguments that constructs the desired kind of subtask object.
+            Arguments are the shard to be processed by this subtask, and a SubtaskStatus
+            object reflecting initial status (and containing the subtask's id).
+        `shards` : a list of JSON-serializable descriptions of the work to do in each subtask,
+            such as a range of user ids.
+        `total_num_items` : total amount of items covered by all of the shards.
+        `final_subtask_id` : the id of a subtask that must run once all of the shard subtasks have
+            completed, for example to combine their results.  It is recorded with the other
+            subtasks, so that the InstructorTask is only marked as done once it completes, but it
+            is not queued here: whoever gets True from `claim_final_subtask` must queue it.
+
+    Returns:  the task progress as stored in the InstructorTask object.
+    """
+    task_id = entry.task_id
+    subtask_id_list = [str(uuid4()) for _ in shards]
+
+    TASK_LOG.info(
+        u"Task %s: updating InstructorTask %s with subtask info for %s shard subtasks to process %s items.",
+        task_id,
+        entry.id,
+        len(subtask_id_list),
+        total_num_items,
+    )
+    # Make sure this is committed to database before handing off subtasks to celery.
+    with outer_atomic():
+        progress = initialize_subtask_info(entry, action_name, total_num_items, subtask_id_list + [final_subtask_id])
+
+    for shard, subtask_id in zip(shards, subtask_id_list):
+        new_subtask = create_subtask_fcn(shard, SubtaskStatus.create(subtask_id))
+        TASK_LOG.info(u"Task %s: queueing shard subtask %s for shard %s", task_id, subtask_id, shard)
+        new_subtask.apply_async()
+
+    return progress
+
+
+def claim_final_subtask(entry_id, final_subtask_id):
+    """
+    Returns True if every subtask of the InstructorTask other than `final_subtask_id`
+    has completed and the caller is the first to claim the final subtask, in which
+    case the caller is responsible for queueing it.
+
+    This is safe to call from each subtask as it finishes, and from the parent task
+    once it has queued the subtasks: exactly one caller will claim the final subtask.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_status_info = json.loads(entry.subtasks)['status']
+    for subtask_id, subtask_status in six.iteritems(subtask_status_info):
+        if subtask_id != final_subtask_id and subtask_status['state'] not in READY_STATES:
+            return False
+    # cache.add fails if the key already exists
+    return cache.add("subtask-final-{}".format(final_subtask_id), 'true', SUBTASK_LOCK_EXPIRE)
+
+
 def _acquire_subtask_lock(task_id):
     """
     Mark the specified task_id as being in progress.
@@ -25,6 +25,7 @@ import logging
 from functools import partial
 
 from celery import task
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.utils.translation import ugettext_noop
 
@@ -37,7 +38,20 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_may_enroll_csv,
     upload_students_csv
 )
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    claim_final_subtask,
+    update_subtask_status
+)
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    SHARD_GRADE_REPORTS,
+    WAFFLE_SWITCHES,
+    CourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -185,10 +199,110 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
+    if WAFFLE_SWITCHES.is_enabled(SHARD_GRADE_REPORTS):
+        task_fn = partial(
+            CourseGradeReport.generate_sharded,
+            xmodule_instance_args,
+            partial(_create_grades_csv_shard_subtask, entry_id, xmodule_instance_args),
+            partial(_create_grades_csv_merge_subtask, entry_id, xmodule_instance_args),
+        )
+    else:
+        task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+def _create_grades_csv_shard_subtask(entry_id, xmodule_instance_args, report_info, shard, initial_subtask_status):
+    """Creates a subtask to grade one shard of a sharded grade report."""
+    return calculate_grades_csv_shard.subtask(
+        (entry_id, xmodule_instance_args, shard, report_info, initial_subtask_status.to_dict()),
+        task_id=initial_subtask_status.task_id,
+        routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+    )
+
+
+def _create_grades_csv_merge_subtask(entry_id, xmodule_instance_args, report_info, initial_subtask_status):
+    """Creates a subtask to merge the shards of a sharded grade report."""
+    return merge_grades_csv_shards.subtask(
+        (entry_id, xmodule_instance_args, report_info, initial_subtask_status.to_dict()),
+        task_id=initial_subtask_status.task_id,
+        routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, shard, report_info, subtask_status_dict):
+    """
+    Grade the enrollees within one user id range of a sharded grade report,
+    storing the results as partial CSVs.
+
+    The last shard to complete queues `merge_grades_csv_shards`, whether or
+    not it succeeded, so that the report is produced from the shards that did.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    TASK_LOG.info(
+        u"Task: %s, InstructorTask ID: %s, Grading shard %s of %s",
+        current_task_id, entry_id, shard['index'] + 1, report_info['num_shards']
+    )
+    try:
+        succeeded, failed = CourseGradeReport.generate_shard(
+            xmodule_instance_args, entry_id, entry.course_id, action_name, shard, report_info
+        )
+    except Exception:
+        TASK_LOG.exception(u"Task: %s, InstructorTask ID: %s, Grading shard failed", current_task_id, entry_id)
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        _queue_grades_csv_merge_if_ready(entry_id, xmodule_instance_args, report_info)
+        raise
+
+    subtask_status.increment(succeeded=succeeded, failed=failed, state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    _queue_grades_csv_merge_if_ready(entry_id, xmodule_instance_args, report_info)
+    return subtask_status.to_dict()
+
+
+def _queue_grades_csv_merge_if_ready(entry_id, xmodule_instance_args, report_info):
+    """Queues the merge subtask of a sharded grade report once all of its shards are done."""
+    merge_task_id = report_info['merge_task_id']
+    if claim_final_subtask(entry_id, merge_task_id):
+        _create_grades_csv_merge_subtask(
+            entry_id, xmodule_instance_args, report_info, SubtaskStatus.create(merge_task_id)
+        ).apply_async()
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def merge_grades_csv_shards(entry_id, xmodule_instance_args, report_info, subtask_status_dict):
+    """
+    Merge the partial CSVs of every shard of a sharded grade report into the
+    final grade report, completing the InstructorTask.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    try:
+        CourseGradeReport.merge_shards(xmodule_instance_args, entry_id, entry.course_id, action_name, report_info)
+    except Exception:
+        TASK_LOG.exception(
+            u"Task: %s, InstructorTask ID: %s, Merging grade report shards failed", current_task_id, entry_id
+        )
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
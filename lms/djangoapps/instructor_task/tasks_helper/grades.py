@@ -7,8 +7,10 @@ import logging
 import re
 from collections import OrderedDict, defaultdict
 from datetime import datetime
+from functools import partial
 from itertools import chain
 from time import time
+from uuid import uuid4
 
 import six
 from django.conf import settings
@@ -17,7 +19,7 @@ from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
 from six import text_type
-from six.moves import zip, zip_longest
+from six.moves import range, zip, zip_longest
 
 from course_blocks.api import get_course_blocks
 from courseware.courses import get_course_by_id
@@ -28,6 +30,8 @@ from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCe
 from lms.djangoapps.grades.api import CourseGradeFactory
 from lms.djangoapps.grades.api import context as grades_context
 from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, claim_final_subtask, queue_subtasks_for_shards
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -41,11 +45,13 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import CSVReportBuffer, upload_csv_to_report_store
 
 WAFFLE_NAMESPACE = 'instructor_task'
 WAFFLE_SWITCHES = WaffleSwitchNamespace(name=WAFFLE_NAMESPACE)
 OPTIMIZE_GET_LEARNERS_FOR_COURSE = 'optimize_get_learners_for_course'
+STREAM_GRADE_REPORTS = 'stream_grade_reports'
+SHARD_GRADE_REPORTS = 'shard_grade_reports'
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -69,6 +75,19 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _shard_report_name(report_info, csv_name, shard_index):
+    """
+    Returns the file name of the partial CSV for one shard of a sharded
+    report.  Partial CSVs are kept in a subdirectory so they are not listed
+    with the downloadable reports.
+    """
+    return u'shards/{merge_task_id}/{csv_name}_{shard_index}.csv'.format(
+        merge_task_id=report_info['merge_task_id'],
+        csv_name=csv_name,
+        shard_index=shard_index,
+    )
+
+
 class _CourseGradeReportContext(object):
     """
     Internal class that provides a common context to use for a single grade
@@ -76,7 +95,7 @@ class _CourseGradeReportContext(object):
     elements of this context are serialized and parsed across process
     boundaries.
     """
-    def __init__(self, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    def __init__(self, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, user_id_range=None):
         self.task_info_string = (
             u'Task: {task_id}, '
             u'InstructorTask ID: {entry_id}, '
@@ -90,6 +109,9 @@ class _CourseGradeReportContext(object):
         )
         self.action_name = action_name
         self.course_id = course_id
+        # Inclusive (min, max) range of user ids to report on, when the report
+        # is sharded across multiple processes.
+        self.user_id_range = user_id_range
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
 
     @lazy
@@ -203,6 +225,8 @@ class CourseGradeReport(object):
     """
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
+    # Number of enrollees graded by each subtask of a sharded grade report.
+    USERS_PER_SHARD = 5000
 
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
@@ -213,6 +237,93 @@ class CourseGradeReport(object):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def generate_sharded(
+        cls,
+        _xmodule_instance_args,
+        create_shard_subtask_fcn,
+        create_merge_subtask_fcn,
+        _entry_id,
+        course_id,
+        _task_input,
+        action_name,
+    ):
+        """
+        Public method to generate a grade report in parallel.
+
+        The enrollees are split into shards of contiguous user id ranges, each
+        of which is graded by its own subtask into partial CSVs.  Once every
+        shard is done, a final subtask merges them into the grade report.
+
+        Arguments:
+            create_shard_subtask_fcn: a function of (report_info, shard,
+                subtask_status) that constructs the subtask grading a shard.
+            create_merge_subtask_fcn: a function of (report_info,
+                subtask_status) that constructs the subtask merging the shards.
+        """
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        user_ids = list(
+            get_user_model().objects.filter(
+                courseenrollment__course_id=course_id,
+            ).values_list('id', flat=True).order_by('id')
+        )
+        shards = []
+        for index, offset in enumerate(range(0, len(user_ids), cls.USERS_PER_SHARD)):
+            shard_user_ids = user_ids[offset:offset + cls.USERS_PER_SHARD]
+            shards.append({'index': index, 'min_user_id': shard_user_ids[0], 'max_user_id': shard_user_ids[-1]})
+
+        report_info = {
+            'num_shards': len(shards),
+            'timestamp': time(),
+            'merge_task_id': str(uuid4()),
+        }
+        TASK_LOG.info(
+            u'Task: %s, InstructorTask ID: %s, Course: %s, Splitting grade report of %s users into %s shards',
+            entry.task_id, _entry_id, course_id, len(user_ids), len(shards),
+        )
+        progress = queue_subtasks_for_shards(
+            entry,
+            action_name,
+            partial(create_shard_subtask_fcn, report_info),
+            shards,
+            len(user_ids),
+            report_info['merge_task_id'],
+        )
+        # Covers courses without enrollees, and shards that completed before
+        # all of them had been queued.
+        if claim_final_subtask(_entry_id, report_info['merge_task_id']):
+            create_merge_subtask_fcn(report_info, SubtaskStatus.create(report_info['merge_task_id'])).apply_async()
+        return progress
+
+    @classmethod
+    def generate_shard(cls, _xmodule_instance_args, _entry_id, course_id, action_name, shard, report_info):
+        """
+        Public method to grade the enrollees of one shard of a sharded grade
+        report and store their rows as partial CSVs.
+
+        Returns a (succeeded, failed) tuple of the number of users graded.
+        """
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(
+                _xmodule_instance_args,
+                _entry_id,
+                course_id,
+                shard,
+                action_name,
+                user_id_range=(shard['min_user_id'], shard['max_user_id']),
+            )
+            return CourseGradeReport()._generate_shard(context, shard['index'], report_info)
+
+    @classmethod
+    def merge_shards(cls, _xmodule_instance_args, _entry_id, course_id, action_name, report_info):
+        """
+        Public method to merge the partial CSVs of every shard of a sharded
+        grade report into the final grade report.
+        """
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, report_info, action_name)
+            CourseGradeReport()._merge_shards(context, report_info)
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
@@ -222,6 +333,11 @@ class CourseGradeReport(object):
         error_headers = self._error_headers()
         batched_rows = self._batched_rows(context)
 
+        if WAFFLE_SWITCHES.is_enabled(STREAM_GRADE_REPORTS):
+            context.update_status(u'Compiling grades')
+            self._stream(context, success_headers, error_headers, batched_rows)
+            return context.update_status(u'Completed grades')
+
         context.update_status(u'Compiling grades')
         success_rows, error_rows = self._compile(context, batched_rows)
 
@@ -230,6 +346,73 @@ class CourseGradeReport(object):
 
         return context.update_status(u'Completed grades')
 
+    def _generate_shard(self, context, shard_index, report_info):
+        """
+        Internal method for grading the users of a single shard.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        success_buffer = report_store.open_rows_buffer()
+        error_buffer = None
+        succeeded, failed = 0, 0
+        for success_rows, error_rows in self._batched_rows(context):
+            report_store.append_rows(success_buffer, success_rows)
+            if error_rows:
+                if error_buffer is None:
+                    error_buffer = report_store.open_rows_buffer()
+                report_store.append_rows(error_buffer, error_rows)
+            succeeded += len(success_rows)
+            failed += len(error_rows)
+
+        report_store.store_rows_buffer(
+            context.course_id,
+            _shard_report_name(report_info, 'grade_report', shard_index),
+            success_buffer,
+        )
+        if error_buffer is not None:
+            report_store.store_rows_buffer(
+                context.course_id,
+                _shard_report_name(report_info, 'grade_report_err', shard_index),
+                error_buffer,
+            )
+        return succeeded, failed
+
+    def _merge_shards(self, context, report_info):
+        """
+        Internal method for merging the partial CSVs of every shard into the
+        grade report, in shard order, and deleting the partial CSVs.
+        """
+        date = datetime.fromtimestamp(report_info['timestamp'], UTC)
+        success_report = CSVReportBuffer('grade_report', context.course_id, date)
+        error_report = CSVReportBuffer('grade_report_err', context.course_id, date)
+
+        context.update_status(u'Merging grades')
+        success_report.write_rows([self._success_headers(context)])
+        error_report.write_rows([self._error_headers()])
+        has_errors = False
+        for shard_index in range(report_info['num_shards']):
+            success_name = _shard_report_name(report_info, 'grade_report', shard_index)
+            if not success_report.write_stored_rows(success_name):
+                TASK_LOG.warning(
+                    u'%s, Task type: %s, Missing grades for shard %s',
+                    context.task_info_string, context.action_name, shard_index,
+                )
+            error_name = _shard_report_name(report_info, 'grade_report_err', shard_index)
+            if error_report.write_stored_rows(error_name):
+                has_errors = True
+
+        context.update_status(u'Uploading grades')
+        success_report.upload()
+        if has_errors:
+            error_report.upload()
+        else:
+            error_report.discard()
+
+        report_store = success_report.report_store
+        for shard_index in range(report_info['num_shards']):
+            for csv_name in ('grade_report', 'grade_report_err'):
+                report_store.delete(context.course_id, _shard_report_name(report_info, csv_name, shard_index))
+        context.update_status(u'Completed grades')
+
     def _success_headers(self, context):
         """
         Returns a list of all applicable column headers for this grade report.
@@ -286,6 +469,35 @@ class CourseGradeReport(object):
             error_rows = [error_headers] + error_rows
             upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
 
+    def _stream(self, context, success_headers, error_headers, batched_rows):
+        """
+        Writes each batch of (success_rows, error_rows) to the report as soon
+        as it is computed, updating the task progress after every batch, and
+        then uploads the reports.  Only a single batch of rows is held in
+        memory at any time.
+        """
+        date = datetime.now(UTC)
+        success_report = CSVReportBuffer('grade_report', context.course_id, date)
+        error_report = CSVReportBuffer('grade_report_err', context.course_id, date)
+
+        success_report.write_rows([success_headers])
+        for success_rows, error_rows in batched_rows:
+            success_report.write_rows(success_rows)
+            if error_rows and not error_report.num_rows:
+                error_report.write_rows([error_headers])
+            error_report.write_rows(error_rows)
+
+            context.task_progress.succeeded += len(success_rows)
+            context.task_progress.failed += len(error_rows)
+            context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
+            context.task_progress.update_task_state(extra_meta={'step': u'Compiling grades'})
+
+        context.task_progress.total = context.task_progress.attempted
+
+        context.update_status(u'Uploading grades')
+        success_report.upload()
+        error_report.upload()
+
     def _grades_header(self, context):
         """
         Returns the applicable grades-related headers for this report.
@@ -329,7 +541,11 @@ class CourseGradeReport(object):
                 'courseenrollment__course_id': course_id,
             }
 
-            user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
+            user_ids_list = get_user_model().objects.filter(**filter_kwargs)
+            if context.user_id_range is not None:
+                min_id, max_id = context.user_id_range
+                user_ids_list = user_ids_list.filter(id__gte=min_id, id__lte=max_id)
+            user_ids_list = user_ids_list.values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
             for user_ids in user_chunks:
                 user_ids = [user_id for user_id in user_ids if user_id is not None]
@@ -343,7 +559,13 @@ class CourseGradeReport(object):
                 yield users
 
         task_log_message = u'{}, Task type: {}'.format(context.task_info_string, context.action_name)
-        if WAFFLE_SWITCHES.is_enabled(OPTIMIZE_GET_LEARNERS_FOR_COURSE):
+        # Streamed reports must also load users chunk by chunk for memory use
+        # to be bounded by the batch size, and shards only load their own users.
+        if (
+            WAFFLE_SWITCHES.is_enabled(OPTIMIZE_GET_LEARNERS_FOR_COURSE) or
+            WAFFLE_SWITCHES.is_enabled(STREAM_GRADE_REPORTS) or
+            context.user_id_range is not None
+        ):
             TASK_LOG.info(u'%s, Creating Course Grade with optimization', task_log_message)
             return users_for_course_v2(context.course_id)
 
@@ -37,17 +37,88 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         report_name: string - Name of the generated report
     """
     report_store = ReportStore.from_config(config_name)
-    report_name = u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-        course_prefix=course_filename_prefix_generator(course_id),
-        csv_name=csv_name,
-        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-    )
+    report_name = _report_name(csv_name, course_id, timestamp)
 
     report_store.store_rows(course_id, report_name, rows)
     tracker_emit(csv_name)
     return report_name
 
 
+class CSVReportBuffer(object):
+    """
+    Incrementally builds a CSV report that is uploaded to the ReportStore
+    once complete.
+
+    Rows are written to a buffer that is spilled to local disk as it grows,
+    so callers only need to hold the rows of a single batch in memory rather
+    than the whole report.  Nothing is uploaded if no rows were written.
+    """
+    def __init__(self, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+        self.csv_name = csv_name
+        self.course_id = course_id
+        self.timestamp = timestamp
+        self.report_store = ReportStore.from_config(config_name)
+        self.num_rows = 0
+        self._buffer = None
+
+    def write_rows(self, rows):
+        """
+        Appends the given list of rows to the report.
+        """
+        if not rows:
+            return
+        if self._buffer is None:
+            self._buffer = self.report_store.open_rows_buffer()
+        self.report_store.append_rows(self._buffer, rows)
+        self.num_rows += len(rows)
+
+    def write_stored_rows(self, filename):
+        """
+        Appends the rows of a partial CSV, previously stored in the
+        ReportStore under `filename`, to the report.  Returns False if there
+        is no such file.
+        """
+        if self._buffer is None:
+            self._buffer = self.report_store.open_rows_buffer()
+        return self.report_store.append_stored_rows(self._buffer, self.course_id, filename)
+
+    def upload(self):
+        """
+        Uploads the rows written so far to the ReportStore.
+
+        Returns:
+            report_name: string - Name of the generated report, or None if
+                no rows were written.
+        """
+        if self._buffer is None:
+            return None
+        report_name = _report_name(self.csv_name, self.course_id, self.timestamp)
+        self.report_store.store_rows_buffer(self.course_id, report_name, self._buffer)
+        self._buffer = None
+        tracker_emit(self.csv_name)
+        return report_name
+
+    def discard(self):
+        """
+        Discards the rows written so far without uploading them.
+        """
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+
+def _report_name(csv_name, course_id, timestamp):
+    """
+    Returns the file name of a CSV report with the given name, course and
+    timestamp.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 """
 Tests for instructor_task/models.py.
 """
@@ -95,6 +96,26 @@ class DjangoStorageReportStoreLocalTestCase(ReportStoreTestMixin, TestReportMixi
         with override_settings(GRADES_DOWNLOAD=test_settings):
             return ReportStore.from_config(config_name='GRADES_DOWNLOAD')
 
+    @override_settings(REPORT_SPOOL_MAX_SIZE=16)
+    def test_store_rows_buffer(self):
+        """
+        Test that rows appended to a buffer in several batches, spilling to
+        disk along the way, are stored as a single CSV file.
+        """
+        report_store = self.create_report_store()
+        output_buffer = report_store.open_rows_buffer()
+        report_store.append_rows(output_buffer, [[u'id', u'name']])
+        report_store.append_rows(output_buffer, [[1, u'first'], [2, u'second']])
+        report_store.append_rows(output_buffer, [[3, u'thïrd']])
+        report_store.store_rows_buffer(self.course_id, 'rows_file', output_buffer)
+
+        self.assertTrue(output_buffer.closed)
+        with report_store.storage.open(report_store.path_to(self.course_id, 'rows_file')) as csv_file:
+            self.assertEqual(
+                csv_file.read().decode('utf-8-sig').splitlines(),
+                [u'id,name', u'1,first', u'2,second', u'3,thïrd'],
+            )
+
 
 class DjangoStorageReportStoreS3TestCase(MockS3Mixin, ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
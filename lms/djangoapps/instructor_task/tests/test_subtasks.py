@@ -3,12 +3,20 @@ Unit tests for instructor_task subtasks.
 """
 from __future__ import absolute_import
 
+import json
 from uuid import uuid4
 
+from celery.states import SUCCESS
 from mock import Mock, patch
 from six.moves import range
 
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    claim_final_subtask,
+    queue_subtasks_for_query,
+    queue_subtasks_for_shards,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from student.models import CourseEnrollment
@@ -82,3 +90,52 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+    def test_queue_subtasks_for_shards(self):
+        """Test queue_subtasks_for_shards() queues one subtask per shard, and registers the final subtask."""
+        instructor_task = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+        shards = [{'index': 0}, {'index': 1}, {'index': 2}]
+        final_subtask_id = str(uuid4())
+
+        mock_create_subtask_fcn = Mock()
+        queue_subtasks_for_shards(instructor_task, 'action_name', mock_create_subtask_fcn, shards, 9, final_subtask_id)
+
+        mock_create_subtask_fcn_args = mock_create_subtask_fcn.call_args_list
+        self.assertEqual([args[0][0] for args in mock_create_subtask_fcn_args], shards)
+        self.assertEqual(mock_create_subtask_fcn.return_value.apply_async.call_count, 3)
+
+        subtask_dict = json.loads(instructor_task.subtasks)
+        self.assertEqual(subtask_dict['total'], 4)
+        self.assertIn(final_subtask_id, subtask_dict['status'])
+        self.assertEqual(json.loads(instructor_task.task_output)['total'], 9)
+
+    def test_claim_final_subtask(self):
+        """Test claim_final_subtask() only succeeds once, after every other subtask is done."""
+        instructor_task = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+        final_subtask_id = str(uuid4())
+        mock_create_subtask_fcn = Mock()
+        queue_subtasks_for_shards(
+            instructor_task, 'action_name', mock_create_subtask_fcn, [{'index': 0}, {'index': 1}], 2, final_subtask_id
+        )
+        subtask_ids = [args[0][1].task_id for args in mock_create_subtask_fcn.call_args_list]
+
+        self.assertFalse(claim_final_subtask(instructor_task.id, final_subtask_id))
+        update_subtask_status(
+            instructor_task.id, subtask_ids[0], SubtaskStatus(subtask_ids[0], succeeded=1, state=SUCCESS)
+        )
+        self.assertFalse(claim_final_subtask(instructor_task.id, final_subtask_id))
+        update_subtask_status(
+            instructor_task.id, subtask_ids[1], SubtaskStatus(subtask_ids[1], succeeded=1, state=SUCCESS)
+        )
+        self.assertTrue(claim_final_subtask(instructor_task.id, final_subtask_id))
+        self.assertFalse(claim_final_subtask(instructor_task.id, final_subtask_id))
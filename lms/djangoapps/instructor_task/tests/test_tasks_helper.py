@@ -9,17 +9,21 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 from __future__ import absolute_import, unicode_literals
 
+import json
 import os
 import shutil
 import tempfile
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import partial
+from uuid import uuid4
 
 import ddt
 from six import text_type
 from six.moves.urllib.parse import quote  # pylint: disable=import-error
 from six.moves import range, zip
 import unicodecsv
+from celery.states import SUCCESS
 from django.conf import settings
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -27,6 +31,7 @@ from edx_django_utils.cache import RequestCache
 from freezegun import freeze_time
 from mock import ANY, MagicMock, Mock, patch
 from pytz import UTC
+from waffle.testutils import override_switch
 
 import openedx.core.djangoapps.user_api.course_tag.api as course_tag_api
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
@@ -38,6 +43,8 @@ from lms.djangoapps.certificates.models import CertificateStatuses, GeneratedCer
 from lms.djangoapps.certificates.tests.factories import CertificateWhitelistFactory, GeneratedCertificateFactory
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.tasks import _create_grades_csv_merge_subtask, _create_grades_csv_shard_subtask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -48,6 +55,8 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
 from lms.djangoapps.instructor_task.tasks_helper.grades import (
     ENROLLED_IN_COURSE,
     NOT_ENROLLED_IN_COURSE,
+    STREAM_GRADE_REPORTS,
+    WAFFLE_NAMESPACE,
     CourseGradeReport,
     ProblemGradeReport,
     ProblemResponses
@@ -57,6 +66,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -153,6 +163,49 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @patch.object(CourseGradeReport, 'USERS_PER_SHARD', 2)
+    def test_sharded_report(self):
+        """
+        Test that a sharded grade report grades every shard in its own subtask
+        and merges the shards into a single report, in user id order.
+        """
+        students = [
+            self.create_student(u'student{}'.format(i), u'student{}@example.com'.format(i)) for i in range(5)
+        ]
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            CourseGradeReport.generate_sharded(
+                None,
+                partial(_create_grades_csv_shard_subtask, entry.id, None),
+                partial(_create_grades_csv_merge_subtask, entry.id, None),
+                entry.id,
+                self.course.id,
+                None,
+                'graded',
+            )
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        # three shards plus the merge subtask
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 4)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, json.loads(entry.task_output)
+        )
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        report_path = report_store.path_to(self.course.id, links[0][0])
+        with report_store.storage.open(report_path) as csv_file:
+            usernames = [row['Username'] for row in unicodecsv.DictReader(csv_file)]
+        self.assertEqual(usernames, [student.username for student in sorted(students, key=lambda s: s.id)])
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
@@ -439,6 +492,55 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
             {'attempted': expected_students, 'succeeded': expected_students, 'failed': 0}, result
         )
 
+    @patch.object(CourseGradeReport, 'USER_BATCH_SIZE', 2)
+    def test_streamed_report(self):
+        """
+        Test that a streamed grade report contains every batch of users and
+        updates the task progress after each batch.
+        """
+        for i in range(5):
+            self.create_student(u'student{}'.format(i), u'student{}@example.com'.format(i))
+
+        self.current_task = Mock()
+        self.current_task.update_state = Mock()
+        with override_switch(u'{}.{}'.format(WAFFLE_NAMESPACE, STREAM_GRADE_REPORTS), active=True):
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task') as mock_current_task:
+                mock_current_task.return_value = self.current_task
+                result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, result)
+        batch_progress = [
+            call[1]['meta']['succeeded'] for call in self.current_task.update_state.call_args_list
+            if call[1]['meta']['step'] == u'Compiling grades'
+        ]
+        self.assertIn(2, batch_progress)
+        self.assertIn(4, batch_progress)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        report_path = report_store.path_to(self.course.id, links[0][0])
+        with report_store.storage.open(report_path) as csv_file:
+            usernames = [row['Username'] for row in unicodecsv.DictReader(csv_file)]
+        self.assertEqual(sorted(usernames), [u'student{}'.format(i) for i in range(5)])
+
+    @override_switch(u'{}.{}'.format(WAFFLE_NAMESPACE, STREAM_GRADE_REPORTS), active=True)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.iter')
+    def test_streamed_grading_failure(self, mock_grades_iter, _mock_current_task):
+        """
+        Test that grading errors are uploaded to an error report when the
+        report is streamed.
+        """
+        mock_grades_iter.return_value = [
+            (self.create_student('username', 'student@example.com'), None, TypeError('Cannot grade student'))
+        ]
+        result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'attempted': 1, 'succeeded': 0, 'failed': 1}, result)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
+
 
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
@@ -551,6 +551,13 @@ CACHES = {
     },
 }
 
+# Local disk cache of the course assets too large to be cached in memory by the contentserver,
+# disabled unless a DIRECTORY is set.  The least recently used assets are evicted beyond MAX_SIZE bytes.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+}
+
 ############################ OpenID Provider  ##################################
 OPENID_PROVIDER_TRUSTED_ROOTS = ['cs50.net', '*.cs50.net']
 
@@ -1044,6 +1051,40 @@ MODULESTORE = {
     }
 }
 
+# Maximum total number of blocks of the split modulestore structures, and
+# number of definitions, cached in decoded form in each process.  Both are
+# immutable once written, so they never need to be invalidated.  0 disables
+# the cache.  MAX_STRUCTURE_INDEX_BLOCKS is the maximum total number of
+# blocks of the cached structures whose get_items indexes are also cached.
+SPLIT_MONGO_PROCESS_CACHE_SETTINGS = dict(
+    MAX_STRUCTURE_BLOCKS=0,
+    MAX_DEFINITIONS=0,
+    MAX_STRUCTURE_INDEX_BLOCKS=0,
+)
+
+# Time, in seconds, for which the split modulestore caches course indexes
+# (the head versions of courses) in each process and in the default
+# cache.  Indexes are removed from the cache when they change, but other
+# processes may serve the previous version of a course for up to
+# PROCESS_CACHE_TIMEOUT seconds.  0 disables that tier.
+SPLIT_MONGO_COURSE_INDEX_CACHE_SETTINGS = dict(
+    PROCESS_CACHE_TIMEOUT=0,
+    SHARED_CACHE_TIMEOUT=0,
+)
+
+# Whether the split modulestore stores new structures as deltas against a
+# snapshot of a previous version rather than in full, and when it stores a
+# new snapshot instead: after MAX_DELTAS deltas against the same snapshot, or
+# when more than MAX_CHANGED_RATIO of its blocks changed.  Structures stored
+# as deltas are read whether or not this is enabled.  Snapshots are cached in
+# each process up to SNAPSHOT_CACHE_MAX_BYTES of BSON; 0 disables the cache.
+SPLIT_MONGO_DELTA_STRUCTURES_SETTINGS = dict(
+    ENABLED=False,
+    MAX_DELTAS=20,
+    MAX_CHANGED_RATIO=0.5,
+    SNAPSHOT_CACHE_MAX_BYTES=0,
+)
+
 DATABASES = {
     # edxapp's edxapp-migrate scripts and the edxapp_migrate play
     # will ensure that any DB not named read_replica will be migrated
@@ -2150,6 +2191,18 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total size, in bytes, of the collected block structures
+    # cached in each process when the block_structure.process_cache and
+    # block_structure.storage_backing_for_cache switches are enabled, as
+    # measured by the size of their serialized data.
+    PROCESS_CACHE_MAX_SIZE=100 * 1024 * 1024,
+
+    # Time, in seconds, for which collected block structures are cached
+    # in each process.  Cached structures are checked against the version
+    # recorded in the cache on each use, so this only bounds their memory
+    # use.
+    PROCESS_CACHE_TIMEOUT=5 * 60,
 )
 
 ################################ Bulk Email ###################################
@@ -3290,6 +3343,19 @@ JOURNALS_API_URL = 'https://journals-localhost:18000/api/v1/'
 
 COMMENTS_SERVICE_URL = 'http://localhost:18080'
 COMMENTS_SERVICE_KEY = 'password'
+# Connection pool of the session used for requests to the comments service
+# when the comment_client.use_pooled_session waffle switch is on. See
+# DEFAULT_CONNECTION_POOL_SETTINGS in django_comment_common/comment_client/utils.py.
+COMMENTS_SERVICE_CONNECTION_POOL = {
+    'POOL_CONNECTIONS': 1,
+    'POOL_MAXSIZE': 10,
+    'MAX_RETRIES': 1,
+    'BACKOFF_FACTOR': 0,
+    'KEEP_ALIVE': True,
+}
+# Number of threads making independent requests to the comments service in
+# parallel when the comment_client.concurrent_requests waffle switch is on.
+COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS = 4
 
 # Reverification checkpoint name pattern
 CHECKPOINT_PATTERN = r'(?P<checkpoint_name>[^/]+)'
@@ -26,6 +26,10 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# The name of the xBlock field collected for detecting which blocks
+# changed between collections.
+EDITED_ON_FIELD = 'edited_on'
+
 
 class _BlockRelations(object):
     """
@@ -583,6 +587,29 @@ class BlockStructureBlockData(BlockStructure):
             value,
         )
 
+    def copy_transformer_block_data(self, transformer, source_block_structure, usage_keys):
+        """
+        Copies the given transformer's data for the blocks identified by
+        the given usage_keys from the given block structure.  Used to
+        reuse data previously collected for blocks that did not change.
+
+        Arguments:
+            transformer (BlockStructureTransformer) - The transformer
+                whose data is to be copied.
+
+            source_block_structure (BlockStructureBlockData) - The
+                block structure from which the data is copied.
+
+            usage_keys (iterable(UsageKey)) - Usage keys of the blocks
+                whose transformer data is to be copied.
+        """
+        for usage_key in usage_keys:
+            try:
+                transformer_block_data = source_block_structure.get_transformer_block_data(usage_key, transformer)
+            except KeyError:
+                continue
+            self._get_or_create_block(usage_key).transformer_data[transformer] = transformer_block_data
+
     def remove_transformer_block_field(self, usage_key, transformer, key):
         """
         Deletes the given transformer's entire data dict for the
@@ -843,6 +870,45 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
             for field_name in self._requested_xblock_fields:
                 self._set_xblock_field(block_data, xblock, field_name)
 
+    def _get_changed_block_keys(self, collected_block_structure):
+        """
+        Returns the set of usage keys of the blocks whose collected data
+        may differ from that in the given previously collected block
+        structure.
+
+        A block is changed if it was added or edited, or if its children
+        changed, since it was collected.  The descendants of changed
+        blocks, which may inherit from them, and their ancestors, which
+        may aggregate data from them, are also included.
+
+        Arguments:
+            collected_block_structure (BlockStructureBlockData) - The
+                previously collected block structure, with the
+                EDITED_ON_FIELD xBlock field collected.
+        """
+        changed_block_keys = set()
+        for usage_key, xblock in six.iteritems(self._xblock_map):
+            edited_on = getattr(xblock, EDITED_ON_FIELD, None)
+            if (
+                    edited_on is None or
+                    usage_key not in collected_block_structure or
+                    collected_block_structure.get_xblock_field(usage_key, EDITED_ON_FIELD) != edited_on or
+                    collected_block_structure.get_children(usage_key) != self.get_children(usage_key)
+            ):
+                changed_block_keys.add(usage_key)
+
+        affected_block_keys = set()
+        for get_related in (self.get_children, self.get_parents):
+            stack = list(changed_block_keys)
+            visited = set(changed_block_keys)
+            while stack:
+                for related_key in get_related(stack.pop()):
+                    if related_key not in visited:
+                        visited.add(related_key)
+                        stack.append(related_key)
+            affected_block_keys |= visited
+        return affected_block_keys
+
     def _set_xblock_field(self, block_data, xblock, field_name):
         """
         Updates the given block's xBlock fields data with the xBlock
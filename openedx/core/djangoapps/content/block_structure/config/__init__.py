@@ -16,6 +16,9 @@ WAFFLE_NAMESPACE = u'block_structure'
 INVALIDATE_CACHE_ON_PUBLISH = u'invalidate_cache_on_publish'
 STORAGE_BACKING_FOR_CACHE = u'storage_backing_for_cache'
 RAISE_ERROR_WHEN_NOT_FOUND = u'raise_error_when_not_found'
+COMPACT_SERIALIZATION = u'compact_serialization'
+PROCESS_CACHE = u'process_cache'
+INCREMENTAL_COLLECT = u'incremental_collect'
 
 
 def waffle():
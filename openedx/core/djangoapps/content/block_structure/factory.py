@@ -9,7 +9,7 @@ class BlockStructureFactory(object):
     Factory class for BlockStructure objects.
     """
     @classmethod
-    def create_from_modulestore(cls, root_block_usage_key, modulestore):
+    def create_from_modulestore(cls, root_block_usage_key, modulestore, lazy=False):
         """
         Creates and returns a block structure from the modulestore
         starting at the given root_block_usage_key.
@@ -22,6 +22,9 @@ class BlockStructureFactory(object):
                 contains the data for the xBlocks within the block
                 structure starting at root_block_usage_key.
 
+            lazy (bool) - Whether to load the content of the xBlocks
+                only when it is accessed, rather than all of it up front.
+
         Returns:
             BlockStructureModulestoreData - The created block structure
                 with instantiated xBlocks from the given modulestore
@@ -53,12 +56,12 @@ class BlockStructureFactory(object):
                 block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
                 build_block_structure(child)
 
-        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
+        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=lazy)
         build_block_structure(root_xblock)
         return block_structure
 
     @classmethod
-    def create_from_store(cls, root_block_usage_key, block_structure_store):
+    def create_from_store(cls, root_block_usage_key, block_structure_store, transformer_names=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given store, if it's found in the store.
@@ -75,6 +78,9 @@ class BlockStructureFactory(object):
                 store from which the block structure is to be
                 deserialized.
 
+            transformer_names (set(string)) - If given, only the block
+                data of the transformers with these names is deserialized.
+
         Returns:
             BlockStructure - The deserialized block structure starting
                 at root_block_usage_key, if found in the cache.
@@ -83,7 +89,7 @@ class BlockStructureFactory(object):
             BlockStructureNotFound - If the root_block_usage_key is not found
                 in the store.
         """
-        return block_structure_store.get(root_block_usage_key)
+        return block_structure_store.get(root_block_usage_key, transformer_names)
 
     @classmethod
     def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map):
@@ -0,0 +1,76 @@
+"""
+Command to compare the size and decode time of the pickled and compact
+serializations of collected course blocks.
+"""
+from __future__ import absolute_import
+
+import logging
+from timeit import default_timer
+
+import six
+from django.core.management.base import BaseCommand
+from six.moves import range
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure.serialization import deserialize_compact, serialize_compact
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.command_utils import parse_course_keys
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    help = u'Compares the pickled and compact serializations of the collected course blocks of the given courses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help=u'Course keys of the courses to benchmark.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times to decode each serialization.',
+            default=20,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            try:
+                self._benchmark_course(course_key, options['iterations'])
+            except Exception as ex:  # pylint: disable=broad-except
+                log.exception(
+                    u'BlockStructure: An error occurred while benchmarking course blocks for %s: %s',
+                    six.text_type(course_key),
+                    six.text_type(ex),
+                )
+
+    def _benchmark_course(self, course_key, iterations):
+        """
+        Prints the size and mean decode time of each serialization of the
+        collected course blocks of the given course.
+        """
+        block_structure = api.get_course_in_cache(course_key)
+        data = (
+            block_structure._block_relations,  # pylint: disable=protected-access
+            block_structure.transformer_data,
+            block_structure._block_data_map,  # pylint: disable=protected-access
+        )
+        pickled = zpickle(data)
+        compact = serialize_compact(block_structure.root_block_usage_key, *data)
+
+        self.stdout.write(u'{}: {} blocks'.format(course_key, len(block_structure)))
+        for name, serialized_data, decode in (
+                (u'zpickle', pickled, zunpickle),
+                (u'compact', compact, deserialize_compact),
+        ):
+            start = default_timer()
+            for _ in range(iterations):
+                decode(serialized_data)
+            decode_ms = (default_timer() - start) * 1000 / iterations
+            self.stdout.write(u'  {}: {} bytes, {:.2f} ms to decode'.format(name, len(serialized_data), decode_ms))
@@ -0,0 +1,28 @@
+"""
+Tests for benchmark_block_structure_serialization management command.
+"""
+from __future__ import absolute_import
+
+import six
+from django.core.management import call_command
+from six import StringIO
+
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestBenchmarkBlockStructureSerialization(ModuleStoreTestCase):
+    """
+    Tests benchmark_block_structure_serialization management command.
+    """
+    def test_benchmark(self):
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category='chapter')
+        ItemFactory.create(parent=chapter, category='sequential')
+
+        out = StringIO()
+        call_command('benchmark_block_structure_serialization', six.text_type(course.id), '--iterations', '1', stdout=out)
+        output = out.getvalue()
+        self.assertIn(u'{}: 3 blocks'.format(course.id), output)
+        self.assertIn(u'zpickle:', output)
+        self.assertIn(u'compact:', output)
@@ -9,6 +9,7 @@ from contextlib import contextmanager
 import six
 
 from . import config
+from .block_structure import EDITED_ON_FIELD
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
 from .factory import BlockStructureFactory
 from .store import BlockStructureStore
@@ -38,7 +39,13 @@ class BlockStructureManager(object):
         self.modulestore = modulestore
         self.store = BlockStructureStore(cache)
 
-    def get_transformed(self, transformers, starting_block_usage_key=None, collected_block_structure=None):
+    def get_transformed(
+            self,
+            transformers,
+            starting_block_usage_key=None,
+            collected_block_structure=None,
+            collected_transformers=None,
+    ):
         """
         Returns the transformed Block Structure for the root_block_usage_key,
         starting at starting_block_usage_key, getting block data from the cache
@@ -60,11 +67,25 @@ class BlockStructureManager(object):
                 get_collected.  Can be optionally provided if already available,
                 for optimization.
 
+            collected_transformers ([BlockStructureTransformer]) - If
+                given, only the collected data of these transformers and
+                of the transformers to apply is loaded from the store.
+                Callers that do not read the collected data of any other
+                transformer can pass this to avoid deserializing the data
+                of all registered transformers.
+
         Returns:
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        if collected_block_structure:
+            block_structure = collected_block_structure.copy()
+        elif collected_transformers is not None:
+            block_structure = self.get_collected(
+                transformers.names() | {transformer.name() for transformer in collected_transformers},
+            )
+        else:
+            block_structure = self.get_collected()
 
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
@@ -80,7 +101,7 @@ class BlockStructureManager(object):
         transformers.transform(block_structure)
         return block_structure
 
-    def get_collected(self):
+    def get_collected(self, transformer_names=None):
         """
         Returns the collected Block Structure for the root_block_usage_key,
         getting block data from the cache and modulestore, as needed.
@@ -89,6 +110,12 @@ class BlockStructureManager(object):
         the modulestore is accessed if needed (at cache miss), and the
         transformers data is collected if needed.
 
+        Arguments:
+            transformer_names (set(string)) - If given, the block data
+                of only the transformers with these names may be loaded
+                from the store.  Block data of other transformers is then
+                not to be accessed.
+
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
@@ -98,6 +125,7 @@ class BlockStructureManager(object):
             block_structure = BlockStructureFactory.create_from_store(
                 self.root_block_usage_key,
                 self.store,
+                transformer_names,
             )
             BlockStructureTransformers.verify_versions(block_structure)
 
@@ -116,22 +144,61 @@ class BlockStructureManager(object):
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                self._update_collected(incremental=True)
 
-    def _update_collected(self):
+    def _update_collected(self, incremental=False):
         """
         The store is updated with newly collected transformers data from
         the modulestore.
+
+        Arguments:
+            incremental (bool) - Whether to only collect data for blocks
+                that changed since the block structure in the store was
+                collected, if incremental collection is enabled.
         """
         with self._bulk_operations():
+            incremental_collect_enabled = config.waffle().is_enabled(config.INCREMENTAL_COLLECT)
+            collected_block_structure = None
+            # Loading the stored block structure only pays off when none of
+            # the xBlocks of unchanged blocks need to be loaded, that is,
+            # when every registered transformer collects incrementally.
+            if (
+                    incremental_collect_enabled and
+                    incremental and
+                    BlockStructureTransformers.supports_incremental_collect()
+            ):
+                collected_block_structure = self._get_from_store()
+
             block_structure = BlockStructureFactory.create_from_modulestore(
                 self.root_block_usage_key,
                 self.modulestore,
+                lazy=(
+                    collected_block_structure is not None and
+                    BlockStructureTransformers.supports_incremental_collect(collected_block_structure)
+                ),
             )
-            BlockStructureTransformers.collect(block_structure)
+            if incremental_collect_enabled:
+                # Always collected, so that the next collection can be
+                # incremental.
+                block_structure.request_xblock_fields(EDITED_ON_FIELD)
+
+            if collected_block_structure is None:
+                BlockStructureTransformers.collect(block_structure)
+            else:
+                BlockStructureTransformers.collect_incremental(block_structure, collected_block_structure)
             self.store.add(block_structure)
             return block_structure
 
+    def _get_from_store(self):
+        """
+        Returns the block structure in the store for the
+        root_block_usage_key, or None if not found.
+        """
+        try:
+            return BlockStructureFactory.create_from_store(self.root_block_usage_key, self.store)
+        except BlockStructureNotFound:
+            return None
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
@@ -0,0 +1,308 @@
+"""
+Compact serialization of collected block structures.
+
+The default serialization of a block structure is a zlib compressed pickle of
+its internal maps, which repeats the full usage key of a block everywhere it
+is referenced and unpickles one object per block, relation and field.  The
+compact format instead stores:
+
+    * a table of usage keys, interned so that each block is referred to by
+      its integer index and usage keys are rebuilt from the course key and
+      each block's (block_type, block_id);
+    * parent and child relations as flat integer arrays, indexed by offsets
+      per block;
+    * xBlock fields and transformer block fields column by column, as an
+      array of the indices of the blocks that have a value for the field and
+      the list of those values.
+
+The block fields of each transformer are compressed into a segment of their
+own, so that only the segments of the transformers a caller needs are
+decoded.
+
+Data serialized in the compact format starts with COMPACT_FORMAT_PREFIX and
+its version so that it can be told apart from (and coexist with) zpickled
+data.
+"""
+from __future__ import absolute_import
+
+import zlib
+from array import array
+from collections import defaultdict
+
+import six
+from six.moves import cPickle as pickle
+from six.moves import range, zip
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+
+# Marks data serialized in the compact format.
+COMPACT_FORMAT_PREFIX = b'BSC'
+
+# The version of the compact format.  Increment whenever the layout of
+# the serialized data changes; older versions are then no longer decoded.
+COMPACT_FORMAT_VERSION = 2
+
+# Type code of the arrays used for block indices.
+_INDEX_TYPECODE = 'i'
+
+
+def is_compact(serialized_data):
+    """
+    Returns whether the given serialized data is in the compact format.
+    """
+    return serialized_data[:len(COMPACT_FORMAT_PREFIX)] == COMPACT_FORMAT_PREFIX
+
+
+def serialize_compact(root_block_usage_key, block_relations, transformer_data, block_data_map):
+    """
+    Returns the compact serialization of the given internal data of a
+    block structure.
+
+    Arguments:
+        root_block_usage_key (UsageKey) - The root of the block structure.
+        block_relations (dict {UsageKey: _BlockRelations})
+        transformer_data (TransformerDataMap)
+        block_data_map (dict {UsageKey: BlockData})
+    """
+    # Blocks with relations come first, so that their indices also index
+    # the relation offsets.
+    block_keys = list(block_relations)
+    block_keys.extend(key for key in block_data_map if key not in block_relations)
+    block_indices = {key: index for index, key in enumerate(block_keys)}
+
+    encoded_blocks, xblock_columns, transformer_columns = _encode_block_fields(block_data_map, block_indices)
+    core_segment = _dumps((
+        _encode_keys(root_block_usage_key, block_keys),
+        len(block_relations),
+        _encode_relations(block_keys, block_relations, block_indices, 'parents'),
+        _encode_relations(block_keys, block_relations, block_indices, 'children'),
+        {name: transformer_fields.fields for name, transformer_fields in six.iteritems(transformer_data)},
+        encoded_blocks,
+        xblock_columns,
+    ))
+    transformer_segments = {name: _dumps(columns) for name, columns in six.iteritems(transformer_columns)}
+    return (
+        COMPACT_FORMAT_PREFIX +
+        six.int2byte(COMPACT_FORMAT_VERSION) +
+        pickle.dumps((core_segment, transformer_segments), pickle.HIGHEST_PROTOCOL)
+    )
+
+
+def deserialize_compact(serialized_data, transformer_names=None):
+    """
+    Decodes data serialized with `serialize_compact`.
+
+    Arguments:
+        serialized_data (bytes) - The serialized data.
+        transformer_names (set(string)) - If given, only the block fields
+            of the transformers with these names are decoded.  The
+            non-block-specific data of all transformers is always decoded.
+
+    Returns:
+        (block_relations, transformer_data, block_data_map) - The internal
+            data of the serialized block structure.
+
+    Raises:
+        ValueError if the data is not in a supported version of the format.
+    """
+    if not is_compact(serialized_data):
+        raise ValueError(u'BlockStructure: data is not in the compact format.')
+    version = six.indexbytes(serialized_data, len(COMPACT_FORMAT_PREFIX))
+    if version != COMPACT_FORMAT_VERSION:
+        raise ValueError(u'BlockStructure: unsupported compact format version {}.'.format(version))
+    core_segment, transformer_segments = pickle.loads(serialized_data[len(COMPACT_FORMAT_PREFIX) + 1:])
+    (
+        encoded_keys, num_related_blocks, encoded_parents, encoded_children,
+        transformer_fields, encoded_blocks, xblock_columns,
+    ) = _loads(core_segment)
+
+    block_keys = _decode_keys(encoded_keys)
+
+    block_relations = {}
+    parent_offsets, parent_indices = _decode_relations(encoded_parents)
+    child_offsets, child_indices = _decode_relations(encoded_children)
+    for index in range(num_related_blocks):
+        relations = _BlockRelations()
+        relations.parents = [block_keys[i] for i in parent_indices[parent_offsets[index]:parent_offsets[index + 1]]]
+        relations.children = [block_keys[i] for i in child_indices[child_offsets[index]:child_offsets[index + 1]]]
+        block_relations[block_keys[index]] = relations
+
+    transformer_data = TransformerDataMap()
+    for name, fields in six.iteritems(transformer_fields):
+        transformer_data[name] = TransformerData()
+        transformer_data[name].fields = fields
+
+    block_data_list, block_data_map = _decode_block_fields(encoded_blocks, xblock_columns, block_keys)
+    for name, segment in six.iteritems(transformer_segments):
+        if transformer_names is None or name in transformer_names:
+            _decode_transformer_block_fields(name, _loads(segment), block_data_list)
+    return block_relations, transformer_data, block_data_map
+
+
+def _dumps(data):
+    """
+    Returns the given data, pickled and compressed.
+    """
+    return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+
+def _loads(segment):
+    """
+    Returns the data of the given output of `_dumps`.
+    """
+    return pickle.loads(zlib.decompress(segment))
+
+
+def _to_bytes(index_array):
+    """
+    Returns the raw bytes of the given array.
+    """
+    return index_array.tobytes() if hasattr(index_array, 'tobytes') else index_array.tostring()
+
+
+def _from_bytes(raw_bytes):
+    """
+    Returns an array of block indices from the given raw bytes.
+    """
+    index_array = array(_INDEX_TYPECODE)
+    if hasattr(index_array, 'frombytes'):
+        index_array.frombytes(raw_bytes)
+    else:
+        index_array.fromstring(raw_bytes)
+    return index_array
+
+
+def _encode_keys(root_block_usage_key, block_keys):
+    """
+    Returns the interned encoding of the given list of usage keys.
+
+    Keys in the course of the root block are stored as their block types
+    and block ids only.  Any other key is stored as is.
+    """
+    course_key = getattr(root_block_usage_key, 'course_key', None)
+    block_types, block_ids, other_keys = [], [], {}
+    for index, key in enumerate(block_keys):
+        block_type, block_id = getattr(key, 'block_type', None), getattr(key, 'block_id', None)
+        if course_key is not None and block_type is not None and (
+                course_key.make_usage_key(block_type, block_id) == key
+        ):
+            block_types.append(block_type)
+            block_ids.append(block_id)
+        else:
+            block_types.append(None)
+            block_ids.append(None)
+            other_keys[index] = key
+
+    # Intern block types, of which there are few.
+    type_table = sorted(set(block_type for block_type in block_types if block_type is not None))
+    type_indices = {block_type: index for index, block_type in enumerate(type_table)}
+    encoded_types = array(_INDEX_TYPECODE, [type_indices.get(block_type, -1) for block_type in block_types])
+    return course_key, type_table, _to_bytes(encoded_types), block_ids, other_keys
+
+
+def _decode_keys(encoded_keys):
+    """
+    Returns the list of usage keys for the given output of `_encode_keys`.
+    """
+    course_key, type_table, encoded_types, block_ids, other_keys = encoded_keys
+    block_keys = [
+        course_key.make_usage_key(type_table[type_index], block_id) if type_index >= 0 else None
+        for type_index, block_id in zip(_from_bytes(encoded_types), block_ids)
+    ]
+    for index, key in six.iteritems(other_keys):
+        block_keys[index] = key
+    return block_keys
+
+
+def _encode_relations(block_keys, block_relations, block_indices, relation_name):
+    """
+    Returns the given relation (parents or children) of each block as a
+    pair of arrays, in bytes: the offsets of each block's related blocks,
+    and the indices of the related blocks.
+    """
+    offsets = array(_INDEX_TYPECODE, [0])
+    related_indices = array(_INDEX_TYPECODE)
+    for key in block_keys[:len(block_relations)]:
+        related_indices.extend(block_indices[related] for related in getattr(block_relations[key], relation_name))
+        offsets.append(len(related_indices))
+    return _to_bytes(offsets), _to_bytes(related_indices)
+
+
+def _decode_relations(encoded_relations):
+    """
+    Returns the (offsets, indices) arrays for the given output of
+    `_encode_relations`.
+    """
+    encoded_offsets, encoded_indices = encoded_relations
+    return _from_bytes(encoded_offsets), _from_bytes(encoded_indices)
+
+
+def _encode_block_fields(block_data_map, block_indices):
+    """
+    Returns the given blocks' indices, xBlock fields and transformer block
+    fields (per transformer), with fields stored column by column.
+    """
+    xblock_columns = defaultdict(lambda: (array(_INDEX_TYPECODE), []))
+    transformer_columns = defaultdict(lambda: defaultdict(lambda: (array(_INDEX_TYPECODE), [])))
+    for key, block_data in six.iteritems(block_data_map):
+        index = block_indices[key]
+        for field_name, value in six.iteritems(block_data.fields):
+            column_indices, column_values = xblock_columns[field_name]
+            column_indices.append(index)
+            column_values.append(value)
+        for transformer_name, data in six.iteritems(block_data.transformer_data):
+            for field_name, value in six.iteritems(data.fields):
+                column_indices, column_values = transformer_columns[transformer_name][field_name]
+                column_indices.append(index)
+                column_values.append(value)
+
+    return (
+        _to_bytes(array(_INDEX_TYPECODE, [block_indices[key] for key in block_data_map])),
+        _columns_to_bytes(xblock_columns),
+        {name: _columns_to_bytes(columns) for name, columns in six.iteritems(transformer_columns)},
+    )
+
+
+def _columns_to_bytes(columns):
+    """
+    Returns a dict of the given columns with their index arrays in bytes.
+    """
+    return {
+        field_name: (_to_bytes(column_indices), column_values)
+        for field_name, (column_indices, column_values) in six.iteritems(columns)
+    }
+
+
+def _decode_block_fields(encoded_blocks, xblock_columns, block_keys):
+    """
+    Returns a list of the block data of each block, indexed as block_keys,
+    and the block data map, with xBlock fields set, for the given output of
+    `_encode_block_fields`.
+    """
+    block_data_list = [None] * len(block_keys)
+    block_data_map = {}
+    for index in _from_bytes(encoded_blocks):
+        block_data = BlockData(block_keys[index])
+        block_data_list[index] = block_data
+        block_data_map[block_keys[index]] = block_data
+
+    for field_name, (column_indices, column_values) in six.iteritems(xblock_columns):
+        for index, value in zip(_from_bytes(column_indices), column_values):
+            block_data_list[index].fields[field_name] = value
+
+    return block_data_list, block_data_map
+
+
+def _decode_transformer_block_fields(transformer_name, columns, block_data_list):
+    """
+    Sets the block fields of the given transformer, as encoded by
+    `_encode_block_fields`, on the given list of block data.
+    """
+    transformer_data_list = [None] * len(block_data_list)
+    for field_name, (column_indices, column_values) in six.iteritems(columns):
+        for index, value in zip(_from_bytes(column_indices), column_values):
+            data = transformer_data_list[index]
+            if data is None:
+                data = transformer_data_list[index] = TransformerData()
+                block_data_list[index].transformer_data[transformer_name] = data
+            data.fields[field_name] = value
@@ -8,10 +8,11 @@ from django.conf import settings
 from django.dispatch.dispatcher import receiver
 from opaque_keys.edx.locator import LibraryLocator
 
-from xmodule.modulestore.django import SignalHandler
+from xmodule.modulestore.django import SignalHandler, modulestore
 
 from . import config
 from .api import clear_course_from_cache
+from .store import invalidate_process_cache
 from .tasks import update_course_in_cache_v2
 
 
@@ -27,6 +28,8 @@ def update_block_structure_on_course_publish(sender, course_key, **kwargs):  # p
 
     if config.waffle().is_enabled(config.INVALIDATE_CACHE_ON_PUBLISH):
         clear_course_from_cache(course_key)
+    else:
+        invalidate_process_cache(modulestore().make_course_usage_key(course_key))
 
     update_course_in_cache_v2.apply_async(
         kwargs=dict(course_id=six.text_type(course_key)),
@@ -4,21 +4,37 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 from __future__ import absolute_import
 
+from copy import copy
 from logging import getLogger
 
 import six
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_metric
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.cache_utils import ProcessLRUCache, zpickle, zunpickle
 
 from . import config
-from .block_structure import BlockStructureBlockData
+from .block_structure import BlockData, BlockStructureBlockData, TransformerData, TransformerDataMap
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
 from .models import BlockStructureModel
+from .serialization import deserialize_compact, is_compact, serialize_compact
 from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Default maximum total size, in bytes, of the block structures cached in
+# each process, as measured by the size of their serialized data.
+DEFAULT_PROCESS_CACHE_MAX_SIZE = 100 * 1024 * 1024
+
+# Default number of seconds for which block structures are cached in each
+# process.
+DEFAULT_PROCESS_CACHE_TIMEOUT = 5 * 60
+
+# The process-local cache of deserialized block structure data, created
+# on first use.
+_PROCESS_CACHE = None
+
 
 class StubModel(object):
     """
@@ -68,8 +84,20 @@ class BlockStructureStore(object):
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        if _is_process_cache_enabled():
+            block_structure_data = _copy_block_structure_data((
+                block_structure._block_relations,
+                block_structure.transformer_data,
+                block_structure._block_data_map,
+            ))
+            self._add_to_process_cache(
+                block_structure.root_block_usage_key,
+                block_structure_data,
+                len(serialized_data),
+                bs_model,
+            )
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, transformer_names=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key, if found in the cache or storage.
@@ -82,6 +110,11 @@ class BlockStructureStore(object):
                 root of the block structure that is to be retrieved
                 from the store.
 
+            transformer_names (set(string)) - If given, the block data
+                of only the transformers with these names may be
+                deserialized.  Any other transformer's block data is
+                then not to be accessed.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found.
@@ -90,15 +123,36 @@ class BlockStructureStore(object):
             BlockStructureNotFound if the root_block_usage_key is not
             found.
         """
-        bs_model = self._get_model(root_block_usage_key)
+        try:
+            return self._get_from_process_cache(root_block_usage_key, transformer_names)
+        except BlockStructureNotFound:
+            pass
 
+        bs_model = self._get_model(root_block_usage_key)
         try:
             serialized_data = self._get_from_cache(bs_model)
         except BlockStructureNotFound:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        process_cache_enabled = _is_process_cache_enabled()
+        try:
+            # All of the data is deserialized when it is to be cached for
+            # the other callers of this process.
+            block_structure_data = self._deserialize(
+                serialized_data,
+                None if process_cache_enabled else transformer_names,
+            )
+        except ValueError:
+            # Data in a compact format that is no longer supported is
+            # recollected.
+            logger.info(u"BlockStructure: Not deserializable; %s.", bs_model)
+            raise BlockStructureNotFound(root_block_usage_key)
+
+        if process_cache_enabled:
+            self._add_to_process_cache(root_block_usage_key, block_structure_data, len(serialized_data), bs_model)
+            block_structure_data = _copy_block_structure_data(block_structure_data, transformer_names)
+        return BlockStructureFactory.create_new(root_block_usage_key, *block_structure_data)
 
     def delete(self, root_block_usage_key):
         """
@@ -111,6 +165,8 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        self._cache.delete(self._encode_version_cache_key(root_block_usage_key))
+        invalidate_process_cache(root_block_usage_key)
         bs_model.delete()
         logger.info(u"BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -178,6 +234,55 @@ class BlockStructureStore(object):
             raise BlockStructureNotFound(bs_model.data_usage_key)
         return serialized_data
 
+    def _add_to_process_cache(self, root_block_usage_key, block_structure_data, size, bs_model):
+        """
+        Adds the given deserialized block_structure_data, of the given
+        serialized size, for the given BlockStructureModel to the
+        process-local cache.  The data is not to be modified afterwards.
+
+        The version of the block structure is also added to the cache,
+        for processes to check their cached data against.
+        """
+        version_data = self._version_data_of_model(bs_model)
+        self._cache.set(
+            self._encode_version_cache_key(root_block_usage_key),
+            version_data,
+            timeout=config.cache_timeout_in_seconds(),
+        )
+        num_evicted = _get_process_cache().set(
+            root_block_usage_key,
+            (version_data, size, block_structure_data),
+        )
+        if num_evicted:
+            set_custom_metric('block_structure_process_cache_evictions', num_evicted)
+
+    def _get_from_process_cache(self, root_block_usage_key, transformer_names=None):
+        """
+        Returns a copy of the block structure starting at the given
+        root_block_usage_key from the process-local cache.
+
+        Cached data is only returned if it was cached for the version of
+        the block structure in the cache, since other processes publishing
+        the course don't invalidate this process's cache.  That version is
+        read from the cache rather than from storage, so that a hit needs
+        no database query.
+        Raises:
+             BlockStructureNotFound if not found.
+        """
+        if not _is_process_cache_enabled():
+            raise BlockStructureNotFound(root_block_usage_key)
+
+        cached = _get_process_cache().get(root_block_usage_key)
+        if cached is None or cached[0] != self._cache.get(self._encode_version_cache_key(root_block_usage_key)):
+            set_custom_metric('block_structure_process_cache', 'miss')
+            raise BlockStructureNotFound(root_block_usage_key)
+
+        set_custom_metric('block_structure_process_cache', 'hit')
+        return BlockStructureFactory.create_new(
+            root_block_usage_key,
+            *_copy_block_structure_data(cached[2], transformer_names)
+        )
+
     def _get_from_store(self, bs_model):
         """
         Returns the serialized data for the given BlockStructureModel
@@ -192,8 +297,16 @@ class BlockStructureStore(object):
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, in the compact
+        format if enabled.
         """
+        if _is_compact_serialization_enabled():
+            return serialize_compact(
+                block_structure.root_block_usage_key,
+                block_structure._block_relations,
+                block_structure.transformer_data,
+                block_structure._block_data_map,
+            )
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -201,17 +314,16 @@ class BlockStructureStore(object):
         )
         return zpickle(data_to_cache)
 
-    def _deserialize(self, serialized_data, root_block_usage_key):
+    def _deserialize(self, serialized_data, transformer_names=None):
         """
-        Deserializes the given data and returns the parsed block_structure.
+        Deserializes the given data, in either of the compact or pickled
+        formats, and returns the parsed (block_relations, transformer_data,
+        block_data_map) of the block structure.  Only data in the compact
+        format is partially deserialized for the given transformer_names.
         """
-        block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
-        return BlockStructureFactory.create_new(
-            root_block_usage_key,
-            block_relations,
-            transformer_data,
-            block_data_map,
-        )
+        if is_compact(serialized_data):
+            return deserialize_compact(serialized_data, transformer_names)
+        return zunpickle(serialized_data)
 
     @staticmethod
     def _encode_root_cache_key(bs_model):
@@ -228,6 +340,14 @@ class BlockStructureStore(object):
                 root_usage_key=six.text_type(bs_model.data_usage_key),
             )
 
+    @staticmethod
+    def _encode_version_cache_key(root_block_usage_key):
+        """
+        Returns the cache key of the version of the block structure
+        starting at the given root_block_usage_key.
+        """
+        return u"block_structure.version.{}".format(six.text_type(root_block_usage_key))
+
     @staticmethod
     def _version_data_of_block(root_block):
         """
@@ -252,8 +372,94 @@ class BlockStructureStore(object):
         }
 
 
+def _copy_block_structure_data(block_structure_data, transformer_names=None):
+    """
+    Returns a copy of the given (block_relations, transformer_data,
+    block_data_map) of a block structure whose blocks, relations and
+    transformer data can be modified without changing the given ones.
+    If transformer_names is given, only the block data of the
+    transformers with these names is copied.
+
+    The collected values themselves are not copied, which is what makes
+    this much cheaper than deserializing the data again.
+    """
+    block_relations, transformer_data, block_data_map = block_structure_data
+
+    block_relations_copy = {}
+    for usage_key, relations in six.iteritems(block_relations):
+        relations_copy = copy(relations)
+        relations_copy.parents = list(relations.parents)
+        relations_copy.children = list(relations.children)
+        block_relations_copy[usage_key] = relations_copy
+
+    block_data_map_copy = {}
+    for usage_key, block_data in six.iteritems(block_data_map):
+        block_data_copy = BlockData(usage_key)
+        block_data_copy.fields = dict(block_data.fields)
+        block_data_copy.transformer_data = _copy_transformer_data_map(block_data.transformer_data, transformer_names)
+        block_data_map_copy[usage_key] = block_data_copy
+
+    return block_relations_copy, _copy_transformer_data_map(transformer_data), block_data_map_copy
+
+
+def _copy_transformer_data_map(transformer_data_map, transformer_names=None):
+    """
+    Returns a copy of the given TransformerDataMap, of only the data of
+    the transformers with the given names if given.
+    """
+    transformer_data_map_copy = TransformerDataMap()
+    for name, transformer_data in six.iteritems(transformer_data_map):
+        if transformer_names is None or name in transformer_names:
+            transformer_data_copy = TransformerData()
+            transformer_data_copy.fields = dict(transformer_data.fields)
+            transformer_data_map_copy[name] = transformer_data_copy
+    return transformer_data_map_copy
+
+
+def invalidate_process_cache(root_block_usage_key):
+    """
+    Removes the block structure for the given root_block_usage_key from
+    the cache of the current process.
+    """
+    if _PROCESS_CACHE is not None:
+        _PROCESS_CACHE.delete(root_block_usage_key)
+
+
+def _get_process_cache():
+    """
+    Returns the process-local cache of deserialized block structure data,
+    creating it on first use.
+    """
+    global _PROCESS_CACHE  # pylint: disable=global-statement
+    if _PROCESS_CACHE is None:
+        _PROCESS_CACHE = ProcessLRUCache(
+            max_size=settings.BLOCK_STRUCTURES_SETTINGS.get('PROCESS_CACHE_MAX_SIZE', DEFAULT_PROCESS_CACHE_MAX_SIZE),
+            sizeof=lambda cached: cached[1],
+            timeout=settings.BLOCK_STRUCTURES_SETTINGS.get('PROCESS_CACHE_TIMEOUT', DEFAULT_PROCESS_CACHE_TIMEOUT),
+        )
+    return _PROCESS_CACHE
+
+
 def _is_storage_backing_enabled():
     """
     Returns whether storage backing for Block Structures is enabled.
     """
     return config.waffle().is_enabled(config.STORAGE_BACKING_FOR_CACHE)
+
+
+def _is_compact_serialization_enabled():
+    """
+    Returns whether Block Structures are to be serialized in the compact
+    format.
+    """
+    return config.waffle().is_enabled(config.COMPACT_SERIALIZATION)
+
+
+def _is_process_cache_enabled():
+    """
+    Returns whether Block Structures are to be cached in each process.
+
+    This requires storage backing: only its model tells the version of a
+    block structure without collecting it again.
+    """
+    return _is_storage_backing_enabled() and config.waffle().is_enabled(config.PROCESS_CACHE)
@@ -16,7 +16,7 @@ from six.moves import range
 
 from openedx.core.lib.graph_traversals import traverse_post_order
 
-from ..block_structure import BlockStructure, BlockStructureModulestoreData
+from ..block_structure import EDITED_ON_FIELD, BlockStructure, BlockStructureModulestoreData
 from ..exceptions import TransformerException
 from .helpers import ChildrenMapTestMixin, MockTransformer, MockXBlock
 
@@ -263,6 +263,71 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
 
         self.assert_block_structure(block_structure, pruned_children_map, missing_blocks)
 
+    def _create_modulestore_block_structure(self, children_map, edited_on_map):
+        """
+        Returns a modulestore block structure for the given children map,
+        with mock xBlocks edited on the times in the given map.
+        """
+        block_structure = self.create_block_structure(children_map, BlockStructureModulestoreData)
+        for block in range(len(children_map)):
+            field_map = {EDITED_ON_FIELD: edited_on_map[block]} if block in edited_on_map else {}
+            block_structure._add_xblock(block, MockXBlock(block, field_map))
+        return block_structure
+
+    @ddt.data(
+        ({}, set()),
+        ({3: 2}, {0, 1, 3}),
+        ({1: 2}, {0, 1, 3, 4}),
+        ({2: None}, {0, 2}),
+        ({0: 2}, {0, 1, 2, 3, 4}),
+    )
+    @ddt.unpack
+    def test_get_changed_block_keys(self, edits, expected_changed_block_keys):
+        children_map = ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP
+        collected_block_structure = self._create_modulestore_block_structure(
+            children_map, {block: 1 for block in range(len(children_map))},
+        )
+        collected_block_structure.request_xblock_fields(EDITED_ON_FIELD)
+        collected_block_structure._collect_requested_xblock_fields()
+
+        edited_on_map = {block: 1 for block in range(len(children_map))}
+        edited_on_map.update(edits)
+        block_structure = self._create_modulestore_block_structure(children_map, edited_on_map)
+        self.assertEquals(
+            block_structure._get_changed_block_keys(collected_block_structure),
+            expected_changed_block_keys,
+        )
+
+    def test_get_changed_block_keys_with_changed_children(self):
+        collected_block_structure = self._create_modulestore_block_structure(
+            ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, {block: 1 for block in range(5)},
+        )
+        collected_block_structure.request_xblock_fields(EDITED_ON_FIELD)
+        collected_block_structure._collect_requested_xblock_fields()
+
+        # block 4 moved from block 1 to block 2, and block 5 was added
+        block_structure = self._create_modulestore_block_structure(
+            [[1, 2], [3], [4, 5], [], [], []], {block: 1 for block in range(6)},
+        )
+        self.assertEquals(
+            block_structure._get_changed_block_keys(collected_block_structure),
+            {0, 1, 2, 3, 4, 5},
+        )
+
+    def test_copy_transformer_block_data(self):
+        source_block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        for block in range(3):
+            source_block_structure.set_transformer_block_field(block, MockTransformer, 'test_key', block)
+
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        block_structure.set_transformer_block_field(0, MockTransformer, 'test_key', 'new')
+        block_structure.copy_transformer_block_data(MockTransformer, source_block_structure, [1, 2, 3])
+
+        self.assertEquals(block_structure.get_transformer_block_field(0, MockTransformer, 'test_key'), 'new')
+        self.assertEquals(block_structure.get_transformer_block_field(1, MockTransformer, 'test_key'), 1)
+        self.assertEquals(block_structure.get_transformer_block_field(2, MockTransformer, 'test_key'), 2)
+        self.assertIsNone(block_structure.get_transformer_block_field(3, MockTransformer, 'test_key'))
+
     def test_remove_block_traversal(self):
         block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
         block_structure.remove_block_traversal(lambda block: block == 2)
@@ -6,10 +6,18 @@ from __future__ import absolute_import
 import ddt
 import six
 from django.test import TestCase
-
-from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from mock import patch
+
+from ..block_structure import EDITED_ON_FIELD, BlockStructureBlockData
+from ..config import (
+    COMPACT_SERIALIZATION,
+    INCREMENTAL_COLLECT,
+    RAISE_ERROR_WHEN_NOT_FOUND,
+    STORAGE_BACKING_FOR_CACHE,
+    waffle
+)
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
+from ..factory import BlockStructureFactory
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
 from .helpers import (
@@ -94,6 +102,30 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + six.text_type(block_key)
 
 
+class TestIncrementalTransformer(TestTransformer1):
+    """
+    Test Transformer class that supports incremental collection.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    changed_block_keys = None
+
+    @classmethod
+    def collect_incremental(cls, block_structure, collected_block_structure, changed_block_keys):
+        """
+        Collects block data for the changed blocks of the block structure.
+        """
+        cls.changed_block_keys = changed_block_keys
+        block_structure.copy_transformer_block_data(
+            cls,
+            collected_block_structure,
+            [block_key for block_key in block_structure if block_key not in changed_block_keys],
+        )
+        for block_key in changed_block_keys:
+            block_structure.set_transformer_block_field(
+                block_key, cls, cls.collect_data_key, cls._create_block_value(block_key, cls.collect_data_key)
+            )
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -166,6 +198,23 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    def test_get_transformed_with_collected_transformers(self):
+        registered_transformers = [TestTransformer1(), TestIncrementalTransformer()]
+        with waffle().override(COMPACT_SERIALIZATION, active=True):
+            with mock_registered_transformers(registered_transformers):
+                self.bs_manager.get_collected()
+                block_structure = self.bs_manager.get_transformed(
+                    BlockStructureTransformers([TestTransformer1()]),
+                    collected_transformers=[],
+                )
+        TestTransformer1.assert_collected(block_structure)
+        TestTransformer1.assert_transformed(block_structure)
+        self.assertIsNone(
+            block_structure.get_transformer_block_field(
+                self.block_key_factory(0), TestIncrementalTransformer, TestIncrementalTransformer.collect_data_key,
+            )
+        )
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with self.assertRaises(UsageKeyNotInBlockStructure):
@@ -224,3 +273,76 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+    def test_update_collected_incrementally(self):
+        TestIncrementalTransformer.collect_call_count = 0
+        TestIncrementalTransformer.changed_block_keys = None
+        registered_transformers = [TestIncrementalTransformer()]
+        for block in six.itervalues(self.modulestore.blocks):
+            block.field_map[EDITED_ON_FIELD] = 1
+
+        with waffle().override(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+                self.assertIsNone(TestIncrementalTransformer.changed_block_keys)
+
+                self.modulestore.blocks[self.block_key_factory(3)].field_map[EDITED_ON_FIELD] = 2
+                self.bs_manager.update_collected_if_needed()
+                block_structure = self.bs_manager.get_collected()
+
+        self.assertEquals(
+            TestIncrementalTransformer.changed_block_keys,
+            {self.block_key_factory(0), self.block_key_factory(1), self.block_key_factory(3)},
+        )
+        self.assertEquals(TestIncrementalTransformer.collect_call_count, 1)
+        TestIncrementalTransformer.assert_collected(block_structure)
+        self.assertEquals(block_structure.get_xblock_field(self.block_key_factory(3), EDITED_ON_FIELD), 2)
+
+    def test_update_collected_fully_unless_all_incremental(self):
+        TestIncrementalTransformer.collect_call_count = 0
+        TestIncrementalTransformer.changed_block_keys = None
+        registered_transformers = [TestTransformer1(), TestIncrementalTransformer()]
+        with waffle().override(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+                with patch.object(BlockStructureManager, '_get_from_store') as mock_get_from_store:
+                    self.modulestore.blocks[self.block_key_factory(3)].field_map[EDITED_ON_FIELD] = 2
+                    self.bs_manager.update_collected_if_needed()
+                block_structure = self.bs_manager.get_collected()
+
+        self.assertFalse(mock_get_from_store.called)
+        self.assertIsNone(TestIncrementalTransformer.changed_block_keys)
+        self.assertEquals(TestIncrementalTransformer.collect_call_count, 2)
+        self.assertEquals(TestTransformer1.collect_call_count, 2)
+        TestTransformer1.assert_collected(block_structure)
+        TestIncrementalTransformer.assert_collected(block_structure)
+
+    @ddt.data(
+        ([TestIncrementalTransformer()], True),
+        ([TestTransformer1(), TestIncrementalTransformer()], False),
+    )
+    @ddt.unpack
+    def test_update_collected_incrementally_lazy(self, registered_transformers, expect_lazy):
+        with waffle().override(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+                with patch.object(
+                    BlockStructureFactory,
+                    'create_from_modulestore',
+                    wraps=BlockStructureFactory.create_from_modulestore,
+                ) as mock_create:
+                    self.modulestore.blocks[self.block_key_factory(3)].field_map[EDITED_ON_FIELD] = 2
+                    self.bs_manager.update_collected_if_needed()
+        mock_create.assert_called_once_with(self.block_key_factory(0), self.modulestore, lazy=expect_lazy)
+
+    def test_update_collected_incrementally_without_collected(self):
+        registered_transformers = [TestIncrementalTransformer()]
+        TestIncrementalTransformer.collect_call_count = 0
+        TestIncrementalTransformer.changed_block_keys = None
+        with waffle().override(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+                self.bs_manager.clear()
+                self.bs_manager.update_collected_if_needed()
+        self.assertEquals(TestIncrementalTransformer.collect_call_count, 2)
+        self.assertIsNone(TestIncrementalTransformer.changed_block_keys)
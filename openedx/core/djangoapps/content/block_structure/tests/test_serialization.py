@@ -0,0 +1,142 @@
+"""
+Tests for block_structure/serialization.py
+"""
+from __future__ import absolute_import
+
+from datetime import datetime
+from unittest import TestCase
+
+import ddt
+from mock import patch
+from pytz import UTC
+
+from .. import serialization
+from ..block_structure import BlockData, BlockStructureBlockData
+from ..factory import BlockStructureFactory
+from ..serialization import deserialize_compact, is_compact, serialize_compact
+from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, UsageKeyFactoryMixin
+
+
+def _serialize(block_structure):
+    """
+    Returns the compact serialization of the given block structure.
+    """
+    return serialize_compact(
+        block_structure.root_block_usage_key,
+        block_structure._block_relations,  # pylint: disable=protected-access
+        block_structure.transformer_data,
+        block_structure._block_data_map,  # pylint: disable=protected-access
+    )
+
+
+def _deserialize(serialized_data, root_block_usage_key):
+    """
+    Returns the block structure for the given compact serialization.
+    """
+    return BlockStructureFactory.create_new(root_block_usage_key, *deserialize_compact(serialized_data))
+
+
+@ddt.ddt
+class TestCompactSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the compact serialization of block structures.
+    """
+    def _create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children map with xBlock
+        fields and transformer data set on its blocks.
+        """
+        block_structure = self.create_block_structure(children_map, BlockStructureBlockData)
+        for block_key in block_structure:
+            block_data = BlockData(block_key)
+            block_data.display_name = u'Block {}'.format(block_key.block_id)
+            if int(block_key.block_id) % 2:
+                block_data.start = datetime(2019, 1, int(block_key.block_id), tzinfo=UTC)
+            block_structure._block_data_map[block_key] = block_data  # pylint: disable=protected-access
+            block_structure.set_transformer_block_field(
+                block_key, MockTransformer, 'odd', bool(int(block_key.block_id) % 2)
+            )
+        block_structure.set_transformer_data(MockTransformer, 'version', 1)
+        return block_structure
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self._create_collected_block_structure(children_map)
+        serialized_data = _serialize(block_structure)
+        self.assertTrue(is_compact(serialized_data))
+
+        result = _deserialize(serialized_data, block_structure.root_block_usage_key)
+        self.assert_block_structure(result, children_map)
+        for block_key in block_structure:
+            self.assertEqual(result.get_parents(block_key), block_structure.get_parents(block_key))
+            self.assertEqual(result.get_children(block_key), block_structure.get_children(block_key))
+            self.assertEqual(result[block_key].location, block_key)
+            self.assertEqual(result[block_key].fields, block_structure[block_key].fields)
+            self.assertEqual(
+                result.get_transformer_block_field(block_key, MockTransformer, 'odd'),
+                bool(int(block_key.block_id) % 2),
+            )
+        self.assertEqual(result.get_transformer_data(MockTransformer, 'version'), 1)
+
+    def test_blocks_outside_relations(self):
+        # Blocks that are pruned as unreachable keep their block data.
+        block_structure = self._create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.get_children(self.block_key_factory(0)).remove(self.block_key_factory(2))
+        block_structure._prune_unreachable()  # pylint: disable=protected-access
+
+        result = _deserialize(_serialize(block_structure), block_structure.root_block_usage_key)
+        self.assert_block_structure(result, self.SIMPLE_CHILDREN_MAP, missing_blocks=[2])
+        self.assertEqual(result[self.block_key_factory(2)].display_name, u'Block 2')
+
+    def test_keys_from_other_courses(self):
+        block_structure = self.create_block_structure([[1], []], BlockStructureBlockData)
+        other_course_key = self.course_key.replace(run='other_run')
+        other_block_key = other_course_key.make_usage_key('html', 'other')
+        block_structure._add_relation(self.block_key_factory(1), other_block_key)  # pylint: disable=protected-access
+
+        result = _deserialize(_serialize(block_structure), block_structure.root_block_usage_key)
+        self.assertEqual(result.get_children(self.block_key_factory(1)), [other_block_key])
+        self.assertEqual(result.get_parents(other_block_key), [self.block_key_factory(1)])
+
+    def test_partial_deserialization(self):
+        block_structure = self._create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        for block_key in block_structure:
+            block_structure.set_transformer_block_field(block_key, MockFilteringTransformer, 'other', True)
+        block_structure.set_transformer_data(MockFilteringTransformer, 'version', 2)
+
+        block_relations, transformer_data, block_data_map = deserialize_compact(
+            _serialize(block_structure), {MockTransformer.name()},
+        )
+        result = BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key, block_relations, transformer_data, block_data_map,
+        )
+        self.assert_block_structure(result, self.SIMPLE_CHILDREN_MAP)
+        for block_key in block_structure:
+            self.assertEqual(result[block_key].fields, block_structure[block_key].fields)
+            self.assertEqual(
+                result.get_transformer_block_field(block_key, MockTransformer, 'odd'),
+                bool(int(block_key.block_id) % 2),
+            )
+            self.assertIsNone(result.get_transformer_block_field(block_key, MockFilteringTransformer, 'other'))
+        self.assertEqual(result.get_transformer_data(MockFilteringTransformer, 'version'), 2)
+
+    def test_not_compact(self):
+        self.assertFalse(is_compact(b'x\x9c'))
+        with self.assertRaises(ValueError):
+            deserialize_compact(b'x\x9c')
+
+    def test_previous_version(self):
+        # Data in the first version of the format is compressed as a whole.
+        with self.assertRaises(ValueError):
+            deserialize_compact(serialization.COMPACT_FORMAT_PREFIX + b'x\x9c')
+
+    def test_unsupported_version(self):
+        block_structure = self._create_collected_block_structure(self.LINEAR_CHILDREN_MAP)
+        with patch.object(serialization, 'COMPACT_FORMAT_VERSION', serialization.COMPACT_FORMAT_VERSION + 1):
+            serialized_data = _serialize(block_structure)
+        with self.assertRaises(ValueError):
+            deserialize_compact(serialized_data)
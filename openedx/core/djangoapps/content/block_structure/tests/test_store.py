@@ -4,14 +4,19 @@ Tests for block_structure/cache.py
 from __future__ import absolute_import
 
 import ddt
+from mock import patch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE, waffle
+from .. import serialization
+from .. import store as store_module
+from ..config import COMPACT_SERIALIZATION, PROCESS_CACHE, STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
+from ..models import BlockStructureModel
 from ..exceptions import BlockStructureNotFound
-from ..store import BlockStructureStore
-from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer, UsageKeyFactoryMixin
+from ..serialization import is_compact
+from ..store import BlockStructureStore, invalidate_process_cache
+from .helpers import ChildrenMapTestMixin, MockCache, MockFilteringTransformer, MockTransformer, UsageKeyFactoryMixin
 
 
 @ddt.ddt
@@ -31,6 +36,10 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.mock_cache = MockCache()
         self.store = BlockStructureStore(self.mock_cache)
 
+        patcher = patch.object(store_module, '_PROCESS_CACHE', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def add_transformers(self):
         """
         Add each registered transformer to the block structure.
@@ -90,3 +99,162 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+    @ddt.data(True, False)
+    def test_compact_serialization(self, with_storage_backing):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with waffle().override(COMPACT_SERIALIZATION, active=True):
+                self.store.add(self.block_structure)
+            self.assertTrue(all(is_compact(value) for value in self.mock_cache.map.values()))
+
+            if with_storage_backing:
+                self.mock_cache.map.clear()
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+            self.assertEquals(
+                stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+                u'{} val'.format(MockTransformer.name()),
+            )
+
+    @ddt.data(True, False)
+    def test_partial_get(self, compact_serialization):
+        self.block_structure.set_transformer_block_field(
+            self.block_key_factory(0), MockFilteringTransformer, 'test', u'other val',
+        )
+        with waffle().override(COMPACT_SERIALIZATION, active=compact_serialization):
+            self.store.add(self.block_structure)
+        stored_value = self.store.get(self.block_structure.root_block_usage_key, {MockTransformer.name()})
+        self.assertEquals(
+            stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+            u'{} val'.format(MockTransformer.name()),
+        )
+        # Only data in the compact format is partially deserialized.
+        self.assertEquals(
+            stored_value.get_transformer_block_field(self.block_key_factory(0), MockFilteringTransformer, 'test'),
+            None if compact_serialization else u'other val',
+        )
+
+    def test_unsupported_compact_version(self):
+        with waffle().override(COMPACT_SERIALIZATION, active=True):
+            with patch.object(serialization, 'COMPACT_FORMAT_VERSION', serialization.COMPACT_FORMAT_VERSION + 1):
+                self.store.add(self.block_structure)
+            with self.assertRaises(BlockStructureNotFound):
+                self.store.get(self.block_structure.root_block_usage_key)
+
+    def test_pickled_and_compact_coexist(self):
+        """
+        Structures stored in either format can be read regardless of the
+        format currently being written.
+        """
+        self.store.add(self.block_structure)
+        with waffle().override(COMPACT_SERIALIZATION, active=True):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+
+            self.store.add(self.block_structure)
+        stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+
+    def test_process_cache(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_CACHE, active=True):
+                self.store.add(self.block_structure)
+                self.mock_cache.map.clear()
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+                self.assert_block_structure(stored_value, self.children_map)
+
+                # Transforming a returned structure does not change the cached one.
+                stored_value.remove_block(self.block_key_factory(1), keep_descendants=False)
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+                self.assert_block_structure(stored_value, self.children_map)
+                self.assertEquals(store_module._PROCESS_CACHE.hits, 2)  # pylint: disable=protected-access
+
+    def test_process_cache_requires_storage_backing(self):
+        with waffle().override(PROCESS_CACHE, active=True):
+            self.store.add(self.block_structure)
+            self.mock_cache.map.clear()
+            with self.assertRaises(BlockStructureNotFound):
+                self.store.get(self.block_structure.root_block_usage_key)
+            self.assertIsNone(store_module._PROCESS_CACHE)  # pylint: disable=protected-access
+
+    def test_process_cache_populated_on_get(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            with waffle().override(PROCESS_CACHE, active=True):
+                self.store.get(self.block_structure.root_block_usage_key)
+                self.mock_cache.map.clear()
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+                self.assert_block_structure(stored_value, self.children_map)
+
+    def test_process_cache_hit_without_queries(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_CACHE, active=True):
+                self.store.add(self.block_structure)
+                with self.assertNumQueries(0):
+                    stored_value = self.store.get(self.block_structure.root_block_usage_key)
+                self.assert_block_structure(stored_value, self.children_map)
+
+    def test_process_cache_partial_get(self):
+        root_key = self.block_key_factory(0)
+        self.block_structure._add_transformer(MockFilteringTransformer)  # pylint: disable=protected-access
+        self.block_structure.set_transformer_block_field(root_key, MockFilteringTransformer, 'test', u'filtered')
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_CACHE, active=True):
+                self.store.add(self.block_structure)
+                stored_value = self.store.get(root_key, transformer_names={MockTransformer.name()})
+                stored_value.set_transformer_block_field(root_key, MockTransformer, 'test', u'changed')
+                self.assertIsNone(stored_value.get_transformer_block_field(root_key, MockFilteringTransformer, 'test'))
+
+                # Modifying a returned structure does not change the cached one.
+                stored_value = self.store.get(root_key)
+                self.assertEquals(
+                    stored_value.get_transformer_block_field(root_key, MockTransformer, 'test'),
+                    u'{} val'.format(MockTransformer.name()),
+                )
+                self.assertEquals(
+                    stored_value.get_transformer_block_field(root_key, MockFilteringTransformer, 'test'),
+                    u'filtered',
+                )
+
+    @patch.object(store_module, 'set_custom_metric')
+    def test_process_cache_version_mismatch(self, mock_set_custom_metric):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_CACHE, active=True):
+                self.store.add(self.block_structure)
+                # the course is published and collected again by another process
+                BlockStructureModel.objects.filter(
+                    data_usage_key=self.block_structure.root_block_usage_key,
+                ).update(data_version=u'published.elsewhere')
+                self.mock_cache.set(
+                    BlockStructureStore._encode_version_cache_key(  # pylint: disable=protected-access
+                        self.block_structure.root_block_usage_key
+                    ),
+                    BlockStructureStore._version_data_of_model(  # pylint: disable=protected-access
+                        BlockStructureModel.get(self.block_structure.root_block_usage_key)
+                    ),
+                    timeout=None,
+                )
+                self.store.get(self.block_structure.root_block_usage_key)
+                mock_set_custom_metric.assert_any_call('block_structure_process_cache', 'miss')
+
+    def test_process_cache_invalidation(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_CACHE, active=True):
+                self.store.add(self.block_structure)
+                invalidate_process_cache(self.block_structure.root_block_usage_key)
+                self.assertIsNone(
+                    store_module._PROCESS_CACHE.get(  # pylint: disable=protected-access
+                        self.block_structure.root_block_usage_key
+                    )
+                )
+
+    @patch.object(store_module, 'set_custom_metric')
+    def test_process_cache_metrics(self, mock_set_custom_metric):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_CACHE, active=True):
+                self.store.add(self.block_structure)
+                self.store.get(self.block_structure.root_block_usage_key)
+                mock_set_custom_metric.assert_called_with('block_structure_process_cache', 'hit')
+                invalidate_process_cache(self.block_structure.root_block_usage_key)
+                self.store.get(self.block_structure.root_block_usage_key)
+                mock_set_custom_metric.assert_called_with('block_structure_process_cache', 'miss')
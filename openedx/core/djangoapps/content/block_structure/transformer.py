@@ -57,6 +57,12 @@ class BlockStructureTransformer(object):
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the transformer overrides collect_incremental to collect
+    # data for changed blocks only.  When all registered transformers
+    # do, the xBlocks of the block structure are loaded lazily, so that
+    # the content of unchanged blocks is not read from the modulestore.
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
@@ -107,6 +113,34 @@ class BlockStructureTransformer(object):
         """
         pass
 
+    @classmethod
+    def collect_incremental(cls, block_structure, collected_block_structure, changed_block_keys):
+        """
+        Collects data into the block_structure as the collect method
+        does, but only for the blocks identified by changed_block_keys,
+        reusing the data previously collected for all other blocks.
+        Only called on transformers whose previously collected data is
+        of their WRITE_VERSION.  By default, collects data for all
+        blocks by calling the collect method; transformers overriding
+        this method should also set SUPPORTS_INCREMENTAL_COLLECT.
+
+        Transformers can call block_structure.copy_transformer_block_data
+        to reuse the previously collected data of unchanged blocks.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - A mutable
+                block structure that is to be modified with collected
+                data to be cached for the transformer.
+
+            collected_block_structure (BlockStructureBlockData) - The
+                block structure previously collected for the same root.
+
+            changed_block_keys (set(UsageKey)) - Usage keys of the
+                blocks whose data is to be collected anew.  Includes the
+                descendants and ancestors of every changed block.
+        """
+        cls.collect(block_structure)
+
     @abstractmethod
     def transform(self, usage_info, block_structure):
         """
@@ -6,6 +6,8 @@ from __future__ import absolute_import
 import functools
 from logging import getLogger
 
+import six
+
 from .exceptions import TransformerDataIncompatible, TransformerException
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
@@ -71,6 +73,16 @@ class BlockStructureTransformers(object):
                 self._transformers['no_filter'].append(transformer)
         return self
 
+    def names(self):
+        """
+        Returns the set of names of the transformers in the collection.
+        """
+        return {
+            transformer.name()
+            for transformers in six.itervalues(self._transformers)
+            for transformer in transformers
+        }
+
     @classmethod
     def collect(cls, block_structure):
         """
@@ -83,6 +95,55 @@ class BlockStructureTransformers(object):
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def collect_incremental(cls, block_structure, collected_block_structure):
+        """
+        Collects data for each registered transformer, collecting data
+        only for changed blocks for transformers that support it and
+        reusing their data in the given previously collected block
+        structure for all other blocks.
+        """
+        changed_block_keys = block_structure._get_changed_block_keys(collected_block_structure)  # pylint: disable=protected-access
+        logger.info(
+            u'BlockStructure: Incrementally collecting %d of %d blocks for %s.',
+            len(changed_block_keys),
+            len(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        for transformer in TransformerRegistry.get_registered_transformers():
+            block_structure._add_transformer(transformer)  # pylint: disable=protected-access
+            if cls._is_collected_data_current(transformer, collected_block_structure):
+                transformer.collect_incremental(block_structure, collected_block_structure, changed_block_keys)
+            else:
+                transformer.collect(block_structure)
+
+        # Collect all fields that were requested by the transformers.
+        block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+
+    @classmethod
+    def supports_incremental_collect(cls, collected_block_structure=None):
+        """
+        Returns whether every registered transformer can collect its
+        data incrementally, from the given previously collected block
+        structure if any, so that unchanged blocks need not be loaded.
+        """
+        return all(
+            transformer.SUPPORTS_INCREMENTAL_COLLECT and (
+                collected_block_structure is None or
+                cls._is_collected_data_current(transformer, collected_block_structure)
+            )
+            for transformer in TransformerRegistry.get_registered_transformers()
+        )
+
+    @classmethod
+    def _is_collected_data_current(cls, transformer, collected_block_structure):
+        """
+        Returns whether the given transformer's data in the given block
+        structure was collected by its current WRITE_VERSION.
+        """
+        # pylint: disable=protected-access
+        return collected_block_structure._get_transformer_data_version(transformer) == transformer.WRITE_VERSION
+
     @classmethod
     def verify_versions(cls, block_structure):
         """
@@ -3,13 +3,20 @@ Helper functions for caching course assets.
 """
 from __future__ import absolute_import
 
+import errno
+import hashlib
+import os
+from collections import namedtuple
+from tempfile import NamedTemporaryFile
+
 import six
 
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContentStream
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -18,6 +25,14 @@ try:
 except InvalidCacheBackendError:
     pass
 
+# Cached instead of the metadata of assets which were not found, for ASSET_NOT_FOUND_CACHE_TIMEOUT seconds
+# only, as assets may be added without their cached entries being deleted (e.g. by course imports).
+ASSET_NOT_FOUND = u'not_found'
+ASSET_NOT_FOUND_CACHE_TIMEOUT = 60
+
+# The metadata of a piece of content needed to answer requests without loading its data.
+AssetMetadata = namedtuple('AssetMetadata', ['content_digest', 'last_modified_at', 'locked', 'length', 'content_type'])
+
 
 def set_cached_content(content):
     """
@@ -33,9 +48,47 @@ def get_cached_content(location):
     return CONTENT_CACHE.get(six.text_type(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
 
 
+def _metadata_key(location):
+    """
+    Returns the cache key of the metadata of the content at the given location.
+    """
+    return u'metadata:{}'.format(six.text_type(location)).encode("utf-8")
+
+
+def set_cached_asset_metadata(content):
+    """
+    Stores the metadata of the given piece of content in the cache, using its location as the key.
+    """
+    metadata = AssetMetadata(
+        content_digest=getattr(content, 'content_digest', None),
+        last_modified_at=content.last_modified_at,
+        locked=getattr(content, 'locked', False),
+        length=content.length,
+        content_type=content.content_type,
+    )
+    CONTENT_CACHE.set(_metadata_key(content.location), metadata, version=STATIC_CONTENT_VERSION)
+
+
+def set_cached_asset_not_found(location):
+    """
+    Stores, for a short while, that there is no content at the given location.
+    """
+    CONTENT_CACHE.set(
+        _metadata_key(location), ASSET_NOT_FOUND, ASSET_NOT_FOUND_CACHE_TIMEOUT, version=STATIC_CONTENT_VERSION
+    )
+
+
+def get_cached_asset_metadata(location):
+    """
+    Retrieves the AssetMetadata of the content at the given location if cached, or ASSET_NOT_FOUND if the
+    content was recently found not to exist.
+    """
+    return CONTENT_CACHE.get(_metadata_key(location), version=STATIC_CONTENT_VERSION)
+
+
 def del_cached_content(location):
     """
-    Delete content for the given location, as well versions of the content without a run.
+    Delete content, and its metadata, for the given location, as well versions of the content without a run.
 
     It's possible that the content could have been cached without knowing the course_key,
     and so without having the run.
@@ -44,11 +97,117 @@ def del_cached_content(location):
         """Force the location to a Unicode string."""
         return six.text_type(loc).encode("utf-8")
 
-    locations = [location_str(location)]
+    locations = [location]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        locations.append(location.replace(run=None))
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    CONTENT_CACHE.delete_many(
+        [location_str(loc) for loc in locations] + [_metadata_key(loc) for loc in locations],
+        version=STATIC_CONTENT_VERSION,
+    )
+
+
+class DiskCachedContent(StaticContentStream):
+    """
+    A piece of content whose data is read from a file of the local disk cache.
+
+    The file is only opened when the data is streamed, and can also be served directly from its path.
+    """
+    def __init__(self, content, path):
+        super(DiskCachedContent, self).__init__(
+            content.location, content.name, content.content_type, None, last_modified_at=content.last_modified_at,
+            thumbnail_location=content.thumbnail_location, import_path=content.import_path, length=content.length,
+            locked=content.locked, content_digest=content.content_digest,
+        )
+        self.path = path
+
+    def stream_data(self):
+        with open(self.path, 'rb') as stream:
+            self._stream = stream
+            for chunk in super(DiskCachedContent, self).stream_data():
+                yield chunk
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        with open(self.path, 'rb') as stream:
+            self._stream = stream
+            for chunk in super(DiskCachedContent, self).stream_data_in_range(first_byte, last_byte):
+                yield chunk
+
+    def close(self):
+        # The file is closed once its data is streamed.
+        pass
+
+
+def get_disk_cached_content(content):
+    """
+    Returns the given piece of content, streamed from the contentstore, as a DiskCachedContent, storing its data in
+    the local disk cache first if it isn't there yet.
+
+    Returns None if the disk cache is disabled or if the content has no digest.  Raises IOError or OSError if the
+    data couldn't be stored, in which case the data of the given content may have been consumed.
+
+    Files are keyed by the location and digest of the content, so a new version of an asset is never served from an
+    outdated file.  When the cache grows over its maximum size, the least recently used files are evicted.
+    """
+    directory = settings.COURSE_ASSETS_DISK_CACHE.get('DIRECTORY')
+    if not directory or not content.content_digest:
+        return None
+
+    key = u'{}:{}'.format(six.text_type(content.location), content.content_digest)
+    path = os.path.join(directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+    try:
+        # Mark the file as recently used.
+        os.utime(path, None)
+    except OSError as exception:
+        if exception.errno != errno.ENOENT:
+            raise
+        _store_disk_cached_content(content, directory, path)
+    return DiskCachedContent(content, path)
+
+
+def _store_disk_cached_content(content, directory, path):
+    """
+    Writes the data of the given content to the given path, then evicts the least recently used files of the
+    directory until it fits in the maximum size of the disk cache.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # Write to a temporary file, renamed once complete, so that no partial file is ever served.
+    with NamedTemporaryFile(dir=directory, prefix='.', delete=False) as temp_file:
+        try:
+            for chunk in content.stream_data():
+                temp_file.write(chunk)
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+    os.rename(temp_file.name, path)
+
+    cached_files = []
+    total_size = 0
+    for name in os.listdir(directory):
+        if name.startswith('.'):
+            continue
+        file_path = os.path.join(directory, name)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # Evicted by another process.
+            continue
+        cached_files.append((stat.st_mtime, stat.st_size, file_path))
+        total_size += stat.st_size
+
+    max_size = settings.COURSE_ASSETS_DISK_CACHE['MAX_SIZE']
+    for __, size, file_path in sorted(cached_files):
+        if total_size <= max_size:
+            break
+        if file_path == path:
+            continue
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        total_size -= size
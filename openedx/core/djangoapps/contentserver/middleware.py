@@ -13,18 +13,27 @@ try:
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
     HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
 from six import text_type
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    ASSET_NOT_FOUND,
+    DiskCachedContent,
+    get_cached_asset_metadata,
+    get_cached_content,
+    get_disk_cached_content,
+    set_cached_asset_metadata,
+    set_cached_asset_not_found,
+    set_cached_content
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -35,6 +44,9 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = u"%a, %d %b %Y %H:%M:%S GMT"
 
+# Assets smaller than this are cached in memory; larger ones may be cached on the local disk.
+MAX_IN_MEMORY_CONTENT_LENGTH = 1048576
+
 
 class StaticContentServer(object):
     """
@@ -71,14 +83,20 @@ class StaticContentServer(object):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Attempt to load the asset to make sure it exists, and grab the asset digest
-            # if we're able to load it.
-            actual_digest = None
-            try:
-                content = self.load_asset_from_location(loc)
-                actual_digest = getattr(content, "content_digest", None)
-            except (ItemNotFoundError, NotFoundError):
+            # Attempt to load the metadata of the asset to make sure it exists, and grab the
+            # asset digest if we're able to load it.  The asset itself is only loaded when
+            # the metadata isn't cached, or when its data is needed for the response.
+            content = None
+            metadata = get_cached_asset_metadata(loc)
+            if metadata == ASSET_NOT_FOUND:
                 return HttpResponseNotFound()
+            if metadata is None:
+                content = self.load_asset_or_cache_not_found(loc)
+                if content is None:
+                    return HttpResponseNotFound()
+                set_cached_asset_metadata(content)
+                metadata = content
+            actual_digest = getattr(metadata, "content_digest", None)
 
             # If this was a versioned asset, and the digest doesn't match, redirect
             # them to the actual version.
@@ -103,21 +121,26 @@ class StaticContentServer(object):
                 newrelic.agent.add_custom_parameter('contentserver.from_cdn', is_from_cdn)
 
                 # Check if this content is locked or not.
-                locked = self.is_content_locked(content)
+                locked = self.is_content_locked(metadata)
                 newrelic.agent.add_custom_parameter('contentserver.locked', locked)
 
             # Check that user has access to the content.
-            if not self.is_user_authorized(request, content, loc):
+            if not self.is_user_authorized(request, metadata, loc):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+            last_modified_at_str = metadata.last_modified_at.strftime(HTTP_DATE_FORMAT)
             if 'HTTP_IF_MODIFIED_SINCE' in request.META:
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
+            if content is None:
+                content = self.load_asset_or_cache_not_found(loc)
+                if content is None:
+                    return HttpResponseNotFound()
+
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
@@ -127,7 +150,7 @@ class StaticContentServer(object):
             response = None
             if request.META.get('HTTP_RANGE'):
                 # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
+                if not isinstance(content, StaticContentStream):
                     content = AssetManager.find(loc, as_stream=True)
 
                 header_value = request.META['HTTP_RANGE']
@@ -173,7 +196,11 @@ class StaticContentServer(object):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, DiskCachedContent):
+                    # Let the server send the file itself, with sendfile where available.
+                    response = FileResponse(open(content.path, 'rb'))
+                else:
+                    response = HttpResponse(content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -272,6 +299,17 @@ class StaticContentServer(object):
 
         return True
 
+    def load_asset_or_cache_not_found(self, location):
+        """
+        Loads an asset based on its location, like load_asset_from_location, or returns None,
+        and caches that it wasn't found, if it doesn't exist.
+        """
+        try:
+            return self.load_asset_from_location(location)
+        except (ItemNotFoundError, NotFoundError):
+            set_cached_asset_not_found(location)
+            return None
+
     def load_asset_from_location(self, location):
         """
         Loads an asset based on its location, either retrieving it from a cache
@@ -290,9 +328,21 @@ class StaticContentServer(object):
             # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
             # because it's the default for memcached and also we don't want to do too much
             # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            if content.length is not None and content.length < MAX_IN_MEMORY_CONTENT_LENGTH:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            else:
+                # Larger assets are served from the local disk cache, when enabled, so that only
+                # the metadata of the asset is loaded from the contentstore.
+                try:
+                    disk_cached_content = get_disk_cached_content(content)
+                except (IOError, OSError):
+                    log.exception(u"Could not cache %s on disk", text_type(location))
+                    # The data may have been consumed by the failed attempt at caching it.
+                    content = AssetManager.find(location, as_stream=True)
+                else:
+                    if disk_cached_content is not None:
+                        content = disk_cached_content
 
         return content
 
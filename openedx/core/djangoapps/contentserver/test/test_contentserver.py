@@ -8,11 +8,15 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
 import six
 import unittest
+from tempfile import mkdtemp
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import RequestFactory
 from django.test.client import Client
 from django.test.utils import override_settings
@@ -30,6 +34,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
+from ..caching import get_disk_cached_content
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -390,6 +395,99 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         is_from_cdn = StaticContentServer.is_cdn_request(browser_request)
         self.assertEqual(is_from_cdn, True)
 
+    def _set_up_content_cache(self):
+        """
+        Caches content and metadata in a local memory cache of its own.
+        """
+        cache_patch = patch(
+            'openedx.core.djangoapps.contentserver.caching.CONTENT_CACHE', LocMemCache(six.text_type(uuid4()), {})
+        )
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    def test_not_found_cached(self):
+        """
+        Test that missing assets are only looked up once in a while.
+        """
+        self._set_up_content_cache()
+        missing_url = six.text_type(self.course_key.make_asset_key('asset', 'missing.txt'))
+        with patch.object(
+            StaticContentServer, 'load_asset_from_location', autospec=True, side_effect=ItemNotFoundError
+        ) as mock_load:
+            for __ in range(2):
+                resp = self.client.get(missing_url)
+                self.assertEqual(resp.status_code, 404)
+        self.assertEqual(mock_load.call_count, 1)
+
+    def test_conditional_request_from_cached_metadata(self):
+        """
+        Test that conditional requests and versioned asset redirects are answered from the
+        cached metadata of the asset, without loading the asset.
+        """
+        self._set_up_content_cache()
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url_locked).status_code, 403)
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+
+        with patch.object(StaticContentServer, 'load_asset_from_location', autospec=True) as mock_load:
+            resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=resp['Last-Modified'])
+            self.assertEqual(resp.status_code, 304)
+
+            resp = self.client.get(StaticContent.add_version_to_asset_path(self.url_unlocked, FAKE_MD5_HASH))
+            self.assertEqual(resp.status_code, 301)
+            self.assertTrue(resp.url.endswith(self.url_unlocked_versioned))
+
+            resp = self.client.get(self.url_locked)
+            self.assertEqual(resp.status_code, 403)
+        self.assertFalse(mock_load.called)
+
+    def _set_up_disk_cache(self, max_size=1024 * 1024):
+        """
+        Enables the disk cache of course assets, in a temporary directory, for all assets.
+        """
+        directory = mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        disk_cache_settings = override_settings(COURSE_ASSETS_DISK_CACHE={'DIRECTORY': directory, 'MAX_SIZE': max_size})
+        disk_cache_settings.enable()
+        self.addCleanup(disk_cache_settings.disable)
+        in_memory_patch = patch('openedx.core.djangoapps.contentserver.middleware.MAX_IN_MEMORY_CONTENT_LENGTH', 0)
+        in_memory_patch.start()
+        self.addCleanup(in_memory_patch.stop)
+        return directory
+
+    def test_disk_cached_asset(self):
+        """
+        Test that assets are stored in and then served from the disk cache.
+        """
+        directory = self._set_up_disk_cache()
+        data = self.contentstore.find(self.unlocked_asset).data
+
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(b''.join(resp.streaming_content), data)
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+        # Only the metadata of the asset is loaded from the contentstore.
+        with patch('gridfs.grid_file.GridOut.read') as mock_read:
+            resp = self.client.get(self.url_unlocked)
+            self.assertEqual(b''.join(resp.streaming_content), data)
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=1-3')
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(resp.content, data[1:4])
+        self.assertFalse(mock_read.called)
+
+    def test_disk_cache_eviction(self):
+        """
+        Test that the least recently used assets are evicted from the disk cache once it is full.
+        """
+        directory = self._set_up_disk_cache(max_size=self.length_unlocked)
+        cached_content = get_disk_cached_content(AssetManager.find(self.unlocked_asset, as_stream=True))
+        self.assertEqual(b''.join(cached_content.stream_data()), self.contentstore.find(self.unlocked_asset).data)
+
+        other_cached_content = get_disk_cached_content(AssetManager.find(self.locked_asset, as_stream=True))
+        self.assertEqual(os.listdir(directory), [os.path.basename(other_cached_content.path)])
+
     @patch('openedx.core.djangoapps.contentserver.models.CdnUserAgentsConfig.get_cdn_user_agents')
     def test_cache_is_cdn_with_cdn_request_multiple_user_agents(self, mock_get_cdn_user_agents):
         """
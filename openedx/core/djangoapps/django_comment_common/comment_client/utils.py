@@ -3,16 +3,61 @@
 from __future__ import absolute_import
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from uuid import uuid4
 
 import requests
 import six
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import translation
 from django.utils.translation import get_language
+from edx_django_utils.monitoring import set_custom_metric
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
 
 from .settings import SERVICE_HOST as COMMENTS_SERVICE
 
 log = logging.getLogger(__name__)
 
+WAFFLE_SWITCHES = WaffleSwitchNamespace(name='comment_client')
+
+# Send requests to the comments service through a per-process session that
+# keeps its connections open and reuses them across requests.
+USE_POOLED_SESSION = 'use_pooled_session'
+
+DEFAULT_CONNECTION_POOL_SETTINGS = {
+    # Number of hosts to keep connection pools for.
+    'POOL_CONNECTIONS': 1,
+    # Number of connections to keep open per host.
+    'POOL_MAXSIZE': 10,
+    # Number of times to retry a request that failed to connect, or an
+    # idempotent request that failed to get a response.
+    'MAX_RETRIES': 1,
+    'BACKOFF_FACTOR': 0,
+    # Whether to keep connections open between requests.
+    'KEEP_ALIVE': True,
+}
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+# Make the requests of calls passed to perform_concurrently in parallel, on
+# a pool of COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS threads.
+CONCURRENT_REQUESTS = 'concurrent_requests'
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+# State of the calling thread that is set on the threads of the pool while
+# they make its requests, so that they need not query the database for it.
+_THREAD_CONTEXT = threading.local()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in six.iteritems(dic) if v is not None])
@@ -33,9 +78,7 @@ def extract(dic, keys):
 
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
-    # To avoid dependency conflict
-    from openedx.core.djangoapps.django_comment_common.models import ForumsConfig
-    config = ForumsConfig.current()
+    config = _forums_config()
 
     if not config.enabled:
         raise CommentClientMaintenanceError('service disabled')
@@ -63,14 +106,24 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = data_or_params.copy()
         params.update(request_id_dict)
-    response = requests.request(
-        method,
-        url,
-        data=data,
-        params=params,
-        headers=headers,
-        timeout=config.connection_timeout
-    )
+    if _use_pooled_session():
+        response = _pooled_request(
+            method,
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=config.connection_timeout
+        )
+    else:
+        response = requests.request(
+            method,
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=config.connection_timeout
+        )
 
     metric_tags.append(u'status_code:{}'.format(response.status_code))
     if response.status_code > 200:
@@ -101,6 +154,170 @@ def perform_request(method, url, data_or_params=None, raw=False,
             return data
 
 
+def perform_concurrently(*calls):
+    """
+    Calls each of the given functions, which make independent requests to
+    the comments service, and returns the list of their results in order.
+
+    If the comment_client.concurrent_requests switch is on, the calls are
+    made in parallel on a bounded thread pool, so that they take about as
+    long as the slowest of them. Otherwise, they are made one after the
+    other. Either way, if any of the calls raises an exception, the
+    exception of the first of them is raised once all calls are done.
+    """
+    if (
+            len(calls) < 2 or
+            _in_pool_thread() or
+            not WAFFLE_SWITCHES.is_enabled(CONCURRENT_REQUESTS)
+    ):
+        return [call() for call in calls]
+
+    config = _forums_config()
+    use_pooled_session = _use_pooled_session()
+    language = get_language()
+    futures = [
+        _get_executor().submit(_call_in_context, call, config, use_pooled_session, language) for call in calls
+    ]
+    wait(futures)
+    return [future.result() for future in futures]
+
+
+def _get_executor():
+    """
+    Returns the thread pool of this process for concurrent requests.
+    """
+    global _EXECUTOR  # pylint: disable=global-statement
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=getattr(
+                        settings, 'COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS', DEFAULT_MAX_CONCURRENT_REQUESTS,
+                    ),
+                )
+    return _EXECUTOR
+
+
+def _call_in_context(call, config, use_pooled_session, language):
+    """
+    Makes the given call on a thread of the pool, with the forums config,
+    pooled session switch and language of the thread that dispatched it.
+
+    The database connections the call may still open are closed once
+    they are too old, as is done at the end of each request, since the
+    threads of the pool outlive the requests they make calls for.
+    """
+    _THREAD_CONTEXT.forums_config = config
+    _THREAD_CONTEXT.use_pooled_session = use_pooled_session
+    try:
+        with translation.override(language):
+            return call()
+    finally:
+        del _THREAD_CONTEXT.forums_config
+        del _THREAD_CONTEXT.use_pooled_session
+        close_old_connections()
+
+
+def _in_pool_thread():
+    """
+    Returns whether this is a thread of the pool making a call. Calls made
+    from such a thread are not dispatched to the pool again, which could
+    exhaust it.
+    """
+    return getattr(_THREAD_CONTEXT, 'forums_config', None) is not None
+
+
+def _forums_config():
+    """
+    Returns the current ForumsConfig, which is that of the dispatching
+    thread for calls made by perform_concurrently.
+    """
+    config = getattr(_THREAD_CONTEXT, 'forums_config', None)
+    if config is None:
+        # To avoid dependency conflict
+        from openedx.core.djangoapps.django_comment_common.models import ForumsConfig
+        config = ForumsConfig.current()
+    return config
+
+
+def _use_pooled_session():
+    """
+    Returns whether the comment_client.use_pooled_session switch is on,
+    which is its value in the dispatching thread for calls made by
+    perform_concurrently.
+    """
+    use_pooled_session = getattr(_THREAD_CONTEXT, 'use_pooled_session', None)
+    if use_pooled_session is None:
+        use_pooled_session = WAFFLE_SWITCHES.is_enabled(USE_POOLED_SESSION)
+    return use_pooled_session
+
+
+def get_session():
+    """
+    Returns the session of this process for requests to the comments
+    service, creating it with the COMMENTS_SERVICE_CONNECTION_POOL settings
+    on first use.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _create_session()
+    return _SESSION
+
+
+def reset_session():
+    """
+    Closes the session of this process, so that the next request creates a
+    new one.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        session, _SESSION = _SESSION, None
+    if session is not None:
+        session.close()
+
+
+def _create_session():
+    """
+    Returns a new session for requests to the comments service.
+    """
+    pool_settings = dict(DEFAULT_CONNECTION_POOL_SETTINGS)
+    pool_settings.update(getattr(settings, 'COMMENTS_SERVICE_CONNECTION_POOL', {}))
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_settings['POOL_CONNECTIONS'],
+        pool_maxsize=pool_settings['POOL_MAXSIZE'],
+        max_retries=Retry(
+            total=pool_settings['MAX_RETRIES'],
+            backoff_factor=pool_settings['BACKOFF_FACTOR'],
+            raise_on_status=False,
+        ),
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if not pool_settings['KEEP_ALIVE']:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def _pooled_request(method, url, **kwargs):
+    """
+    Performs the given request with the session of this process, and
+    records whether it reused an open connection.
+    """
+    session = get_session()
+    pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+    num_connections = pool.num_connections
+    response = session.request(method, url, **kwargs)
+    # A reused connection doesn't add to the number of connections the
+    # pool has made.  Requests made concurrently from other threads may
+    # skew this, so it is an approximation.
+    set_custom_metric('comment_client_connection_reused', pool.num_connections == num_connections)
+    return response
+
+
 class CommentClientError(Exception):
     pass
 
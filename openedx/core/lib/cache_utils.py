@@ -5,7 +5,10 @@ from __future__ import absolute_import
 import collections
 import functools
 import itertools
+import threading
 import zlib
+from time import time
+
 import wrapt
 
 from django.utils.encoding import force_text
@@ -149,6 +152,110 @@ class process_cached(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class ProcessLRUCache(object):
+    """
+    A bounded, thread-safe cache for the life of a process that evicts its
+    least recently used entries once the total size of its values exceeds
+    `max_size`.
+
+    Values larger than `max_size` are not cached.  Entries optionally expire
+    after `timeout` seconds.  Counts of hits, misses and evictions are kept
+    for monitoring.
+
+    Arguments:
+        max_size (int): Maximum total size of the cached values.
+        sizeof (function: value->int): Function returning the size of a
+            value.  Defaults to len, for values such as serialized data.
+        timeout (int): Optional number of seconds after which entries
+            expire.
+    """
+    def __init__(self, max_size, sizeof=len, timeout=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._sizeof = sizeof
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def size(self):
+        """
+        Total size of the cached values.
+        """
+        return self._size
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for the given key, or default if there is
+        none or it has expired.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or (entry[2] is not None and entry[2] < time()):
+                if entry is not None:
+                    self._size -= entry[1]
+                self.misses += 1
+                return default
+            # Re-insert the entry to mark it as the most recently used.
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """
+        Caches the given value for the given key, evicting the least
+        recently used entries as needed.  Returns the number of entries
+        evicted.
+        """
+        size = self._sizeof(value)
+        expires_at = time() + self.timeout if self.timeout is not None else None
+        num_evicted = 0
+        with self._lock:
+            self._delete(key)
+            if size > self.max_size:
+                return num_evicted
+            self._entries[key] = (value, size, expires_at)
+            self._size += size
+            while self._size > self.max_size:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                num_evicted += 1
+            self.evictions += num_evicted
+        return num_evicted
+
+    def delete(self, key):
+        """
+        Removes the entry for the given key, if any.
+        """
+        with self._lock:
+            self._delete(key)
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _delete(self, key):
+        """
+        Removes the entry for the given key, if any, while holding the lock.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+
 def zpickle(data):
     """Given any data structure, returns a zlib compressed pickled serialization."""
     return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
@@ -6,10 +6,10 @@ from __future__ import absolute_import
 from unittest import TestCase
 
 import ddt
-from mock import Mock
+from mock import Mock, patch
 
 from edx_django_utils.cache import RequestCache
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import ProcessLRUCache, request_cached
 import six
 
 
@@ -297,3 +297,59 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestProcessLRUCache(TestCase):
+    """
+    Test the ProcessLRUCache class.
+    """
+    def test_get_and_set(self):
+        cache = ProcessLRUCache(max_size=10)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 'aaa')
+        self.assertEqual(cache.get('a'), 'aaa')
+        self.assertEqual(cache.size, 3)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache.set('a', 'aa')
+        self.assertEqual(cache.size, 2)
+        cache.delete('a')
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.size, 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = ProcessLRUCache(max_size=6)
+        cache.set('a', 'aa')
+        cache.set('b', 'bb')
+        cache.set('c', 'cc')
+        cache.get('a')
+        self.assertEqual(cache.set('d', 'ddd'), 2)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertNotIn('c', cache)
+        self.assertEqual(cache.size, 5)
+        self.assertEqual(cache.evictions, 2)
+
+    def test_too_large(self):
+        cache = ProcessLRUCache(max_size=2)
+        cache.set('a', 'aa')
+        cache.set('b', 'bbb')
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+
+    def test_timeout(self):
+        cache = ProcessLRUCache(max_size=10, timeout=60)
+        with patch('openedx.core.lib.cache_utils.time', return_value=1000):
+            cache.set('a', 'aa')
+        with patch('openedx.core.lib.cache_utils.time', return_value=1059):
+            self.assertEqual(cache.get('a'), 'aa')
+        with patch('openedx.core.lib.cache_utils.time', return_value=1061):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.size, 0)
+
+    def test_sizeof(self):
+        cache = ProcessLRUCache(max_size=10, sizeof=lambda value: value['size'])
+        cache.set('a', {'size': 8})
+        cache.set('b', {'size': 8})
+        self.assertEqual(len(cache), 1)
+        self.assertIn('b', cache)